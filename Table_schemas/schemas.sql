@@ -128,3 +128,411 @@ CREATE TABLE dbo.platinum_crypto_horizon (
   CONSTRAINT PK_platinum_crypto_horizon PRIMARY KEY (Coin, HorizonLabel)
 );
 
+
+
+-- ─── Long-format tables for the configurable asset universe ───────────
+-- One row per (Asset, PriceDate); column names carry no coin suffix.
+
+CREATE TABLE asset_prices_bnz (
+    Asset        VARCHAR(20)     NOT NULL,               -- e.g. 'BTC', 'SOL'
+    PriceDate    DATE            NOT NULL,
+    OpenPrice    DECIMAL(28,10)  NULL,
+    HighPrice    DECIMAL(28,10)  NULL,
+    LowPrice     DECIMAL(28,10)  NULL,
+    ClosePrice   DECIMAL(28,10)  NULL,
+    Volume       BIGINT          NULL,
+    Coin         VARCHAR(40)     NOT NULL,               -- display name, e.g. 'Bitcoin'
+    RetrievedAt  DATETIME2(3)    NOT NULL DEFAULT SYSUTCDATETIME(),
+    CONSTRAINT PK_asset_prices_bnz PRIMARY KEY (Asset, PriceDate)
+);
+
+CREATE TABLE asset_prices_sil (
+    Asset        VARCHAR(20)     NOT NULL,
+    PriceDate    DATE            NOT NULL,
+    OpenPrice    DECIMAL(28,10)  NULL,
+    HighPrice    DECIMAL(28,10)  NULL,
+    LowPrice     DECIMAL(28,10)  NULL,
+    ClosePrice   DECIMAL(28,10)  NULL,
+    Volume       BIGINT          NULL,
+    Coin         VARCHAR(40)     NOT NULL,
+    RetrievedAt  DATETIME2(3)    NOT NULL DEFAULT SYSUTCDATETIME(),
+    CONSTRAINT PK_asset_prices_sil PRIMARY KEY (Asset, PriceDate)
+);
+
+CREATE TABLE asset_prices_gold (
+    Asset            VARCHAR(20)  NOT NULL,
+    PriceDate        DATE         NOT NULL,
+    OpenPrice        FLOAT        NULL,
+    HighPrice        FLOAT        NULL,
+    LowPrice         FLOAT        NULL,
+    ClosePrice       FLOAT        NULL,
+    Volume           BIGINT       NULL,
+    DailyReturn      FLOAT        NULL,
+    LogReturn        FLOAT        NULL,
+    Volume_Millions  FLOAT        NULL,
+    Coin             VARCHAR(40)  NOT NULL,
+    CumulativeReturn FLOAT        NULL,
+    Drawdown         FLOAT        NULL,
+    [Year]           INT          NULL,
+    [Month]          TINYINT      NULL,
+    DayOfWeek        TINYINT      NULL,
+    SMA7             FLOAT        NULL,
+    SMA30            FLOAT        NULL,
+    SMA90            FLOAT        NULL,
+    Vol7             FLOAT        NULL,
+    Vol30            FLOAT        NULL,
+    Vol90            FLOAT        NULL,
+    VolAvg30         FLOAT        NULL,
+    CONSTRAINT PK_asset_prices_gold PRIMARY KEY (Asset, PriceDate)
+);
+
+CREATE TABLE asset_forecast_horizon (
+    Asset        VARCHAR(20) NOT NULL,
+    HorizonLabel VARCHAR(16) NOT NULL,
+    TargetDate   DATE        NOT NULL,
+    Forecast     FLOAT       NULL,
+    ReturnPct    FLOAT       NULL,
+    CONSTRAINT PK_asset_forecast_horizon PRIMARY KEY (Asset, HorizonLabel)
+);
+
+
+-- ─── Forecast backtesting (rolling-origin evaluation) ─────────────────
+
+CREATE TABLE platinum_backtest_results (
+    Coin         VARCHAR(16) NOT NULL,
+    Model        VARCHAR(32) NOT NULL,   -- forecast_models.MODEL_ZOO name
+    OriginDate   DATE        NOT NULL,   -- last date of the training window
+    HorizonLabel VARCHAR(16) NOT NULL,
+    HorizonDays  INT         NOT NULL,
+    TargetDate   DATE        NOT NULL,
+    LastPrice    FLOAT       NULL,       -- price at the origin
+    Forecast     FLOAT       NULL,
+    Actual       FLOAT       NULL,
+    CONSTRAINT PK_platinum_backtest_results PRIMARY KEY (Coin, OriginDate, HorizonLabel)
+);
+
+CREATE TABLE platinum_backtest_scores (
+    Coin         VARCHAR(16) NOT NULL,
+    Model        VARCHAR(32) NOT NULL,   -- forecast_models.MODEL_ZOO name
+    HorizonLabel VARCHAR(16) NOT NULL,
+    HorizonDays  INT         NOT NULL,
+    Origins      INT         NOT NULL,   -- origins with a realized target
+    MAE          FLOAT       NULL,
+    MAPE         FLOAT       NULL,       -- percent
+    DirectionalAccuracy FLOAT NULL,      -- share of origins with the right sign of move
+    CONSTRAINT PK_platinum_backtest_scores PRIMARY KEY (Coin, HorizonLabel)
+);
+
+
+-- ─── Platinum model zoo: holdout score per candidate model ────────────
+
+CREATE TABLE platinum_model_scores (
+    Coin         VARCHAR(16) NOT NULL,
+    Model        VARCHAR(32) NOT NULL,   -- e.g. 'holt', 'damped', 'arima'
+    HoldoutDays  INT         NOT NULL,
+    HoldoutMAE   FLOAT       NULL,
+    HoldoutMAPE  FLOAT       NULL,       -- percent; lowest is selected
+    Selected     BIT         NOT NULL,   -- 1 = model used for platinum_crypto_horizon
+    FitMode      VARCHAR(8)  NOT NULL,   -- 'cold', 'warm' or 'cached'
+    CONSTRAINT PK_platinum_model_scores PRIMARY KEY (Coin, Model)
+);
+
+
+-- ─── Platinum uncertainty: Monte Carlo percentile bands per horizon ───
+
+CREATE TABLE platinum_horizon_bands (
+    Coin         VARCHAR(16) NOT NULL,
+    HorizonLabel VARCHAR(16) NOT NULL,
+    TargetDate   DATE        NOT NULL,
+    Source       VARCHAR(16) NOT NULL,   -- 'bootstrap' (gold LogReturn) or 'residuals'
+    Paths        INT         NOT NULL,   -- simulated paths
+    P5           FLOAT       NULL,
+    P25          FLOAT       NULL,
+    P50          FLOAT       NULL,
+    P75          FLOAT       NULL,
+    P95          FLOAT       NULL,
+    CONSTRAINT PK_platinum_horizon_bands PRIMARY KEY (Coin, HorizonLabel)
+);
+
+
+-- ─── Data quality: per-rule counts and quarantined rows ───────────────
+
+CREATE TABLE dq_rule_counts (
+    Layer        VARCHAR(16) NOT NULL,   -- 'silver'
+    Coin         VARCHAR(20) NOT NULL,
+    Rule         VARCHAR(32) NOT NULL,   -- rule name from data_quality.py
+    Action       VARCHAR(8)  NOT NULL,   -- 'reject' or 'flag'
+    Rows         INT         NOT NULL,   -- rows failing the rule in the last run
+    CONSTRAINT PK_dq_rule_counts PRIMARY KEY (Layer, Coin, Rule)
+);
+
+CREATE TABLE dq_quarantine (
+    Layer        VARCHAR(16) NOT NULL,
+    Coin         VARCHAR(20) NOT NULL,
+    PriceDate    DATE        NULL,
+    Rule         VARCHAR(32) NOT NULL,   -- first rule the row failed
+    Action       VARCHAR(8)  NOT NULL
+);
+
+
+-- ─── Intraday bars (1h / 1m), keyed by timestamp ──────────────────────
+-- REAL (float32) prices, BIGINT volume; one table per layer holds every
+-- coin and interval.
+
+CREATE TABLE intraday_bars_bnz (
+    Coin         VARCHAR(20)  NOT NULL,
+    BarInterval  VARCHAR(4)   NOT NULL,   -- '1h' or '1m'
+    BarTime      DATETIME2(0) NOT NULL,   -- bar open, UTC
+    OpenPrice    REAL         NULL,
+    HighPrice    REAL         NULL,
+    LowPrice     REAL         NULL,
+    ClosePrice   REAL         NULL,
+    Volume       BIGINT       NULL,
+    RetrievedAt  DATETIME2(3) NOT NULL DEFAULT SYSUTCDATETIME(),
+    CONSTRAINT PK_intraday_bars_bnz PRIMARY KEY (Coin, BarInterval, BarTime)
+);
+
+CREATE TABLE intraday_bars_sil (
+    Coin         VARCHAR(20)  NOT NULL,
+    BarInterval  VARCHAR(4)   NOT NULL,
+    BarTime      DATETIME2(0) NOT NULL,
+    OpenPrice    REAL         NULL,
+    HighPrice    REAL         NULL,
+    LowPrice     REAL         NULL,
+    ClosePrice   REAL         NULL,
+    Volume       BIGINT       NULL,
+    CONSTRAINT PK_intraday_bars_sil PRIMARY KEY (Coin, BarInterval, BarTime)
+);
+
+-- rolling windows are time spans: Short/Medium/Long = 24h/7D/30D for 1h bars,
+-- 60min/24h/7D for 1m bars
+CREATE TABLE intraday_features_gold (
+    Coin             VARCHAR(20)  NOT NULL,
+    BarInterval      VARCHAR(4)   NOT NULL,
+    BarTime          DATETIME2(0) NOT NULL,
+    ClosePrice       REAL         NULL,
+    BarReturn        REAL         NULL,
+    LogReturn        REAL         NULL,
+    SMA_Short        REAL         NULL,
+    Vol_Short        REAL         NULL,
+    VolumeSum_Short  BIGINT       NULL,
+    SMA_Medium       REAL         NULL,
+    Vol_Medium       REAL         NULL,
+    VolumeSum_Medium BIGINT       NULL,
+    SMA_Long         REAL         NULL,
+    Vol_Long         REAL         NULL,
+    VolumeSum_Long   BIGINT       NULL,
+    CONSTRAINT PK_intraday_features_gold PRIMARY KEY (Coin, BarInterval, BarTime)
+);
+
+
+-- ─── Pipeline run log: one row per stage per orchestrator run ─────────
+
+CREATE TABLE pipeline_run_log (
+    RunId          VARCHAR(32)  NOT NULL,   -- UTC start time + process id
+    Stage          VARCHAR(16)  NOT NULL,   -- 'bronze', 'silver', 'gold', 'rollup', 'platinum'
+    StartedAt      DATETIME2(0) NOT NULL,   -- UTC
+    WallSeconds    FLOAT        NOT NULL,
+    CpuSeconds     FLOAT        NOT NULL,   -- includes finished worker processes
+    RowsIn         BIGINT       NOT NULL,
+    RowsOut        BIGINT       NOT NULL,
+    RowsPerSecond  FLOAT        NULL,       -- max(RowsIn, RowsOut) / WallSeconds
+    PeakRssMiB     FLOAT        NULL,       -- sampled resident memory of the main process
+    DbCalls        INT          NOT NULL,   -- storage backend operations
+    DbSeconds      FLOAT        NOT NULL,   -- wall time inside those operations
+    Succeeded      BIT          NOT NULL,
+    CONSTRAINT PK_pipeline_run_log PRIMARY KEY (RunId, Stage)
+);
+
+
+-- ─── Technical indicators (indicators.INDICATORS) on the gold tables ───
+-- RSI (Wilder, 14), MACD (12/26/9), Bollinger (20, 2σ) with %B, momentum
+-- (10 / 30-day rate of change) and on-balance volume.
+
+ALTER TABLE dbo.gold_btc_prices
+ADD
+    RSI14_BTC      FLOAT        NULL,
+    MACD_BTC       FLOAT        NULL,
+    MACDSignal_BTC FLOAT        NULL,
+    MACDHist_BTC   FLOAT        NULL,
+    BBUpper20_BTC  FLOAT        NULL,
+    BBLower20_BTC  FLOAT        NULL,
+    BBPctB20_BTC   FLOAT        NULL,
+    Momentum10_BTC FLOAT        NULL,
+    Momentum30_BTC FLOAT        NULL,
+    OBV_BTC        FLOAT        NULL;
+GO
+
+ALTER TABLE dbo.gold_eth_prices
+ADD
+    RSI14_ETH      FLOAT        NULL,
+    MACD_ETH       FLOAT        NULL,
+    MACDSignal_ETH FLOAT        NULL,
+    MACDHist_ETH   FLOAT        NULL,
+    BBUpper20_ETH  FLOAT        NULL,
+    BBLower20_ETH  FLOAT        NULL,
+    BBPctB20_ETH   FLOAT        NULL,
+    Momentum10_ETH FLOAT        NULL,
+    Momentum30_ETH FLOAT        NULL,
+    OBV_ETH        FLOAT        NULL;
+GO
+
+ALTER TABLE dbo.asset_prices_gold
+ADD
+    RSI14      FLOAT        NULL,
+    MACD       FLOAT        NULL,
+    MACDSignal FLOAT        NULL,
+    MACDHist   FLOAT        NULL,
+    BBUpper20  FLOAT        NULL,
+    BBLower20  FLOAT        NULL,
+    BBPctB20   FLOAT        NULL,
+    Momentum10 FLOAT        NULL,
+    Momentum30 FLOAT        NULL,
+    OBV        FLOAT        NULL;
+GO
+
+
+-- ─── Gold rollups for the dashboards: weekly / monthly / yearly ────────
+-- Period 'W' (Monday–Sunday), 'M' or 'Y'; PeriodStart is the first calendar
+-- day of the period, PeriodEnd the last day with data.
+
+CREATE TABLE gold_price_rollups (
+    Coin          VARCHAR(20) NOT NULL,
+    Period        CHAR(1)     NOT NULL,
+    PeriodStart   DATE        NOT NULL,
+    PeriodEnd     DATE        NOT NULL,
+    Days          INT         NOT NULL,
+    OpenPrice     FLOAT       NULL,
+    HighPrice     FLOAT       NULL,
+    LowPrice      FLOAT       NULL,
+    ClosePrice    FLOAT       NULL,
+    Volume        FLOAT       NULL,
+    PeriodReturn  FLOAT       NULL,   -- close vs. previous period close
+    LogReturn     FLOAT       NULL,   -- sum of daily log returns
+    Volatility    FLOAT       NULL,   -- std of daily log returns
+    MaxDrawdown   FLOAT       NULL,   -- worst close vs. running max within the period
+    EndDrawdown   FLOAT       NULL,   -- drawdown from the all-time high on PeriodEnd
+    CONSTRAINT PK_gold_price_rollups PRIMARY KEY (Coin, Period, PeriodStart)
+);
+
+CREATE TABLE gold_pair_rollups (
+    CoinA            VARCHAR(20) NOT NULL,   -- e.g. 'BTC'
+    CoinB            VARCHAR(20) NOT NULL,   -- e.g. 'ETH'
+    Period           CHAR(1)     NOT NULL,
+    PeriodStart      DATE        NOT NULL,
+    Days             INT         NOT NULL,   -- days both coins traded
+    ReturnA          FLOAT       NULL,
+    ReturnB          FLOAT       NULL,
+    ReturnSpread     FLOAT       NULL,       -- ReturnA - ReturnB
+    PriceRatio       FLOAT       NULL,       -- CloseB / CloseA at period end
+    RatioReturn      FLOAT       NULL,       -- change of PriceRatio over the period
+    Correlation      FLOAT       NULL,       -- of daily log returns
+    VolatilityRatio  FLOAT       NULL,       -- std B / std A
+    CONSTRAINT PK_gold_pair_rollups PRIMARY KEY (CoinA, CoinB, Period, PeriodStart)
+);
+
+-- ─── Gold cross-asset statistics: rolling pairwise correlation / covariance / beta ──
+-- One row per date and pair (AssetA < AssetB alphabetically), computed from
+-- daily log returns joined on PriceDate. Beta<w> is the beta of AssetB on
+-- AssetA (Cov / Var A); the reverse beta is Corr<w>² / Beta<w>.
+
+CREATE TABLE gold_cross_asset_stats (
+    PriceDate  DATE        NOT NULL,
+    AssetA     VARCHAR(20) NOT NULL,
+    AssetB     VARCHAR(20) NOT NULL,
+    Corr30     FLOAT       NULL,
+    Cov30      FLOAT       NULL,
+    Beta30     FLOAT       NULL,
+    Corr90     FLOAT       NULL,
+    Cov90      FLOAT       NULL,
+    Beta90     FLOAT       NULL,
+    Corr365    FLOAT       NULL,
+    Cov365     FLOAT       NULL,
+    Beta365    FLOAT       NULL,
+    CONSTRAINT PK_gold_cross_asset_stats PRIMARY KEY (PriceDate, AssetA, AssetB)
+);
+
+
+-- ─── Trading calendar (trading_calendar.py) ────────────────────────────
+-- Silver frames are aligned to one row per calendar day; days without an
+-- observed bar are imputed flat at the previous close with zero volume.
+-- Gold keeps every calendar day and flags the imputed ones (silver tables
+-- store observed days only).
+
+ALTER TABLE dbo.gold_btc_prices
+ADD
+    IsImputed      BIT          NOT NULL DEFAULT 0;
+GO
+
+ALTER TABLE dbo.gold_eth_prices
+ADD
+    IsImputed      BIT          NOT NULL DEFAULT 0;
+GO
+
+ALTER TABLE dbo.asset_prices_gold
+ADD
+    IsImputed      BIT          NOT NULL DEFAULT 0;
+GO
+
+-- Gap statistics per asset and bar frequency ('D' daily, '1h' / '1min'
+-- intraday): Periods = calendar periods from FirstDate to LastDate,
+-- ImputedPeriods = Periods - ObservedPeriods, Gaps = runs of missing
+-- periods, LongestGap in periods, Coverage = ObservedPeriods / Periods.
+
+CREATE TABLE calendar_gap_stats (
+    Asset            VARCHAR(20)  NOT NULL,
+    Frequency        VARCHAR(8)   NOT NULL,
+    FirstDate        DATETIME2(0) NOT NULL,
+    LastDate         DATETIME2(0) NOT NULL,
+    Periods          INT          NOT NULL,
+    ObservedPeriods  INT          NOT NULL,
+    ImputedPeriods   INT          NOT NULL,
+    Gaps             INT          NOT NULL,
+    LongestGap       INT          NOT NULL,
+    Coverage         FLOAT        NOT NULL,
+    CONSTRAINT PK_calendar_gap_stats PRIMARY KEY (Asset, Frequency)
+);
+
+
+-- ─── Gold horizon scenarios: realized buy-and-hold outcomes (scenarios.py) ──
+-- For every observed start day since CRYPTO_SCENARIO_START (2014-01-01) and
+-- every platinum HORIZONS label: the return of the close HorizonDays later
+-- vs. the start close, and the max drawdown (worst close vs. its running
+-- max) while held, as fractions. Only starts whose horizon has ended count.
+
+CREATE TABLE gold_horizon_scenarios (
+    Asset              VARCHAR(20) NOT NULL,
+    HorizonLabel       VARCHAR(16) NOT NULL,
+    HorizonDays        INT         NOT NULL,
+    FirstStart         DATE        NOT NULL,
+    LastStart          DATE        NOT NULL,
+    Starts             INT         NOT NULL,   -- start days with a realized outcome
+    MeanReturn         FLOAT       NULL,
+    P5Return           FLOAT       NULL,
+    P25Return          FLOAT       NULL,
+    P50Return          FLOAT       NULL,
+    P75Return          FLOAT       NULL,
+    P95Return          FLOAT       NULL,
+    ShareUp            FLOAT       NULL,       -- share of starts with a positive return
+    BestReturn         FLOAT       NULL,
+    WorstReturn        FLOAT       NULL,
+    MeanMaxDrawdown    FLOAT       NULL,
+    MedianMaxDrawdown  FLOAT       NULL,
+    WorstMaxDrawdown   FLOAT       NULL,
+    CONSTRAINT PK_gold_horizon_scenarios PRIMARY KEY (Asset, HorizonLabel)
+);
+
+CREATE TABLE gold_horizon_scenarios_yearly (
+    Asset              VARCHAR(20) NOT NULL,
+    HorizonLabel       VARCHAR(16) NOT NULL,
+    StartYear          SMALLINT    NOT NULL,
+    HorizonDays        INT         NOT NULL,
+    Starts             INT         NOT NULL,
+    MeanReturn         FLOAT       NULL,
+    ShareUp            FLOAT       NULL,
+    BestReturn         FLOAT       NULL,
+    WorstReturn        FLOAT       NULL,
+    MeanMaxDrawdown    FLOAT       NULL,
+    WorstMaxDrawdown   FLOAT       NULL,
+    CONSTRAINT PK_gold_horizon_scenarios_yearly PRIMARY KEY (Asset, HorizonLabel, StartYear)
+);
@@ -0,0 +1,250 @@
+import os                                  # report / baseline paths
+import sys                                 # exit status on regression
+import gc                                  # collect between runs
+import json                                # machine-readable report and baselines
+import time                                # wall-clock timing
+import platform                            # host details in the report
+import tracemalloc                         # peak memory per stage
+from datetime import datetime, timezone    # report timestamp
+
+import synthetic_data                      # synthetic OHLCV series
+import bronze_raw_ingest                   # clean_df
+import silver_clean_transform              # clean_bronze
+import gold_feature_engineering            # single-block and legacy gold features, gold_columns
+import platinum_forecasting                # forecast_holt
+import scenarios                           # horizon scenario cube and summaries
+import db_writer                           # row marshaling used by every table write
+
+# ---------- CONFIG ----------
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPORT_PATH   = os.path.join(HERE, "benchmarks", "report.json")
+BASELINE_PATH = os.path.join(HERE, "benchmarks", "baselines.json")
+DEFAULT_ROWS   = [1_000, 10_000, 100_000, 1_000_000]
+# opt-in sizes (--tier); peak memory grows linearly (gold features peak at
+# ~450 MiB per 1e6 rows), so 'full' needs a machine with 64 GB of RAM or more
+SIZE_TIERS = {
+    "default": DEFAULT_ROWS,
+    "large":   DEFAULT_ROWS + [10_000_000],
+    "full":    DEFAULT_ROWS + [10_000_000, 100_000_000],
+}
+DEFAULT_ASSETS = [1]
+REPEATS = 3                                # best-of timing runs per case
+TIME_TOLERANCE   = 0.50                    # fail when > 50% slower than baseline
+MEMORY_TOLERANCE = 0.25                    # fail when peak memory grows > 25%
+MIN_BASELINE_SECONDS = 0.005               # ignore timing noise below this
+STAGE_MAX_ROWS = {"forecast_holt": 100_000,     # larger fits are skipped, not timed
+                  "horizon_scenarios": synthetic_data.DAILY_MAX_ROWS}   # daily bars only
+# (before, after) stage pairs computing the same output; the report shows the change
+COMPARISONS = [("gold_features_legacy", "gold_features")]
+
+# ---------- STAGES ----------
+# Each stage is (prepare, run): prepare builds the stage input from a
+# synthetic bronze frame outside the timed region; run is the timed call.
+def prep_raw(df, suffix):
+    return synthetic_data.to_yfinance_frame(df, suffix)
+
+def prep_bronze(df, suffix):
+    return df
+
+def prep_silver(df, suffix):
+    return silver_clean_transform.clean_bronze(df, suffix)
+
+def prep_base(df, suffix):
+    return gold_feature_engineering.compute_base_metrics(prep_silver(df, suffix), suffix)
+
+def prep_gold(df, suffix):
+    return gold_feature_engineering.compute_gold_features(prep_silver(df, suffix), suffix)
+
+def prep_forecast(df, suffix):
+    return df[["PriceDate", f"Close_{suffix}"]].set_axis(["ds", "y"], axis=1)
+
+def marshal_gold(gold, suffix):
+    """The row conversion upsert_gold_table hands to executemany, without a DB."""
+    cols = gold_feature_engineering.gold_columns(suffix)
+    int_cols = [f"Volume_{suffix}", "Year", "Month", "DayOfWeek", "IsImputed"]
+    return sum(len(rows) for rows in db_writer.iter_row_chunks(gold, cols, int_cols))
+
+def run_clean_df(raw, suffix):
+    return bronze_raw_ingest.clean_df(raw, suffix, suffix)
+
+def run_gold_legacy(silver, suffix):
+    """Silver → gold through the intermediate frames (base, enhanced, then millions)."""
+    gold = gold_feature_engineering.compute_enhanced_metrics(
+        gold_feature_engineering.compute_base_metrics(silver, suffix), suffix)
+    gold[f"Volume_{suffix}_Millions"] = gold[f"Volume_{suffix}"] / 1e6
+    return gold
+
+def run_scenarios(gold, suffix):
+    closes, imputed = scenarios.close_matrix({suffix: gold})
+    return scenarios.compute_scenarios(closes, imputed)
+
+STAGES = {
+    "clean_df":                 (prep_raw,      run_clean_df),
+    "clean_bronze":             (prep_bronze,   silver_clean_transform.clean_bronze),
+    "compute_base_metrics":     (prep_silver,   gold_feature_engineering.compute_base_metrics),
+    "compute_enhanced_metrics": (prep_base,     gold_feature_engineering.compute_enhanced_metrics),
+    "gold_features_legacy":     (prep_silver,   run_gold_legacy),
+    "gold_features":            (prep_silver,   gold_feature_engineering.compute_gold_features),
+    "marshal_gold_rows":        (prep_gold,     marshal_gold),
+    "horizon_scenarios":        (prep_gold,     run_scenarios),
+    "forecast_holt":            (prep_forecast, platinum_forecasting.forecast_holt),
+}
+
+# ---------- MEASUREMENT ----------
+def measure(stage: str, rows: int, assets: int, repeats: int = REPEATS) -> dict:
+    """
+    Time (best of `repeats`) and memory-profile one stage on `assets`
+    synthetic series of `rows` rows each. Peak memory is taken in a
+    separate tracemalloc run so tracing does not inflate the timings.
+    """
+    prepare, run = STAGES[stage]
+    universe = synthetic_data.synthetic_universe(assets, rows)
+    inputs = [(prepare(df, suffix), suffix) for suffix, df in universe.items()]
+    del universe
+
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        t0 = time.perf_counter()
+        for x, suffix in inputs:
+            run(x, suffix)
+        best = min(best, time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    for x, suffix in inputs:
+        run(x, suffix)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = rows * assets
+    return {"stage": stage, "rows": rows, "assets": assets, "seconds": best,
+            "rows_per_s": total / best if best > 0 else None,
+            "ns_per_row": best / total * 1e9, "peak_mib": peak / 2**20}
+
+def case_key(result: dict) -> str:
+    return f"{result['stage']}|{result['rows']}|{result['assets']}"
+
+def compare(results, baselines: dict):
+    """Return a list of regression messages against stored baselines."""
+    failures = []
+    for r in results:
+        base = baselines.get(case_key(r))
+        if base is None:
+            continue
+        if (base["seconds"] >= MIN_BASELINE_SECONDS
+                and r["seconds"] > base["seconds"] * (1 + TIME_TOLERANCE)):
+            failures.append(f"{case_key(r)}: {r['seconds']:.4f}s vs baseline {base['seconds']:.4f}s")
+        if r["peak_mib"] > base["peak_mib"] * (1 + MEMORY_TOLERANCE) + 1:
+            failures.append(f"{case_key(r)}: {r['peak_mib']:.1f} MiB vs baseline "
+                            f"{base['peak_mib']:.1f} MiB")
+    return failures
+
+def print_scaling(results):
+    """ns/row per stage as rows grow; the stage whose cost per row climbs first breaks first."""
+    sizes = sorted({r["rows"] for r in results})
+    print(f"{'stage':<26}" + "".join(f"{n:>14,}" for n in sizes) + "   (ns/row, peak MiB)")
+    for stage in STAGES:
+        cells = {r["rows"]: r for r in results if r["stage"] == stage}
+        if not cells:
+            continue
+        line = "".join(f"{cells[n]['ns_per_row']:>8.0f} {cells[n]['peak_mib']:>5.0f}" if n in cells
+                       else f"{'-':>14}" for n in sizes)
+        print(f"{stage:<26}{line}")
+
+def comparisons(results) -> list:
+    """Time and peak-memory change for every COMPARISONS pair measured on the same case."""
+    cells = {case_key(r): r for r in results}
+    out = []
+    for before, after in COMPARISONS:
+        for r in results:
+            if r["stage"] != after:
+                continue
+            base = cells.get(case_key({**r, "stage": before}))
+            if base is None:
+                continue
+            out.append({"before": before, "after": after, "rows": r["rows"], "assets": r["assets"],
+                        "speedup": base["seconds"] / r["seconds"] if r["seconds"] > 0 else None,
+                        "peak_mib_before": base["peak_mib"], "peak_mib_after": r["peak_mib"],
+                        "memory_reduction": 1 - r["peak_mib"] / base["peak_mib"]
+                                            if base["peak_mib"] > 0 else None})
+    return out
+
+def print_comparisons(changes):
+    for c in changes:
+        print(f"📉 {c['after']} vs {c['before']} rows={c['rows']:,} assets={c['assets']}: "
+              f"peak {c['peak_mib_before']:.1f} → {c['peak_mib_after']:.1f} MiB "
+              f"({c['memory_reduction']:.0%} less), {c['speedup']:.2f}x faster")
+
+# ---------- RUNNER ----------
+def run_benchmarks(rows=DEFAULT_ROWS, assets=DEFAULT_ASSETS, stages=None,
+                   repeats: int = REPEATS, save_baseline: bool = False) -> int:
+    """
+    Measure every stage × rows × assets case, write REPORT_PATH and
+    compare with BASELINE_PATH. Returns the number of regressions.
+    """
+    stages = list(STAGES) if stages is None else stages
+    results = []
+    for stage in stages:
+        for n_assets in assets:
+            for n_rows in rows:
+                if n_rows > STAGE_MAX_ROWS.get(stage, float("inf")):
+                    continue
+                r = measure(stage, n_rows, n_assets, repeats)
+                results.append(r)
+                print(f"⏱️  {stage:<26} rows={n_rows:>11,} assets={n_assets:>3} "
+                      f"{r['seconds']:9.4f}s {r['rows_per_s']:>14,.0f} rows/s {r['peak_mib']:8.1f} MiB")
+
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    report = {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              "host": platform.node(), "python": platform.python_version(), "results": results,
+              "comparisons": comparisons(results)}
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Report written to {REPORT_PATH}")
+    print_scaling(results)
+    print_comparisons(report["comparisons"])
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baselines = json.load(f)
+    if save_baseline:
+        baselines.update({case_key(r): {"seconds": r["seconds"], "peak_mib": r["peak_mib"]}
+                          for r in results})
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"📌 Baselines saved to {BASELINE_PATH}")
+        return 0
+
+    failures = compare(results, baselines)
+    for msg in failures:
+        print(f"❌ REGRESSION {msg}")
+    if not failures:
+        print("✅ No regressions" if baselines else "ℹ️  No baselines yet (use --save-baseline)")
+    return len(failures)
+
+def parse_sizes(spec: str):
+    """'1e3,1e5,1e8' or '1000,100000' → [1000, 100000, ...]."""
+    return [int(float(x)) for x in spec.split(",") if x.strip()]
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic OHLCV data")
+    parser.add_argument("--rows", default=None,
+                        help="comma-separated rows per asset, e.g. 1e3,1e6,1e8 (overrides --tier)")
+    parser.add_argument("--tier", choices=list(SIZE_TIERS), default="default",
+                        help="row sizes to run: default up to 1e6, large adds 1e7, full adds 1e8 "
+                             "(default: %(default)s)")
+    parser.add_argument("--assets", default="1",
+                        help="comma-separated asset counts, e.g. 1,50,500")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma-separated stages (default: all)")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="best-of timing runs")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baselines")
+    args = parser.parse_args()
+    rows = parse_sizes(args.rows) if args.rows else SIZE_TIERS[args.tier]
+    sys.exit(1 if run_benchmarks(rows, parse_sizes(args.assets),
+                                 args.stages.split(","), args.repeats,
+                                 args.save_baseline) else 0)
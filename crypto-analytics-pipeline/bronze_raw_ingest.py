@@ -1,10 +1,10 @@
-import yfinance as yf                          # Yahoo Finance API for downloading historical crypto data
+import market_data                             # cached, rate-limited, concurrent Yahoo Finance downloads
 import pandas as pd                            # pandas for DataFrame manipulation
 from datetime import date, timedelta           # date and timedelta for date arithmetic
 from dateutil.relativedelta import relativedelta  # relativedelta for complex date offsets
-from sqlalchemy import create_engine, text      # SQLAlchemy for potential future DB use (not used below)
-import urllib                                  # urllib for URL encoding (not used below)
-import pyodbc                                  # pyodbc for ODBC database connections
+import db_writer                               # shared columnar executemany writer
+import data_quality                            # declarative, vectorized row checks
+import storage                                 # pooled storage backend (SQL Server / SQLite)
 
 # ─── CLEAN FUNCTION ───────────────────────────────────────────────
 def clean_df(df, coinlabel, coin_suffix):
@@ -18,10 +18,8 @@ def clean_df(df, coinlabel, coin_suffix):
     df = df.reset_index().rename(columns={'index': 'Date'})
     df = df.drop(columns=['index'], errors='ignore')
 
-    # 2) Remove rows where any cell matches common header patterns
-    df = df[~df.astype(str)
-        .apply(lambda row: row.str.fullmatch("Ticker|BTC-USD|ETH-USD", case=False).any(), axis=1)
-    ]
+    # 2) Remove rows where any text cell matches common header patterns
+    df, _, _ = data_quality.run_rules(df, data_quality.BRONZE_RULES)
 
     # 3) Rename columns: flatten MultiIndex and append suffix to non-Date/Coin columns
     cols = []
@@ -38,113 +36,211 @@ def clean_df(df, coinlabel, coin_suffix):
 
     return df
 
+# ─── INCREMENTAL LOAD CONFIG ──────────────────────────────────────
+FULL_HISTORY_YEARS       = 7   # lookback used on an empty table or a forced full backfill
+RESTATEMENT_OVERLAP_DAYS = 3   # days re-fetched before the watermark so Yahoo restatements are merged
+
+# ─── COLUMN MAPPING ───────────────────────────────────────────────
+def bronze_columns(prefix):
+    """
+    Return (table_cols, frame_cols) for a bronze table, in insert order.
+      - table_cols: SQL column names
+      - frame_cols: matching columns of the cleaned DataFrame
+    """
+    table_cols = [
+        "PriceDate",
+        f"Close_{prefix}", f"High_{prefix}", f"Low_{prefix}", f"Open_{prefix}",
+        f"Volume_{prefix}", "Coin",
+    ]
+    frame_cols = ["Date"] + table_cols[1:]       # cleaned frames keep 'Date'
+    return table_cols, frame_cols
+
 # ─── REFRESH TABLE FUNCTION ───────────────────────────────────────
-def refresh_table(df_cleaned, table_name, prefix):
+def refresh_table(df_cleaned, table_name, prefix, chunk_size=db_writer.DEFAULT_CHUNK_SIZE,
+                  strict=False):
     """
-    Truncate the target table and bulk-insert cleaned rows.
+    Truncate the target table and bulk-insert cleaned rows (full backfill).
       - df_cleaned: cleaned DataFrame
       - table_name: SQL table to refresh (raw_eth_prices_bnz or raw_btc_prices_bnz)
       - prefix: 'ETH' or 'BTC' to choose columns and coin logic
+      - strict: re-raise a failed write instead of only reporting it
     """
-    # 1. Truncate existing data
-    cursor.execute(f"TRUNCATE TABLE {table_name}")
-    print(f"🗑️  Truncated {table_name}")
-
-    # 2. Prepare INSERT SQL and rows list
-    if prefix == "ETH":
-        insert_sql = f"""
-        INSERT INTO {table_name}
-            (PriceDate, Close_ETH, High_ETH, Low_ETH, Open_ETH, Volume_ETH, Coin)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        rows = [
-            (
-                row["Date"],                    # date column
-                float(row["Close_ETH"]),        # closing price
-                float(row["High_ETH"]),         # high price
-                float(row["Low_ETH"]),          # low price
-                float(row["Open_ETH"]),         # open price
-                int(row["Volume_ETH"]),         # volume
-                row["Coin"],                    # coin label
-            )
-            for _, row in df_cleaned.iterrows()
-        ]
-    else:  # BTC case
-        insert_sql = f"""
-        INSERT INTO {table_name}
-            (PriceDate, Close_BTC, High_BTC, Low_BTC, Open_BTC, Volume_BTC, Coin)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        rows = [
-            (
-                row["Date"],                    # date column
-                float(row["Close_BTC"]),        # closing price
-                float(row["High_BTC"]),         # high price
-                float(row["Low_BTC"]),          # low price
-                float(row["Open_BTC"]),         # open price
-                int(row["Volume_BTC"]),         # volume
-                row["Coin"],                    # coin label
-            )
-            for _, row in df_cleaned.iterrows()
-        ]
-
-    # 3. Bulk insert and handle errors
+    table_cols, frame_cols = bronze_columns(prefix)
     try:
-        cursor.executemany(insert_sql, rows)  # execute batch insert
-        conn.commit()                         # commit transaction
-        print(f"✅ Inserted {len(rows):,} rows into {table_name}")
+        n = storage.get_backend().replace_table(
+            table_name, df_cleaned, table_cols, frame_cols,
+            int_cols=[f"Volume_{prefix}"], chunk_size=chunk_size,
+        )
+        print(f"✅ Swapped in {n:,} rows into {table_name}")
     except Exception as e:
-        conn.rollback()                       # rollback on error
         print(f"❌ Failed to insert into {table_name}: {e}")
+        if strict:
+            raise
 
-# ─── MAIN ENTRY POINT ─────────────────────────────────────────────
-def main():
-    # Set Date Range 
-    today = date.today()                           # get today's date
-    start_date = (today - relativedelta(years=7)).strftime("%Y-%m-%d")  # seven years ago, formatted
-    end_date   = (today - timedelta(days=1)).strftime("%Y-%m-%d")       # yesterday, formatted
+# ─── WATERMARK LOOKUP ─────────────────────────────────────────────
+def get_watermark(table_name):
+    """
+    Return the latest PriceDate already loaded into table_name,
+    or None when the table is empty.
+    """
+    return storage.get_backend().max_date(table_name, "PriceDate")
+
+# ─── LOAD BRONZE TABLE ────────────────────────────────────────────
+def load_bronze_table(table_name, prefix):
+    """
+    Read a bronze table back as a PriceDate-keyed frame (used once to seed
+    the in-memory history when no cached bronze output exists yet).
+    """
+    cols, _ = bronze_columns(prefix)
+    return storage.get_backend().read_table(table_name, cols)
+
+# ─── MERGE TABLE FUNCTION ─────────────────────────────────────────
+def merge_table(df_cleaned, table_name, prefix, chunk_size=db_writer.DEFAULT_CHUNK_SIZE,
+                strict=False):
+    """
+    Upsert cleaned rows into the target table by its (PriceDate, Coin) key.
+    Existing days in the restatement overlap are updated, new days are inserted,
+    and nothing else in the table is touched. strict: as in refresh_table.
+    """
+    if df_cleaned.empty:
+        print(f"⏭️  No new rows for {table_name}")
+        return
+
+    table_cols, frame_cols = bronze_columns(prefix)
+    try:
+        n = storage.get_backend().merge_frame(
+            table_name, df_cleaned, table_cols, key_cols=["PriceDate", "Coin"],
+            frame_cols=frame_cols, int_cols=[f"Volume_{prefix}"],
+            timestamp_col="RetrievedAt", chunk_size=chunk_size,
+        )
+        print(f"✅ Merged {n:,} rows into {table_name}")
+    except Exception as e:
+        print(f"❌ Failed to merge into {table_name}: {e}")
+        if strict:
+            raise
+
+# ─── BRONZE TARGETS ───────────────────────────────────────────────
+BRONZE_TARGETS = [
+    # (ticker, coin label, suffix, bronze table)
+    ("ETH-USD", "Ethereum", "ETH", "raw_eth_prices_bnz"),
+    ("BTC-USD", "Bitcoin",  "BTC", "raw_btc_prices_bnz"),
+]
+
+# ─── FETCH WINDOW ─────────────────────────────────────────────────
+def fetch_window(watermark=None):
+    """
+    Return (start_date, end_date) strings for yf.download, or None when
+    there is nothing new to fetch.
+      - watermark=None: full FULL_HISTORY_YEARS backfill
+      - watermark=date: the days after it, minus RESTATEMENT_OVERLAP_DAYS
+    """
+    today = date.today()                                              # get today's date
+    history_start = today - relativedelta(years=FULL_HISTORY_YEARS)   # full backfill start
+    end_date = (today - timedelta(days=1)).strftime("%Y-%m-%d")       # yesterday, formatted
+    if watermark is None:
+        start = history_start
+    else:
+        start = max(history_start, watermark - timedelta(days=RESTATEMENT_OVERLAP_DAYS))
+    start_date = start.strftime("%Y-%m-%d")
+    if start_date >= end_date:
+        return None
+    return start_date, end_date
+
+# ─── FETCH COINS ──────────────────────────────────────────────────
+def fetch_coins(targets):
+    """
+    Download and clean several tickers concurrently through market_data
+    (rate limit, retries and the on-disk cache live there).
+      - targets: (ticker, coin_label, suffix, watermark) tuples
+    Returns {suffix: cleaned DataFrame} (empty when there is nothing new).
+    """
+    out, requests, wanted = {}, [], []
+    for ticker, coin_label, suffix, watermark in targets:
+        window = fetch_window(watermark)
+        if window is None:
+            print(f"⏭️  {ticker} is up to date (watermark {watermark})")
+            out[suffix] = pd.DataFrame()
+            continue
+        start_date, end_date = window
+        print(f"📥 {ticker}: fetching {start_date} → {end_date} (watermark {watermark})")
+        requests.append((ticker, start_date, end_date, "1d"))
+        wanted.append((ticker, coin_label, suffix))
 
     # Download Data 
-    btc_df = yf.download("BTC-USD", start=start_date, end=end_date, interval="1d")  # daily BTC data
-    eth_df = yf.download("ETH-USD", start=start_date, end=end_date, interval="1d")  # daily ETH data
-
-    # Add 'Coin' Column 
-    btc_df['Coin'] = 'Bitcoin'                    # label BTC rows
-    eth_df['Coin'] = 'Ethereum'                   # label ETH rows
-
-    # Inspect initial DataFrames
-    print(btc_df.info())                           # show structure, dtypes, non-null counts for BTC
-    print(eth_df.describe())                       # statistical summary for ETH
-
-    # Apply Cleaning 
-    btc_df_cleaned = clean_df(btc_df, "Bitcoin", "BTC")   # clean BTC DataFrame
-    eth_df_cleaned = clean_df(eth_df, "Ethereum", "ETH")  # clean ETH DataFrame
-
-    # Save Cleaned CSVs 
-    btc_df_cleaned.to_csv("btc_cleaned_final.csv", index=False)  # export BTC to CSV
-    eth_df_cleaned.to_csv("eth_cleaned_final.csv", index=False)  # export ETH to CSV
-    print("\n✅ Cleaned CSVs saved without index columns.")
-
-    # Connect (Windows Auth) to SQL Server Crypto_Analytics database
-    global conn, cursor
-    conn = pyodbc.connect(
-        "Driver={ODBC Driver 17 for SQL Server};"  # specify ODBC driver
-        "Server=KRISHNA\\KVSTG;"                  # SQL Server instance
-        "Database=Crypto_Analytics;"              # target database
-        "Trusted_Connection=yes;"                 # use Windows authentication
-        "Encrypt=yes;"
-        "TrustServerCertificate=yes;"
-    )
-    cursor = conn.cursor()                        # create a cursor for executing SQL
-    cursor.fast_executemany = True                # enable fast executemany for bulk inserts
-
-    # Execute refresh for both layers
-    refresh_table(eth_df_cleaned, "raw_eth_prices_bnz", "ETH")  # load ETH table
-    refresh_table(btc_df_cleaned, "raw_btc_prices_bnz", "BTC")  # load BTC table
-
-    # cleanup
-    cursor.close()  # close cursor
-    conn.close()    # close DB connection
+    for (ticker, coin_label, suffix), raw_df in zip(wanted, market_data.fetch_many(requests)):
+        if raw_df.empty:
+            print(f"⏭️  No data returned for {ticker}")
+            out[suffix] = pd.DataFrame()
+            continue
+
+        # Add 'Coin' Column and apply cleaning
+        raw_df['Coin'] = coin_label
+        out[suffix] = clean_df(raw_df, coin_label, suffix)
+    return out
+
+def fetch_coin(ticker, coin_label, suffix, watermark=None):
+    """
+    Download and clean one ticker for the window implied by watermark.
+    Returns the cleaned DataFrame (empty when there is nothing new).
+    """
+    return fetch_coins([(ticker, coin_label, suffix, watermark)])[suffix]
+
+# ─── PERSIST ONE COIN ─────────────────────────────────────────────
+def persist_coin(df_cleaned, table_name, suffix, full_reload, strict=False):
+    """
+    Write freshly fetched rows: truncate/reload on a full backfill,
+    otherwise merge them by (PriceDate, Coin).
+      - strict: raise when the write fails (pipeline runs), so the cached
+        history never gets ahead of the table unnoticed
+    """
+    if df_cleaned.empty:
+        return
+    if full_reload:
+        refresh_table(df_cleaned, table_name, suffix, strict=strict)
+    else:
+        merge_table(df_cleaned, table_name, suffix, strict=strict)
+
+# ─── TABLE-SHAPED FRAME ───────────────────────────────────────────
+def to_table_frame(df_cleaned):
+    """
+    Rename a cleaned frame's 'Date' to 'PriceDate' so it has the same
+    shape as a row set read back from the bronze table.
+    """
+    return df_cleaned.rename(columns={"Date": "PriceDate"})
+
+# ─── MAIN ENTRY POINT ─────────────────────────────────────────────
+def main(full_refresh: bool = False):
+    """
+    Load BTC and ETH daily bars into the bronze tables.
+      - full_refresh=False: fetch only the days after each table's watermark
+        (minus RESTATEMENT_OVERLAP_DAYS) and merge them by (PriceDate, Coin)
+      - full_refresh=True: re-download FULL_HISTORY_YEARS and truncate/reload
+    """
+    watermarks = {table_name: None if full_refresh else get_watermark(table_name)
+                  for _, _, _, table_name in BRONZE_TARGETS}
+    fetched = fetch_coins([(ticker, coin_label, suffix, watermarks[table_name])
+                           for ticker, coin_label, suffix, table_name in BRONZE_TARGETS])
+    for ticker, coin_label, suffix, table_name in BRONZE_TARGETS:
+        watermark = watermarks[table_name]
+        df_cleaned = fetched[suffix]
+
+        # Save Cleaned CSV 
+        if not df_cleaned.empty:
+            df_cleaned.to_csv(f"{suffix.lower()}_cleaned_final.csv", index=False)
+
+        # Full reload or incremental merge
+        persist_coin(df_cleaned, table_name, suffix, full_reload=watermark is None)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Bronze layer: Yahoo Finance → raw_*_bnz")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="re-download the full history and truncate/reload the bronze tables")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.BACKEND,
+                        help="storage backend (default: %(default)s)")
+    parser.add_argument("--source", choices=sorted(market_data.SOURCES), default=market_data.SOURCE,
+                        help="market data source; 'fake' needs no network (default: %(default)s)")
+    args = parser.parse_args()
+    storage.set_backend(args.backend)
+    market_data.set_fetcher(args.source)
+    main(full_refresh=args.full_refresh)
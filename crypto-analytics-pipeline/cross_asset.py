@@ -0,0 +1,170 @@
+import hashlib                             # digest of the return history already written
+import numpy as np                         # NumPy for pairwise prefix sums
+import pandas as pd                        # pandas for the aligned return matrix
+
+import storage                             # pooled storage backend
+import trading_calendar                    # imputed calendar days carry no return
+
+# ---------- CONFIG ----------
+CROSS_TABLE = "gold_cross_asset_stats"
+WINDOWS = (30, 90, 365)                    # rolling windows in days
+MIN_COVERAGE = 0.9                         # share of a window both assets must have returns for
+PAIR_BLOCK = 256                           # pairs per vectorized block (bounds memory)
+KEY_COLS = ["PriceDate", "AssetA", "AssetB"]
+
+def stat_columns() -> list:
+    return [f"{stat}{w}" for w in WINDOWS for stat in ("Corr", "Cov", "Beta")]
+
+CROSS_COLS = KEY_COLS + stat_columns()
+
+# ---------- RETURN MATRIX ----------
+def return_matrix(gold: dict) -> pd.DataFrame:
+    """
+    Daily log returns of every coin joined on the date index: one column
+    per suffix (sorted), NaN where a coin has no row that day or the day
+    was imputed by the trading calendar.
+    """
+    cols = {suffix: pd.Series(trading_calendar.mask_imputed(df, f"LogReturn_{suffix}"),
+                              index=pd.to_datetime(df["PriceDate"]))
+            for suffix, df in gold.items() if not df.empty}
+    return pd.DataFrame(cols).sort_index().sort_index(axis=1)
+
+def return_matrix_long(gold_long: pd.DataFrame) -> pd.DataFrame:
+    """return_matrix for the long-format universe gold (Asset, PriceDate, LogReturn)."""
+    returns = gold_long.assign(LogReturn=trading_calendar.mask_imputed(gold_long, "LogReturn"))
+    wide = returns.pivot_table(index="PriceDate", columns="Asset", values="LogReturn",
+                               aggfunc="last")
+    wide.index = pd.to_datetime(wide.index)
+    return wide.sort_index().sort_index(axis=1)
+
+def digest(returns: pd.DataFrame) -> str:
+    """Hash of the dates, assets and returns, to notice restated history."""
+    h = hashlib.sha1()
+    h.update(",".join(returns.columns).encode())
+    h.update(returns.index.to_numpy(dtype="datetime64[ns]").tobytes())
+    h.update(np.ascontiguousarray(returns.to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+# ---------- ROLLING PAIR STATISTICS ----------
+def window_diff(prefix: np.ndarray, w: int, first: int) -> np.ndarray:
+    """
+    Sum over the last w rows for every row from `first` on, from a
+    prefix-sum array with a leading zero row (rows with fewer than w
+    predecessors sum what there is).
+    """
+    out = prefix[first + 1:].copy()
+    short = max(0, w - first - 1)                  # rows whose window starts before row 0
+    if short >= len(out):                          # history shorter than the window
+        return out
+    out[short:] -= prefix[first + 1 + short - w:len(prefix) - w]
+    return out
+
+def pair_block_stats(x: np.ndarray, v: np.ndarray, ia: np.ndarray, ib: np.ndarray,
+                     first: int) -> dict:
+    """
+    Rolling Corr / Cov / Beta for one block of pairs (columns ia[k], ib[k]).
+    x: returns with NaN → 0, v: 1.0 where a return exists; rows before
+    `first` are lookback only. Every sum is a
+    cumulative sum over time, so each window costs one subtraction per row
+    (O(n) in the series length, whatever the window), for all pairs at once.
+    Beta{w} = Cov / Var(A): the beta of AssetB on AssetA.
+    """
+    xa, xb, va, vb = x[:, ia], x[:, ib], v[:, ia], v[:, ib]
+    both = va * vb
+    sums = {}
+    for name, values in (("n", both), ("a", xa * vb), ("b", xb * va),
+                         ("aa", xa * xa * vb), ("bb", xb * xb * va), ("ab", xa * xb)):
+        prefix = np.zeros((values.shape[0] + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=prefix[1:])
+        sums[name] = prefix
+
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for w in WINDOWS:
+            n, a, b, aa, bb, ab = (window_diff(sums[k], w, first)
+                                   for k in ("n", "a", "b", "aa", "bb", "ab"))
+            enough = n >= max(2, np.ceil(w * MIN_COVERAGE))
+            cov = (ab - a * b / n) / (n - 1)
+            var_a = (aa - a * a / n) / (n - 1)
+            var_b = (bb - b * b / n) / (n - 1)
+            corr = cov / np.sqrt(var_a * var_b)
+            beta = cov / var_a
+            for name, values in ((f"Corr{w}", corr), (f"Cov{w}", cov), (f"Beta{w}", beta)):
+                values[~enough] = np.nan
+                out[name] = values
+    return out
+
+def rolling_pair_stats(returns: pd.DataFrame, since=None) -> pd.DataFrame:
+    """
+    Rolling correlation, covariance and beta over WINDOWS for every pair
+    of columns (AssetA < AssetB), as one row per (PriceDate, pair).
+      - since: only dates after it are returned; the computation then only
+        covers those dates plus the longest window before them
+    Pairs are processed PAIR_BLOCK at a time (rows come out grouped by
+    block, then date); rows where even the shortest window has too few
+    returns are dropped.
+    """
+    assets = list(returns.columns)
+    if len(assets) < 2 or returns.empty:
+        return pd.DataFrame(columns=CROSS_COLS)
+    if since is not None:
+        first = int(np.searchsorted(returns.index.to_numpy(), np.datetime64(since), "right"))
+        returns = returns.iloc[max(0, first - max(WINDOWS)):]
+        first = min(first, max(WINDOWS))
+    else:
+        first = 0
+    dates = returns.index[first:]
+    if not len(dates):
+        return pd.DataFrame(columns=CROSS_COLS)
+
+    raw = returns.to_numpy(dtype=float)
+    v = np.isfinite(raw).astype(float)
+    x = np.where(v > 0, raw, 0.0)
+    ia_all, ib_all = np.triu_indices(len(assets), 1)
+    names = np.asarray(assets, dtype=object)
+
+    frames = []
+    for start in range(0, len(ia_all), PAIR_BLOCK):
+        ia, ib = ia_all[start:start + PAIR_BLOCK], ib_all[start:start + PAIR_BLOCK]
+        stats = pair_block_stats(x, v, ia, ib, first)
+        block = pd.DataFrame({
+            "PriceDate": np.repeat(dates.to_numpy(), len(ia)),
+            "AssetA":    np.tile(names[ia], len(dates)),
+            "AssetB":    np.tile(names[ib], len(dates)),
+            **{k: arr.ravel() for k, arr in stats.items()},
+        })
+        frames.append(block[block[f"Corr{min(WINDOWS)}"].notna()])
+    return pd.concat(frames, ignore_index=True)[CROSS_COLS]
+
+# ---------- INCREMENTAL DRIVER ----------
+def compute_cross_asset(returns: pd.DataFrame, state=None):
+    """
+    Rows to write for the return matrix. When state (from the last run)
+    matches the history up to its last date and the same assets, only
+    dates after it are computed; otherwise every date is.
+    Returns (rows, new state, full: True when every date was recomputed).
+    """
+    since = None
+    if state is not None and state.get("assets") == list(returns.columns):
+        known = returns[returns.index <= state["last_date"]]
+        if len(known) and digest(known) == state["digest"]:
+            since = state["last_date"]
+    rows = rolling_pair_stats(returns, since)
+    new_state = None
+    if not returns.empty:
+        new_state = {"assets": list(returns.columns), "last_date": returns.index[-1],
+                     "digest": digest(returns)}
+    return rows, new_state, since is None
+
+# ---------- PERSIST ----------
+def write_cross_asset(rows: pd.DataFrame):
+    """
+    Upsert by (PriceDate, AssetA, AssetB), so the BTC/ETH orchestrator and
+    the multi-asset universe can share the table without removing each
+    other's pairs.
+    """
+    if rows.empty:
+        print(f"⏭️  No new rows for {CROSS_TABLE}")
+        return
+    n = storage.get_backend().merge_frame(CROSS_TABLE, rows, CROSS_COLS, key_cols=KEY_COLS)
+    print(f"✅ Merged {n:,} rows into {CROSS_TABLE}")
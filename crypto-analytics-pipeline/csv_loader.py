@@ -0,0 +1,137 @@
+import os                                  # dataset paths
+import glob                                # CSV discovery
+import time                                # wall-clock timing
+import pandas as pd                        # chunked CSV reading
+
+import bronze_raw_ingest                   # BRONZE_TARGETS and bronze column mapping
+import db_writer                           # DEFAULT_CHUNK_SIZE for batched inserts
+import pipeline_orchestrator               # bronze stage cache
+import storage                             # pooled storage backend
+
+# ---------- CONFIG ----------
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASETS = {
+    "raw":     os.path.join(REPO_ROOT, "BTC_ETH_USD_DATA"),   # 9/17/2014 dates
+    "cleaned": os.path.join(REPO_ROOT, "Cleaned_files"),      # 2014-09-17 dates
+}
+CSV_CHUNK_ROWS = 100_000                   # rows parsed per read_csv chunk
+
+# explicit dtypes: no type inference pass, and Volume may be written as 21056800.0
+CSV_DTYPES = {
+    "Date":   "string",
+    "Close":  "float64",
+    "High":   "float64",
+    "Low":    "float64",
+    "Open":   "float64",
+    "Volume": "float64",
+    "Ticker": "category",
+}
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d")    # BTC_ETH_USD_DATA, Cleaned_files
+
+# ---------- PARSING ----------
+def date_format(sample: str) -> str:
+    """Pick the strptime format of a CSV date from one sample value."""
+    return DATE_FORMATS[0] if "/" in sample else DATE_FORMATS[1]
+
+def read_price_csv(path: str, chunk_rows: int = CSV_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Read one Date/Close/High/Low/Open/Volume/Ticker CSV in chunks.
+    Dates are parsed with one explicit format per chunk (vectorized, no
+    per-value inference); rows whose date does not parse are dropped.
+    """
+    parts = []
+    for chunk in pd.read_csv(path, dtype=CSV_DTYPES, usecols=list(CSV_DTYPES),
+                             chunksize=chunk_rows):
+        if chunk.empty:
+            continue
+        fmt = date_format(str(chunk["Date"].iloc[0]))
+        chunk["Date"] = pd.to_datetime(chunk["Date"], format=fmt, errors="coerce")
+        parts.append(chunk.dropna(subset=["Date"]))
+    if not parts:
+        return pd.DataFrame(columns=list(CSV_DTYPES))
+    return pd.concat(parts, ignore_index=True)
+
+def to_bronze_frame(df: pd.DataFrame, coin_label: str, suffix: str) -> pd.DataFrame:
+    """
+    Shape CSV rows like bronze_raw_ingest.clean_df output (Date, Close_X,
+    High_X, Low_X, Open_X, Volume_X, Coin), one row per date (last wins).
+    """
+    out = df.drop(columns=["Ticker"]).rename(
+        columns={c: f"{c}_{suffix}" for c in ("Close", "High", "Low", "Open", "Volume")})
+    out["Coin"] = coin_label
+    out = out.drop_duplicates(subset=["Date"], keep="last")
+    return out.sort_values("Date").reset_index(drop=True)
+
+# ---------- LOADER ----------
+def load_csvs(paths, merge: bool = False, chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE,
+              update_cache: bool = True) -> dict:
+    """
+    Bulk-load historical CSVs into the bronze tables.
+      - paths: CSV files; rows are routed to a bronze table by their Ticker
+      - merge=False: truncate and reload each table touched (fresh seed);
+        merge=True: upsert by (PriceDate, Coin), keeping other rows
+      - update_cache: also replace the cached bronze output so the next
+        orchestrator run continues from the seeded history
+    Inserts go through the backend's batched executemany (chunk_size rows
+    per batch). A failed write raises before the cache is touched; the
+    cache then records each seeded coin's backend in 'bronze_tables', as
+    the orchestrator's bronze stage does. Returns {suffix: bronze
+    table-shaped frame}.
+    """
+    t0 = time.perf_counter()
+    frames = [read_price_csv(p) for p in paths]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(CSV_DTYPES))
+    print(f"📄 Parsed {len(data):,} rows from {len(frames)} file(s) "
+          f"in {time.perf_counter() - t0:.2f}s")
+
+    loaded, tables = {}, {}
+    by_ticker = dict(tuple(data.groupby(data["Ticker"].astype(str), sort=False)))
+    for ticker, coin_label, suffix, table_name in bronze_raw_ingest.BRONZE_TARGETS:
+        if ticker not in by_ticker:
+            continue
+        bronze = to_bronze_frame(by_ticker[ticker], coin_label, suffix)
+        if merge:
+            bronze_raw_ingest.merge_table(bronze, table_name, suffix, chunk_size, strict=True)
+        else:
+            bronze_raw_ingest.refresh_table(bronze, table_name, suffix, chunk_size, strict=True)
+        loaded[suffix], tables[suffix] = bronze_raw_ingest.to_table_frame(bronze), table_name
+
+    if update_cache and loaded:
+        backend_name = storage.get_backend().name
+        written = pipeline_orchestrator.load_cached("bronze_tables") or {}
+        cached = None if not merge else pipeline_orchestrator.load_cached("bronze")
+        history = dict(cached or {})
+        for suffix, frame in loaded.items():
+            if not merge or (suffix in history and written.get(suffix) == backend_name):
+                history[suffix] = pipeline_orchestrator.merge_history(history.get(suffix), frame)
+            else:
+                # the cached history was not written to this table: read the merged table back
+                history[suffix] = bronze_raw_ingest.load_bronze_table(tables[suffix], suffix)
+            written[suffix] = backend_name
+        pipeline_orchestrator.save_cached("bronze", history)
+        pipeline_orchestrator.save_cached("bronze_tables", written)
+    print(f"⏱️  CSV seed finished in {time.perf_counter() - t0:.2f}s")
+    return loaded
+
+def dataset_paths(name: str):
+    """CSV files of a named dataset in DATASETS."""
+    return sorted(glob.glob(os.path.join(DATASETS[name], "*.csv")))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Seed the bronze tables from historical CSVs")
+    parser.add_argument("paths", nargs="*", help="CSV files (default: the --dataset files)")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="cleaned",
+                        help="bundled dataset to load when no paths are given (default: %(default)s)")
+    parser.add_argument("--merge", action="store_true",
+                        help="upsert into existing tables instead of truncate-and-reload")
+    parser.add_argument("--chunk-size", type=int, default=db_writer.DEFAULT_CHUNK_SIZE,
+                        help="rows per insert batch (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not update the orchestrator's bronze cache")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.BACKEND,
+                        help="storage backend (default: %(default)s)")
+    args = parser.parse_args()
+    storage.set_backend(args.backend)
+    load_csvs(args.paths or dataset_paths(args.dataset), merge=args.merge,
+              chunk_size=args.chunk_size, update_cache=not args.no_cache)
@@ -0,0 +1,195 @@
+import numpy as np                         # NumPy for vectorized masks
+import pandas as pd                        # pandas for DataFrame operations
+
+import storage                             # pooled storage backend
+
+# ---------- CONFIG ----------
+COUNTS_TABLE     = "dq_rule_counts"
+QUARANTINE_TABLE = "dq_quarantine"
+COUNTS_COLS      = ["Layer", "Coin", "Rule", "Action", "Rows"]
+QUARANTINE_COLS  = ["Layer", "Coin", "PriceDate", "Rule", "Action"]
+
+# Rule sets are plain data: each rule names a check kind from CHECKS plus its
+# parameters; "{s}" in a column name is replaced by the coin suffix.
+#   action "reject": failing rows are removed and quarantined
+#   action "flag":   failing rows are kept, counted and quarantined for review
+PRICE_COLS = ["Open_{s}", "High_{s}", "Low_{s}", "Close_{s}"]
+
+BRONZE_RULES = [
+    {"name": "header_rows", "check": "pattern", "pattern": "Ticker|BTC-USD|ETH-USD",
+     "action": "reject"},
+]
+
+SILVER_RULES = [
+    {"name": "positive_prices", "check": "positive", "columns": PRICE_COLS, "action": "reject"},
+    {"name": "positive_volume", "check": "positive", "columns": ["Volume_{s}"], "action": "reject"},
+    {"name": "high_ge_open_close", "check": "high_bound", "high": "High_{s}",
+     "columns": ["Open_{s}", "Close_{s}"], "action": "reject"},
+    {"name": "low_le_open_close", "check": "low_bound", "low": "Low_{s}",
+     "columns": ["Open_{s}", "Close_{s}"], "action": "reject"},
+    {"name": "duplicate_date", "check": "duplicate", "keys": ["PriceDate"], "action": "reject"},
+    {"name": "date_gap", "check": "gap", "date": "PriceDate", "max_days": 1, "action": "flag"},
+    {"name": "outlier_return", "check": "outlier_return", "price": "Close_{s}", "z_max": 10.0,
+     "action": "flag"},
+]
+
+# intraday bars use the long column names; max_gap is set per interval
+INTRADAY_PRICE_COLS = ["OpenPrice", "HighPrice", "LowPrice", "ClosePrice"]
+
+def intraday_rules(bar: str):
+    """SILVER_RULES for intraday bars of one interval (e.g. '1h', '1min')."""
+    return [
+        {"name": "positive_prices", "check": "positive", "columns": INTRADAY_PRICE_COLS,
+         "action": "reject"},
+        {"name": "negative_volume", "check": "non_negative", "columns": ["Volume"],
+         "action": "reject"},
+        {"name": "high_ge_open_close", "check": "high_bound", "high": "HighPrice",
+         "columns": ["OpenPrice", "ClosePrice"], "action": "reject"},
+        {"name": "low_le_open_close", "check": "low_bound", "low": "LowPrice",
+         "columns": ["OpenPrice", "ClosePrice"], "action": "reject"},
+        {"name": "duplicate_bar", "check": "duplicate", "keys": ["BarTime"], "action": "reject"},
+        {"name": "bar_gap", "check": "gap", "date": "BarTime", "max_gap": bar, "action": "flag"},
+        {"name": "outlier_return", "check": "outlier_return", "price": "ClosePrice",
+         "z_max": 15.0, "action": "flag"},
+    ]
+
+TOLERANCE = 1e-9                           # relative slack for High/Low vs Open/Close rounding
+
+# ---------- CHECKS ----------
+# Each check returns a boolean mask (True = row fails) aligned to df.index.
+# Row checks look at one row at a time; key and sequence checks see the rows
+# that survived the earlier phases, sorted by date for sequence checks.
+def check_pattern(df, rule, suffix):
+    """Any text cell fully matching the pattern (embedded header rows)."""
+    bad = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == object or pd.api.types.is_string_dtype(s):
+            bad |= s.astype(str).str.fullmatch(rule["pattern"], case=False).to_numpy(dtype=bool)
+    return pd.Series(bad, index=df.index)
+
+def check_positive(df, rule, suffix):
+    """Any listed column missing or <= 0."""
+    values = df[cols(rule["columns"], suffix)].apply(pd.to_numeric, errors="coerce")
+    return ~(values > 0).all(axis=1)
+
+def check_non_negative(df, rule, suffix):
+    """Any listed column missing or < 0 (zero-volume minute bars are real)."""
+    values = df[cols(rule["columns"], suffix)].apply(pd.to_numeric, errors="coerce")
+    return ~(values >= 0).all(axis=1)
+
+def check_high_bound(df, rule, suffix):
+    """High below max(Open, Close)."""
+    high = df[rule["high"].format(s=suffix)]
+    ref = df[cols(rule["columns"], suffix)].max(axis=1)
+    return high < ref * (1 - TOLERANCE)
+
+def check_low_bound(df, rule, suffix):
+    """Low above min(Open, Close)."""
+    low = df[rule["low"].format(s=suffix)]
+    ref = df[cols(rule["columns"], suffix)].min(axis=1)
+    return low > ref * (1 + TOLERANCE)
+
+def check_duplicate(df, rule, suffix):
+    """Repeated key; the first occurrence is kept."""
+    return df.duplicated(subset=cols(rule["keys"], suffix), keep="first")
+
+def check_gap(df, rule, suffix):
+    """
+    Row more than max_days (daily bars) or max_gap (a Timedelta string such
+    as '1h', for intraday bars) after the previous row.
+    """
+    dates = pd.to_datetime(df[rule["date"].format(s=suffix)])
+    if "max_gap" in rule:
+        return dates.diff().gt(pd.Timedelta(rule["max_gap"]))
+    return dates.diff().dt.days.gt(rule["max_days"])
+
+def check_outlier_return(df, rule, suffix):
+    """
+    Log return whose robust z-score (median / MAD) exceeds z_max, so the
+    threshold adapts to each asset's own volatility.
+    """
+    price = df[rule["price"].format(s=suffix)].astype(float)
+    r = np.log(price / price.shift(1))
+    med = r.median()
+    mad = (r - med).abs().median() * 1.4826
+    if not np.isfinite(mad) or mad == 0:
+        return pd.Series(False, index=df.index)
+    return ((r - med).abs() / mad).gt(rule["z_max"])
+
+# check kind → (function, phase)
+CHECKS = {
+    "pattern":        (check_pattern,        "row"),
+    "positive":       (check_positive,       "row"),
+    "non_negative":   (check_non_negative,   "row"),
+    "high_bound":     (check_high_bound,     "row"),
+    "low_bound":      (check_low_bound,      "row"),
+    "duplicate":      (check_duplicate,      "key"),
+    "gap":            (check_gap,            "sequence"),
+    "outlier_return": (check_outlier_return, "sequence"),
+}
+PHASES = ["row", "key", "sequence"]
+
+def cols(names, suffix):
+    return [n.format(s=suffix) for n in names]
+
+# ---------- ENGINE ----------
+def run_rules(df: pd.DataFrame, rules, suffix: str = "", date_col: str = "PriceDate"):
+    """
+    Apply a rule set as whole-column operations, phase by phase:
+      row → key (duplicates, first occurrence wins in input order)
+      → sequence (gaps, returns; evaluated in date order)
+    Rejected rows are dropped before the next phase, so e.g. a bad tick
+    rejected by a row rule does not create a fake outlier return.
+    Returns (clean frame in input order, {rule name: failing rows},
+    quarantine frame = failing rows + Rule + Action, first failing rule per row).
+    """
+    counts = {}
+    quarantined = []
+    keep = pd.Series(True, index=df.index)
+    seen = pd.Series(False, index=df.index)     # already quarantined under an earlier rule
+
+    for phase in PHASES:
+        phase_rules = [r for r in rules if CHECKS[r["check"]][1] == phase]
+        if not phase_rules:
+            continue
+        view = df[keep]
+        if phase == "sequence" and date_col in view.columns:
+            view = view.sort_values(date_col, kind="stable")
+        reject = pd.Series(False, index=view.index)
+        for rule in phase_rules:
+            bad = CHECKS[rule["check"]][0](view, rule, suffix).reindex(view.index, fill_value=False)
+            bad = bad.fillna(False).astype(bool)
+            counts[rule["name"]] = int(bad.sum())
+            first = bad & ~seen.loc[view.index]  # quarantine each row under its first failing rule
+            if first.any():
+                q = view[first].copy()
+                q["Rule"], q["Action"] = rule["name"], rule["action"]
+                quarantined.append(q)
+                seen.loc[first[first].index] = True
+            if rule["action"] == "reject":
+                reject |= bad
+        keep.loc[reject[reject].index] = False
+
+    quarantine = (pd.concat(quarantined) if quarantined
+                  else df.iloc[0:0].assign(Rule=pd.Series(dtype=object), Action=pd.Series(dtype=object)))
+    return df[keep], counts, quarantine
+
+def summarize(counts: dict, layer: str, coin: str, rules) -> pd.DataFrame:
+    """Per-rule counts as rows for COUNTS_TABLE."""
+    actions = {r["name"]: r["action"] for r in rules}
+    return pd.DataFrame([(layer, coin, name, actions[name], n) for name, n in counts.items()],
+                        columns=COUNTS_COLS)
+
+# ---------- PERSIST ----------
+def write_report(counts: pd.DataFrame, quarantine: pd.DataFrame):
+    """
+    Truncate and reload the rule counts and the quarantined keys. The
+    quarantine table stores (Layer, Coin, PriceDate, Rule, Action) only,
+    so it has one shape for every layer.
+    """
+    backend = storage.get_backend()
+    n = backend.replace_table(COUNTS_TABLE, counts, COUNTS_COLS, int_cols=["Rows"])
+    print(f"✅ Swapped in {n:,} rows into {COUNTS_TABLE}")
+    n = backend.replace_table(QUARANTINE_TABLE, quarantine, QUARANTINE_COLS)
+    print(f"✅ Swapped in {n:,} rows into {QUARANTINE_TABLE}")
@@ -0,0 +1,62 @@
+import numpy as np                        # NumPy for vectorized NULL masks and casts
+import pandas as pd                       # pandas for DataFrame dtype inspection
+
+# ---------- CONFIG ----------
+DEFAULT_CHUNK_SIZE = 10_000               # rows handed to each executemany call
+
+# ---------- COLUMN CONVERSION ----------
+def column_to_sql(series: pd.Series, as_int: bool = False) -> np.ndarray:
+    """
+    Convert one DataFrame column to an object array of DB-API values:
+      - datetime columns → datetime.date when every value is a whole day,
+        otherwise datetime.datetime (intraday bars) (NaT → None)
+      - as_int / integer columns → Python int (NaN/inf → None)
+      - float columns → Python float (NaN/inf → None)
+      - anything else → as-is (NaN/None → None)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        stamps = series.to_numpy(dtype="datetime64[ns]")
+        days = stamps.astype("datetime64[D]")
+        if (stamps == days).sum() == (~np.isnat(stamps)).sum():   # all midnight → DATE
+            return days.astype(object)                     # NaT becomes None
+        return stamps.astype("datetime64[us]").astype(object)
+
+    if as_int or pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        invalid = ~np.isfinite(values)                     # NaN, +inf, -inf
+        if as_int or pd.api.types.is_integer_dtype(series):
+            out = np.where(invalid, 0, values).astype(np.int64).astype(object)
+        else:
+            out = values.astype(object)
+        out[invalid] = None
+        return out
+
+    out = series.to_numpy(dtype=object, copy=True)
+    out[pd.isna(series).to_numpy()] = None
+    return out
+
+# ---------- CHUNKED ROW STREAM ----------
+def iter_row_chunks(df: pd.DataFrame, cols, int_cols=(), chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield lists of insert tuples for df[cols], chunk_size rows at a time.
+    Each chunk is converted column by column, then zipped into tuples.
+    """
+    int_cols = set(int_cols)
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        arrays = [column_to_sql(chunk[c], as_int=c in int_cols) for c in cols]
+        yield list(zip(*arrays))
+
+# ---------- EXECUTEMANY WRITER ----------
+def executemany_frame(cursor, sql: str, df: pd.DataFrame, cols, int_cols=(),
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Stream df[cols] into cursor.executemany(sql, ...) in chunks.
+    The caller owns the transaction (commit / rollback).
+    Returns the number of rows sent.
+    """
+    total = 0
+    for rows in iter_row_chunks(df, cols, int_cols, chunk_size):
+        cursor.executemany(sql, rows)
+        total += len(rows)
+    return total
@@ -0,0 +1,79 @@
+import hashlib                             # partition digests
+import pandas as pd                        # row hashing and date partitions
+
+# ---------- CONFIG ----------
+DATE_COLS = ("PriceDate", "BarTime")       # first column present picks the partition year
+WHOLE = "all"                              # partition key for frames without a date column
+
+# ---------- FINGERPRINTS ----------
+def frame_fingerprints(df: pd.DataFrame, cols=None) -> dict:
+    """
+    {year: sha1} over the rows of each year partition (the whole frame
+    under WHOLE when it has no date column). Row hashes are vectorized
+    (pd.util.hash_pandas_object); column names are part of the digest.
+      - cols: hash only these columns (default: all)
+    """
+    df = df if cols is None else df[list(cols)]
+    if df.empty:
+        return {}
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    header = ",".join(map(str, df.columns)).encode()
+    date_col = next((c for c in DATE_COLS if c in df.columns), None)
+    if date_col is None:
+        return {WHOLE: hashlib.sha1(header + rows.tobytes()).hexdigest()}
+    years = pd.to_datetime(df[date_col]).dt.year.to_numpy()
+    out = {}
+    for year in sorted(set(years.tolist())):
+        out[int(year)] = hashlib.sha1(header + rows[years == year].tobytes()).hexdigest()
+    return out
+
+def output_fingerprints(output) -> dict:
+    """
+    {asset: {partition: sha1}} for a stage output: a dict of frames keyed
+    by coin suffix (or by name, e.g. rollup 'coins' / 'pairs'), or one frame
+    (stored under WHOLE).
+    """
+    if isinstance(output, pd.DataFrame):
+        return {WHOLE: frame_fingerprints(output)}
+    if isinstance(output, dict):
+        return {key: frame_fingerprints(df) for key, df in output.items()
+                if isinstance(df, pd.DataFrame)}
+    return {}
+
+def changed_assets(old: dict, new: dict) -> dict:
+    """
+    {asset: set of partitions that differ} between two output_fingerprints
+    maps; partitions that appeared or disappeared count as changed. Assets
+    identical in both are left out, so an empty dict means nothing changed.
+    """
+    out = {}
+    for asset, parts in new.items():
+        before = old.get(asset, {})
+        changed = {p for p in set(parts) | set(before) if parts.get(p) != before.get(p)}
+        if changed:
+            out[asset] = changed
+    for asset in set(old) - set(new):
+        out[asset] = set(old[asset])
+    return out
+
+# ---------- PARTITION-LEVEL WRITES ----------
+def changed_partition_rows(old_df: pd.DataFrame, new_df: pd.DataFrame,
+                           key: str = "PriceDate"):
+    """
+    Rows of new_df in the year partitions whose content differs from
+    old_df, compared on the columns both frames share. Returns None when
+    an upsert of those rows cannot reproduce new_df (a partition or key of
+    old_df is gone), i.e. when the table needs a full reload.
+    """
+    cols = [c for c in new_df.columns if c in old_df.columns]
+    old_fp, new_fp = frame_fingerprints(old_df, cols), frame_fingerprints(new_df, cols)
+    if set(old_fp) - set(new_fp):
+        return None
+    changed = [year for year, digest in new_fp.items() if old_fp.get(year) != digest]
+    years = pd.to_datetime(new_df[key]).dt.year
+    old_years = pd.to_datetime(old_df[key]).dt.year
+    old_keys = pd.to_datetime(old_df.loc[old_years.isin(changed), key])
+    rows = new_df[years.isin(changed).to_numpy()]
+    if not old_keys.isin(pd.to_datetime(rows[key])).all():
+        return None
+    return rows
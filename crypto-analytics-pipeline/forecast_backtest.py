@@ -0,0 +1,166 @@
+import os                                  # CPU count
+import time                                # wall-clock timing
+from concurrent.futures import ProcessPoolExecutor   # parallel origins
+import numpy as np                         # NumPy for scoring
+import pandas as pd                        # pandas for DataFrame operations
+
+import platinum_forecasting                # HORIZONS, daily_series, loaders
+import forecast_models                     # MODEL_ZOO and the platinum holdout selection
+import pipeline_orchestrator               # platinum's cached model fits
+import storage                             # pooled storage backend
+
+# ---------- CONFIG ----------
+RESULTS_TABLE = "platinum_backtest_results"
+SCORES_TABLE  = "platinum_backtest_scores"
+MIN_TRAIN_DAYS = 365                       # shortest training window at the first origin
+DEFAULT_ORIGINS = 300                      # origins per coin
+MAX_WORKERS = int(os.environ.get("CRYPTO_WORKERS", "0")) or os.cpu_count()
+
+RESULT_COLS = ["Coin", "Model", "OriginDate", "HorizonLabel", "HorizonDays", "TargetDate",
+               "LastPrice", "Forecast", "Actual"]
+SCORE_COLS  = ["Coin", "Model", "HorizonLabel", "HorizonDays", "Origins", "MAE", "MAPE",
+               "DirectionalAccuracy"]
+
+# ---------- ORIGIN SELECTION ----------
+def make_origins(n_obs: int, n_origins: int = DEFAULT_ORIGINS,
+                 min_train: int = MIN_TRAIN_DAYS) -> np.ndarray:
+    """
+    Evenly spaced origin positions (index of the last training day) between
+    min_train and the second-to-last day, so at least 'Tomorrow' is realized.
+    """
+    last = n_obs - 2
+    if last < min_train:
+        return np.array([], dtype=int)
+    return np.unique(np.linspace(min_train, last, n_origins).round().astype(int))
+
+# ---------- WORKER ----------
+_SERIES = {}                               # coin → daily series, set once per worker
+
+def _init_worker(series_by_coin: dict):
+    """Receive the price series once per process instead of once per task."""
+    global _SERIES
+    _SERIES = series_by_coin
+
+def evaluate_origin(task):
+    """
+    Refit one forecast_models.MODEL_ZOO model on data up to one origin and
+    forecast every horizon whose target date is inside the series.
+      task = (coin, model name, origin position)
+    Returns a list of RESULT_COLS tuples (empty if the fit failed).
+    """
+    coin, model, origin = task
+    ts = _SERIES[coin]
+    train = ts.iloc[:origin + 1]
+    available = {label: days for label, days in platinum_forecasting.HORIZONS.items()
+                 if origin + days < len(ts)}
+    if not available:
+        return []
+
+    last_price = float(train.iloc[-1])
+    origin_date = train.index[-1].date()
+    try:
+        _, path, _ = forecast_models.MODEL_ZOO[model](train, max(available.values()))
+    except Exception as exc:                  # one bad origin must not sink the run
+        print(f"❌ {coin} {model} at {origin_date} failed: {exc}")
+        return []
+
+    rows = []
+    for label, days in available.items():
+        rows.append((coin, model, origin_date, label, days, ts.index[origin + days].date(),
+                     last_price, float(path[days - 1]), float(ts.iloc[origin + days])))
+    return rows
+
+# ---------- SCORING ----------
+def score_backtest(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarise backtest rows per coin and horizon:
+      - MAE: mean |Forecast - Actual|
+      - MAPE: mean |Forecast - Actual| / Actual, in percent
+      - DirectionalAccuracy: share of origins where the forecast moved in
+        the same direction (vs LastPrice) as the realized price
+    """
+    err = (results["Forecast"] - results["Actual"]).abs()
+    hit = (np.sign(results["Forecast"] - results["LastPrice"])
+           == np.sign(results["Actual"] - results["LastPrice"]))
+    scored = results.assign(AbsErr=err, PctErr=err / results["Actual"].abs() * 100,
+                            Hit=hit.astype(float))
+    out = (scored.groupby(["Coin", "Model", "HorizonLabel", "HorizonDays"], sort=False)
+                 .agg(Origins=("AbsErr", "size"), MAE=("AbsErr", "mean"),
+                      MAPE=("PctErr", "mean"), DirectionalAccuracy=("Hit", "mean"))
+                 .reset_index()
+                 .sort_values(["Coin", "HorizonDays"]))
+    return out[SCORE_COLS].reset_index(drop=True)
+
+# ---------- MODEL CHOICE ----------
+def selected_models(series: dict, max_workers: int = MAX_WORKERS) -> dict:
+    """
+    {coin: model} as the platinum stage picks it today: forecast_models'
+    holdout selection on the full series. Fits cached by the platinum stage
+    ('model_params') are reused when the series is unchanged.
+    """
+    cache = dict(pipeline_orchestrator.load_cached("model_params") or {})
+    _, best = forecast_models.score_models(series, cache, max_workers=max_workers)
+    for coin, model in best.items():
+        print(f"🏆 {coin}: backtesting {model}")
+    return best
+
+# ---------- RUNNER ----------
+def run_backtest(frames: dict, n_origins: int = DEFAULT_ORIGINS,
+                 min_train: int = MIN_TRAIN_DAYS, max_workers: int = MAX_WORKERS,
+                 persist: bool = True, model: str = "selected"):
+    """
+    Rolling-origin backtest of the platinum forecasts.
+      - frames: {coin: ds/y DataFrame} as returned by load_gold_since_2018
+      - model: a forecast_models.MODEL_ZOO name for every coin, or
+        'selected' for the model the platinum stage selects per coin
+    Every (coin, origin) refit is an independent task on a process pool.
+    Returns (results, scores) DataFrames; optionally writes both tables.
+    """
+    series = {coin: platinum_forecasting.daily_series(df) for coin, df in frames.items()}
+    models = (selected_models(series, max_workers) if model == "selected"
+              else dict.fromkeys(series, model))
+    tasks = [(coin, models[coin], int(o)) for coin, ts in series.items()
+             for o in make_origins(len(ts), n_origins, min_train)]
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(series,)) as pool:
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        rows = [r for part in pool.map(evaluate_origin, tasks, chunksize=chunksize) for r in part]
+    print(f"⏱️  {len(tasks):,} refits on {max_workers} workers in {time.perf_counter() - t0:.1f}s")
+
+    results = pd.DataFrame(rows, columns=RESULT_COLS)
+    scores = score_backtest(results)
+    if persist:
+        backend = storage.get_backend()
+        n = backend.replace_table(RESULTS_TABLE, results, RESULT_COLS,
+                                  int_cols=["HorizonDays"])
+        print(f"✅ Inserted {n:,} rows into {RESULTS_TABLE}")
+        n = backend.replace_table(SCORES_TABLE, scores, SCORE_COLS,
+                                  int_cols=["HorizonDays", "Origins"])
+        print(f"✅ Inserted {n:,} rows into {SCORES_TABLE}")
+    return results, scores
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of platinum forecasts")
+    parser.add_argument("--coins", default="BTC,ETH", help="comma-separated coin suffixes")
+    parser.add_argument("--origins", type=int, default=DEFAULT_ORIGINS,
+                        help="origins per coin (default: %(default)s)")
+    parser.add_argument("--min-train", type=int, default=MIN_TRAIN_DAYS,
+                        help="training days at the first origin (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--model", choices=["selected"] + list(forecast_models.MODEL_ZOO),
+                        default="selected",
+                        help="model to backtest; 'selected' uses the platinum holdout pick per coin "
+                             "(default: %(default)s)")
+    parser.add_argument("--no-persist", action="store_true", help="do not write tables")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.BACKEND,
+                        help="storage backend (default: %(default)s)")
+    args = parser.parse_args()
+    storage.set_backend(args.backend)
+    frames = {c: platinum_forecasting.load_gold_since_2018(c) for c in args.coins.split(",")}
+    _, scores = run_backtest(frames, args.origins, args.min_train, args.workers,
+                             persist=not args.no_persist, model=args.model)
+    print(scores.to_string(index=False))
@@ -0,0 +1,210 @@
+import os                                  # CPU count, environment config
+import hashlib                             # series fingerprints for the parameter cache
+import time                                # wall-clock timing
+import warnings                            # statsmodels convergence chatter
+from concurrent.futures import ProcessPoolExecutor   # parallel model fitting
+import numpy as np                         # NumPy for paths and scoring
+import pandas as pd                        # pandas for DataFrame operations
+
+import platinum_forecasting                # HORIZONS, daily_series, horizon_rows
+import storage                             # pooled storage backend
+
+# ---------- CONFIG ----------
+warnings.filterwarnings("ignore")          # same policy as platinum_forecasting
+SCORES_TABLE = "platinum_model_scores"
+HOLDOUT_DAYS = 90                          # last days held out to pick the model
+WARM_START_MAX_DAYS = 30                   # refit from cached params if at most this many days were appended
+MAX_WORKERS = int(os.environ.get("CRYPTO_WORKERS", "0")) or os.cpu_count()
+
+SCORE_COLS = ["Coin", "Model", "HoldoutDays", "HoldoutMAE", "HoldoutMAPE", "Selected", "FitMode"]
+
+# ---------- CANDIDATE MODELS ----------
+def es_start_params(res) -> np.ndarray:
+    """
+    Flatten fitted ExponentialSmoothing parameters into the start_params
+    order fit() expects: alpha, beta, gamma, l0, b0, phi, seasons.
+    """
+    p, model = res.params, res.model
+    vec = [p["smoothing_level"]]
+    if model.has_trend:
+        vec.append(p["smoothing_trend"])
+    if model.has_seasonal:
+        vec.append(p["smoothing_seasonal"])
+    vec.append(p["initial_level"])
+    if model.has_trend:
+        vec.append(p["initial_trend"])
+    if model.damped_trend:
+        vec.append(p["damping_trend"])
+    if model.has_seasonal:
+        vec.extend(np.asarray(p["initial_seasons"]))
+    return np.asarray(vec, dtype=float)
+
+def fit_es(ts: pd.Series, steps: int, start_params=None, **spec):
+    """Fit an ExponentialSmoothing variant; warm start skips the brute-force grid."""
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing  # only needed when fitting
+    model = ExponentialSmoothing(ts, **spec)
+    res = model.fit(optimized=True, start_params=start_params, use_brute=start_params is None)
+    return es_start_params(res), res.forecast(steps).to_numpy(), res.fittedvalues.to_numpy()
+
+def fit_holt(ts, steps, start_params=None):
+    return fit_es(ts, steps, start_params, trend="add")
+
+def fit_damped(ts, steps, start_params=None):
+    return fit_es(ts, steps, start_params, trend="add", damped_trend=True)
+
+def fit_holt_winters_weekly(ts, steps, start_params=None):
+    return fit_es(ts, steps, start_params, trend="add", seasonal="add", seasonal_periods=7)
+
+def fit_log_holt(ts, steps, start_params=None):
+    params, path, fitted = fit_es(np.log(ts), steps, start_params, trend="add")
+    return params, np.exp(path), np.exp(fitted)
+
+def fit_arima(ts, steps, start_params=None):
+    from statsmodels.tsa.arima.model import ARIMA                 # only needed when fitting
+    res = ARIMA(ts, order=(1, 1, 1), trend="t").fit(start_params=start_params)
+    return (np.asarray(res.params, dtype=float), res.forecast(steps).to_numpy(),
+            res.fittedvalues.to_numpy())
+
+# name → fit(ts, steps, start_params) -> (params, forecast path of length steps,
+#                                          in-sample one-step fitted values)
+MODEL_ZOO = {
+    "holt":                fit_holt,
+    "damped":              fit_damped,
+    "holt_winters_weekly": fit_holt_winters_weekly,
+    "arima":               fit_arima,
+    "log_holt":            fit_log_holt,
+}
+
+# ---------- PARAMETER CACHE ----------
+def log_residuals(ts: pd.Series, fitted: np.ndarray) -> np.ndarray:
+    """One-step in-sample errors in log space, log(actual / fitted)."""
+    actual = ts.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resid = np.log(actual / fitted)
+    return resid[1:][np.isfinite(resid[1:])]          # first fitted value has no history
+
+def fingerprint(ts: pd.Series) -> str:
+    """Hash of the series' start date, length and values."""
+    h = hashlib.sha1()
+    h.update(str(ts.index[0].date()).encode())
+    h.update(np.ascontiguousarray(ts.to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+def fit_cached(model: str, ts: pd.Series, steps: int, entry=None):
+    """
+    Fit one model, reusing a cache entry {n_obs, fingerprint, params, path, resid}:
+      - same series → reuse the cached path, no fitting ('cached')
+      - same series plus up to WARM_START_MAX_DAYS new days → refit from
+        the cached parameters ('warm')
+      - otherwise → full fit ('cold')
+    Returns (new entry, fit mode).
+    """
+    start = None
+    if entry is not None:
+        n = entry["n_obs"]
+        if (n == len(ts) and len(entry["path"]) >= steps and "resid" in entry
+                and entry["fingerprint"] == fingerprint(ts)):
+            return entry, "cached"
+        if 0 < len(ts) - n <= WARM_START_MAX_DAYS and entry["fingerprint"] == fingerprint(ts.iloc[:n]):
+            start = entry["params"]
+
+    try:
+        params, path, fitted = MODEL_ZOO[model](ts, steps, start)
+        mode = "cold" if start is None else "warm"
+    except (ValueError, np.linalg.LinAlgError):
+        if start is None:
+            raise
+        params, path, fitted = MODEL_ZOO[model](ts, steps, None)  # stale params no longer fit the shape
+        mode = "cold"
+    entry = {"n_obs": len(ts), "fingerprint": fingerprint(ts), "params": params, "path": path,
+             "resid": log_residuals(ts, fitted)}
+    return entry, mode
+
+def fit_task(task):
+    """Worker: task = (coin, model, role, series, steps, cache entry or None)."""
+    coin, model, role, ts, steps, entry = task
+    try:
+        entry, mode = fit_cached(model, ts, steps, entry)
+    except Exception as exc:                  # one bad candidate must not sink the run
+        print(f"❌ {coin} {model} ({role}) failed: {exc}")
+        return coin, model, role, None, "failed"
+    return coin, model, role, entry, mode
+
+# ---------- SELECTION ----------
+def run_tasks(tasks, max_workers: int):
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(fit_task, tasks))
+
+def score_models(series: dict, cache: dict, models=None, holdout: int = HOLDOUT_DAYS,
+                 max_workers: int = MAX_WORKERS):
+    """
+    Fit every (coin, model) on all but the last `holdout` days in parallel
+    and score MAE / MAPE on the held-out days.
+      - series: {coin: daily price series}
+      - cache: {(coin, model, role): entry}, updated in place
+    Returns (scores DataFrame with the winner flagged, {coin: best model});
+    coins too short to score fall back to 'holt'.
+    """
+    models = list(MODEL_ZOO) if models is None else list(models)
+    tasks = [(coin, m, "holdout", ts.iloc[:-holdout], holdout, cache.get((coin, m, "holdout")))
+             for coin, ts in series.items() if len(ts) > holdout * 2 for m in models]
+    scores = []
+    for coin, model, role, entry, mode in run_tasks(tasks, max_workers):
+        if entry is None:
+            continue
+        cache[(coin, model, role)] = entry
+        actual = series[coin].iloc[-holdout:].to_numpy()
+        err = np.abs(entry["path"][:holdout] - actual)
+        scores.append((coin, model, holdout, float(err.mean()),
+                       float((err / np.abs(actual)).mean() * 100), 0, mode))
+    scores = pd.DataFrame(scores, columns=SCORE_COLS)
+
+    best = {}
+    for coin in series:
+        cand = scores[(scores["Coin"] == coin) & np.isfinite(scores["HoldoutMAPE"])]
+        best[coin] = cand.loc[cand["HoldoutMAPE"].idxmin(), "Model"] if not cand.empty else "holt"
+    scores["Selected"] = (scores["Model"] == scores["Coin"].map(best)).astype(int)
+    return scores, best
+
+def select_and_forecast(series_by_coin: dict, cache=None, models=None,
+                        holdout: int = HOLDOUT_DAYS, max_workers: int = MAX_WORKERS):
+    """
+    Pick the best model per coin on a holdout and forecast every horizon.
+      - series_by_coin: {coin: ds/y DataFrame} (gold_frame_since_2018 shape)
+      - cache: {(coin, model, role): entry} from the previous run, or None
+    Phase 1 scores every candidate (score_models); phase 2 refits the
+    winner per coin on the full series in parallel.
+    Returns (platinum rows, scores DataFrame, updated cache).
+    """
+    cache = {} if cache is None else dict(cache)
+    series = {coin: platinum_forecasting.daily_series(df) for coin, df in series_by_coin.items()}
+    steps = max(platinum_forecasting.HORIZONS.values())
+
+    t0 = time.perf_counter()
+    scores, best = score_models(series, cache, models, holdout, max_workers)
+    tasks = [(coin, best[coin], "full", ts, steps, cache.get((coin, best[coin], "full")))
+             for coin, ts in series.items()]
+    rows = []
+    for coin, model, role, entry, mode in run_tasks(tasks, max_workers):
+        if entry is None:
+            continue
+        cache[(coin, model, role)] = entry
+        print(f"🏆 {coin}: {model} (fit: {mode})")
+        rows += platinum_forecasting.horizon_rows(series[coin], entry["path"], coin)
+    print(f"⏱️  model selection for {len(series)} coins in {time.perf_counter() - t0:.2f}s")
+    return rows, scores, cache
+
+def selected_residuals(scores: pd.DataFrame, cache: dict) -> dict:
+    """{coin: log residuals of the model selected for that coin's full-series fit}."""
+    out = {}
+    for coin, model in scores.loc[scores["Selected"] == 1, ["Coin", "Model"]].itertuples(index=False):
+        entry = cache.get((coin, model, "full"))
+        if entry is not None and entry.get("resid") is not None:
+            out[coin] = entry["resid"]
+    return out
+
+def write_scores(scores: pd.DataFrame):
+    """Truncate and reload the per-candidate holdout scores."""
+    n = storage.get_backend().replace_table(SCORES_TABLE, scores, SCORE_COLS,
+                                            int_cols=["HoldoutDays", "Selected"])
+    print(f"Inserted {n} rows into {SCORES_TABLE}")
@@ -1,52 +1,21 @@
 import pandas as pd                                       # pandas for DataFrame operations
 import numpy as np                                        # NumPy for numerical functions
-import pyodbc                                             # pyodbc for ODBC database connections
-
-# ─── IMPORT UPSTREAM LAYERS ────────────────────────────────────────────────
-import silver_clean_transform
-# ---------- CONFIG ----------
-SERVER   = r"KRISHNA\KVSTG"                               # SQL Server instance
-DATABASE = "Crypto_Analytics"                             # target database
-DRIVER   = "ODBC Driver 17 for SQL Server"                # ODBC driver name
-
-# ---------- DB CONNECTION SETUP ----------
-def get_db_connection():
-    """
-    Create and return a new pyodbc connection and cursor.
-    """
-    conn = pyodbc.connect(
-        f"Driver={{{DRIVER}}};"                            # specify ODBC driver
-        f"Server={SERVER};"                                # specify server
-        f"Database={DATABASE};"                            # specify database
-        "Trusted_Connection=yes;"                          # use Windows auth
-        "Encrypt=yes;"                                     # encrypt connection
-        "TrustServerCertificate=yes;"                      # trust the server cert
-    )
-    cur = conn.cursor()                                   # create cursor for SQL
-    cur.fast_executemany = True                           # enable fast bulk operations
-    return conn, cur
+import db_writer                                          # shared columnar executemany writer
+import storage                                            # pooled storage backend (SQL Server / SQLite)
+import indicators                                         # RSI / MACD / Bollinger / momentum / OBV in one pass
+import trading_calendar                                   # shared gap-aware daily calendar
 
 # ---------- LOAD CLEANED SILVER DATA ----------
 def load_cleaned_silver_data(table_name: str, suffix: str) -> pd.DataFrame:
     """
     Load cleaned silver data for the given suffix into a pandas DataFrame.
     """
-    sql = f"""
-      SELECT
-        PriceDate,
-        Open_{suffix},
-        High_{suffix},
-        Low_{suffix},
-        Close_{suffix},
-        Volume_{suffix},
-        Coin
-      FROM {table_name}
-      ORDER BY PriceDate
-    """
-    conn, _ = get_db_connection()                          # open new connection for read
-    df = pd.read_sql(sql, conn, parse_dates=["PriceDate"]) # execute query, parse dates
-    conn.close()                                           # close after read
-    return df
+    cols = [
+        "PriceDate",
+        f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
+        f"Volume_{suffix}", "Coin"
+    ]
+    return storage.get_backend().read_table(table_name, cols)  # pooled, column-pruned read
 
 # ---------- COMPUTE BASE (SILVER‐LAYER) METRICS ----------
 def compute_base_metrics(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
@@ -54,7 +23,11 @@ def compute_base_metrics(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
     Compute silver‐layer features:
       - DailyReturn
       - 7, 30, 90-day SMAs & volatilities
+    Windows count calendar days: df is aligned to the trading calendar
+    (already done by silver; frames read back from the table are aligned here).
     """
+    if not trading_calendar.is_aligned(df):
+        df = trading_calendar.align(df, fill=trading_calendar.DAILY_FILL, suffix=suffix)
     df = df.copy().sort_values("PriceDate")                # work on a sorted copy
     price_col = f"Close_{suffix}"                          # closing price column
 
@@ -70,13 +43,21 @@ def compute_base_metrics(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
 
 # ---------- COMPUTE ENHANCED (GOLD‐LAYER) METRICS ----------
 def compute_enhanced_metrics(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    Compute gold‐layer features. See compute_enhanced_metrics_with_state.
+    """
+    return compute_enhanced_metrics_with_state(df, suffix)[0]
+
+def compute_enhanced_metrics_with_state(df: pd.DataFrame, suffix: str):
     """
     Compute gold‐layer features:
       - LogReturn
       - 30-day avg volume
       - CumulativeReturn & Drawdown
       - Time flags (Year, Month, DayOfWeek)
+      - Technical indicators from indicators.INDICATORS
     Assumes compute_base_metrics has been applied.
+    Returns (gold frame, indicator state after its last row).
     """
     df = df.copy().sort_values("PriceDate")
     price_col = f"Close_{suffix}"
@@ -106,79 +87,270 @@ def compute_enhanced_metrics(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
     df["Month"]     = df["PriceDate"].dt.month
     df["DayOfWeek"] = df["PriceDate"].dt.dayofweek
 
-    return df.iloc[1:].reset_index(drop=True)              # drop initial NaN row
+    # technical indicators (one pass, shared EMAs / prefix sums)
+    df, ind_state = indicators.add_indicators(df, suffix)
 
-# ---------- UPSERT INTO GOLD TABLE ----------
-def upsert_gold_table(df: pd.DataFrame, table_name: str, suffix: str):
+    return df.iloc[1:].reset_index(drop=True), ind_state   # drop initial NaN row
+
+# ---------- INCREMENTAL STATE ----------
+STATE_ROWS = 90                                           # longest rolling window (SMA90 / Vol90)
+
+def silver_columns(suffix: str) -> list:
+    """Columns of a cleaned silver frame (aligned to the trading calendar)."""
+    return [
+        "PriceDate",
+        f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
+        f"Volume_{suffix}", "Coin"
+    ] + trading_calendar.CAL_COLS
+
+def build_gold_state(base_df: pd.DataFrame, gold_df: pd.DataFrame, suffix: str,
+                     indicator_state: dict = None) -> dict:
     """
-    Truncate & insert the fully‐engineered gold‐layer DataFrame into SQL.
+    Capture the tail state an incremental run needs after a full compute:
+      - tail: last STATE_ROWS silver rows (closes, volumes) behind the gold rows
+      - cum_growth: running product of (1 + DailyReturn)
+      - running_max: highest close so far (drawdown reference)
+      - last_date: last PriceDate already in gold
+      - indicators: indicator engine state after the last gold row
+    base_df / gold_df / indicator_state are the outputs of compute_base_metrics /
+    compute_enhanced_metrics_with_state; without indicator_state the next
+    run recomputes in full.
     """
-    df[f"Volume_{suffix}_Millions"] = df[f"Volume_{suffix}"] / 1e6  # compute millions
+    price_col = f"Close_{suffix}"
+    return {
+        "tail":        gold_df[silver_columns(suffix)].tail(STATE_ROWS).reset_index(drop=True),
+        "cum_growth":  1 + gold_df[f"CumulativeReturn_{suffix}"].iloc[-1],
+        "running_max": base_df[price_col].max(),
+        "last_date":   gold_df["PriceDate"].iloc[-1],
+        "indicators":  indicator_state,
+    }
 
-    conn, cursor = get_db_connection()                       # open new connection
-    cursor.execute(f"TRUNCATE TABLE {table_name}")           # clear old data
-    print(f"🗑️  Truncated {table_name}")
+def compute_gold_incremental(silver_df: pd.DataFrame, state: dict, suffix: str):
+    """
+    Compute gold rows only for silver days after state['last_date'].
+    Rolling features are evaluated over tail + new rows, cumulative return
+    and drawdown continue from the saved running product / running max, so
+    the result matches a full recompute to floating-point tolerance.
+    Returns (new gold rows, new state), or None when the state can't be
+    used (short history, upstream restated a day inside the tail, the
+    indicator set changed, or the state predates the trading calendar) and
+    the caller should fall back to a full recompute.
+    """
+    price_col = f"Close_{suffix}"
+    vol_col   = f"Volume_{suffix}"
+    cols      = silver_columns(suffix)
+    tail      = state["tail"]
+    if len(tail) < STATE_ROWS or not indicators.can_resume(state.get("indicators")):
+        return None
+    if not set(cols) <= set(tail.columns) or not trading_calendar.is_aligned(silver_df):
+        return None
 
-    # build insert statement
-    cols = [
+    silver = silver_df.sort_values("PriceDate")
+    # the saved tail must still match silver exactly, otherwise history changed
+    lookup = silver.set_index("PriceDate")[[price_col, vol_col]]
+    if not tail["PriceDate"].isin(lookup.index).all():
+        return None
+    if not np.array_equal(lookup.loc[tail["PriceDate"]].to_numpy(dtype=float),
+                          tail[[price_col, vol_col]].to_numpy(dtype=float)):
+        return None
+
+    new = silver[silver["PriceDate"] > state["last_date"]]
+    if new.empty:
+        return new.iloc[0:0], state
+
+    work = pd.concat([tail[cols], new[cols]], ignore_index=True)
+    work["DailyReturn"] = work[price_col].pct_change()
+    for window in (7, 30, 90):
+        work[f"SMA{window}_{suffix}"] = work[price_col].rolling(window).mean()
+        work[f"Vol{window}_{suffix}"] = work["DailyReturn"].rolling(window).std()
+    work[f"LogReturn_{suffix}"] = np.log(work[price_col] / work[price_col].shift(1))
+    work[f"VolAvg30_{suffix}"]  = work[vol_col].rolling(window=30, min_periods=1).mean()
+
+    fresh = work.iloc[len(tail):].copy()
+    growth = state["cum_growth"] * (1 + fresh["DailyReturn"]).cumprod()
+    fresh[f"CumulativeReturn_{suffix}"] = growth - 1
+    running_max = np.maximum(state["running_max"], fresh[price_col].cummax())
+    fresh[f"Drawdown_{suffix}"] = (fresh[price_col] - running_max) / running_max
+
+    fresh[f"Volume_{suffix}_Millions"] = fresh[vol_col] / 1e6
+    fresh["Year"]      = fresh["PriceDate"].dt.year
+    fresh["Month"]     = fresh["PriceDate"].dt.month
+    fresh["DayOfWeek"] = fresh["PriceDate"].dt.dayofweek
+    fresh, ind_state = indicators.add_indicators(fresh, suffix, state=state["indicators"])
+
+    new_state = {
+        "tail":        work[cols].tail(STATE_ROWS).reset_index(drop=True),
+        "cum_growth":  growth.iloc[-1],
+        "running_max": running_max.iloc[-1],
+        "last_date":   fresh["PriceDate"].iloc[-1],
+        "indicators":  ind_state,
+    }
+    return fresh.reset_index(drop=True), new_state
+
+# ---------- SINGLE-BLOCK GOLD FEATURES ----------
+WINDOWS = (7, 30, 90)                                     # SMA / volatility lookbacks
+
+def float_feature_columns(suffix: str) -> list:
+    """Float columns of the gold block, in block order."""
+    return [
+        f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
+        "DailyReturn", f"LogReturn_{suffix}", f"Volume_{suffix}_Millions",
+        f"CumulativeReturn_{suffix}", f"Drawdown_{suffix}",
+    ] + [f"{kind}{w}_{suffix}" for w in WINDOWS for kind in ("SMA", "Vol")] \
+      + [f"VolAvg30_{suffix}"] \
+      + indicators.indicator_columns(suffix)
+
+def compute_gold_features(silver_df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    Gold rows for a silver frame. See compute_gold_features_with_state.
+    """
+    return compute_gold_features_with_state(silver_df, suffix)[0]
+
+def compute_gold_features_with_state(silver_df: pd.DataFrame, suffix: str):
+    """
+    Same rows and values as compute_base_metrics → compute_enhanced_metrics
+    (plus Volume_<coin>_Millions), without the intermediate frames:
+      - silver is sorted at most once (aligned silver already is)
+      - every float feature is written into one preallocated
+        (features × rows) NumPy block that becomes the frame's only float
+        block, without a copy
+      - the warm-up rows are trimmed by slicing the inputs, not by
+        dropna() / reset_index() on a wide frame
+    Peak memory is about one gold-sized block plus a few single columns
+    (and the indicator engine's shared intermediates).
+    Assumes an aligned silver frame (no missing prices or volumes), so
+    the first row with every window filled starts the gold history.
+    Returns (gold frame, incremental state as from build_gold_state).
+    """
+    if not trading_calendar.is_aligned(silver_df):
+        silver_df = trading_calendar.align(silver_df, fill=trading_calendar.DAILY_FILL,
+                                           suffix=suffix)
+    if not silver_df["PriceDate"].is_monotonic_increasing:
+        silver_df = silver_df.sort_values("PriceDate")
+    close  = silver_df[f"Close_{suffix}"].to_numpy(dtype=np.float64)
+    volume = silver_df[f"Volume_{suffix}"].to_numpy(dtype=np.float64)
+    start  = min(max(WINDOWS), len(close))                # first row with Vol90 (and every SMA)
+    n_base = len(close) - start                           # base rows; gold drops the first of them
+    n = max(0, n_base - 1)
+
+    # one contiguous row per feature over the base rows (silver[start:]);
+    # gold is the view without the first column
+    cols  = float_feature_columns(suffix)
+    block = np.empty((len(cols), n_base))
+    at    = {name: block[i] for i, name in enumerate(cols)}
+    base  = slice(start, None)
+    keep  = slice(start + 1, None)                        # gold rows within silver
+
+    for c in ("Open", "High", "Low", "Close"):
+        at[f"{c}_{suffix}"][:] = silver_df[f"{c}_{suffix}"].to_numpy(dtype=np.float64)[base]
+
+    # base features over the full history, one column at a time
+    price = pd.Series(close, copy=False)
+    daily = price.pct_change()
+    at["DailyReturn"][:] = daily.to_numpy()[base]
+    for w in WINDOWS:
+        at[f"SMA{w}_{suffix}"][:] = price.rolling(w).mean().to_numpy()[base]
+        at[f"Vol{w}_{suffix}"][:] = daily.rolling(w).std().to_numpy()[base]
+    del price, daily
+
+    # enhanced features over the base rows
+    base_close, base_volume = close[base], volume[base]
+    growth = at[f"CumulativeReturn_{suffix}"]
+    np.cumprod(1 + at["DailyReturn"], out=growth)
+    running_max = at[f"Drawdown_{suffix}"]
+    np.maximum.accumulate(base_close, out=running_max)
+    cum_growth = growth[-1] if n else None
+    peak_close = running_max[-1] if n else None
+    growth -= 1
+    np.divide(base_close - running_max, running_max, out=running_max)
+    np.log(base_close[1:] / base_close[:-1], out=at[f"LogReturn_{suffix}"][1:])
+    np.divide(base_volume, 1e6, out=at[f"Volume_{suffix}_Millions"])
+    at[f"VolAvg30_{suffix}"][:] = pd.Series(base_volume, copy=False) \
+        .rolling(window=30, min_periods=1).mean().to_numpy()
+    _, ind_state = indicators.compute_indicators(
+        base_close, base_volume,
+        out={name: at[f"{name}_{suffix}"] for name in indicators.indicator_names()})
+
+    # block[:, 1:].T is the (rows × features) view pandas stores as-is; the
+    # few non-float columns are inserted around it without consolidating
+    gold = pd.DataFrame(block[:, 1:].T, columns=cols, copy=False)
+    dates = pd.DatetimeIndex(silver_df["PriceDate"].to_numpy()[keep])
+    gold.insert(0, "PriceDate", dates)
+    gold.insert(5, f"Volume_{suffix}", silver_df[f"Volume_{suffix}"].to_numpy()[keep])
+    gold.insert(6, "Coin", silver_df["Coin"].to_numpy()[keep])
+    for name in trading_calendar.CAL_COLS:
+        gold[name] = silver_df[name].to_numpy()[keep]
+    gold["Year"]      = dates.year.to_numpy(dtype=np.int16)
+    gold["Month"]     = dates.month.to_numpy(dtype=np.int8)
+    gold["DayOfWeek"] = dates.dayofweek.to_numpy(dtype=np.int8)
+
+    state = None
+    if n:
+        state = {
+            "tail":        gold[silver_columns(suffix)].tail(STATE_ROWS).reset_index(drop=True),
+            "cum_growth":  cum_growth,
+            "running_max": peak_close,
+            "last_date":   dates[-1],
+            "indicators":  ind_state,
+        }
+    return gold, state
+
+# ---------- GOLD TABLE COLUMNS ----------
+def gold_columns(suffix: str) -> list:
+    """
+    Column list of gold_<coin>_prices, in insert order.
+    """
+    return [
         "PriceDate",
         f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
         f"Volume_{suffix}", "DailyReturn", f"LogReturn_{suffix}",
         f"Volume_{suffix}_Millions", "Coin",
         f"CumulativeReturn_{suffix}", f"Drawdown_{suffix}",
-        "Year", "Month", "DayOfWeek"
+        "Year", "Month", "DayOfWeek", "IsImputed"
     ] + [f"SMA{w}_{suffix}" for w in (7, 30, 90)] \
       + [f"Vol{w}_{suffix}" for w in (7, 30, 90)] \
-      + [f"VolAvg30_{suffix}"]
-
-    placeholders = ", ".join("?" for _ in cols)
-    insert_sql   = f"INSERT INTO {table_name} ({', '.join(cols)}) VALUES ({placeholders})"
-
-    # prepare and insert rows
-    rows = []
-    for _, row in df.iterrows():
-        vals = []
-        for col in cols:
-            v = row[col]
-            if pd.isna(v) or (isinstance(v, float) and np.isinf(v)):
-                vals.append(None)
-            elif col == "PriceDate":
-                vals.append(v.date())                   # SQL DATE
-            elif col in ("Year","Month","DayOfWeek"):
-                vals.append(int(v))
-            elif col.startswith("Volume_") and not col.endswith("_Millions"):
-                vals.append(int(v))
-            else:
-                vals.append(v)
-        rows.append(tuple(vals))
-
-    cursor.fast_executemany = True
-    cursor.executemany(insert_sql, rows)                  # bulk insert
-    conn.commit()                                          # commit
-    print(f"✅  Inserted {len(rows):,} rows into {table_name}")
-    cursor.close()                                         # cleanup
-    conn.close()
+      + [f"VolAvg30_{suffix}"] \
+      + indicators.indicator_columns(suffix)
 
-# ---------- MAIN PIPELINE ----------
-def main():
-    # 1) run bronze → silver
-    silver_clean_transform.main()                                         # ensures silver tables are up-to-date
+# ---------- UPSERT INTO GOLD TABLE ----------
+def upsert_gold_table(df: pd.DataFrame, table_name: str, suffix: str,
+                      chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE):
+    """
+    Truncate & insert the fully‐engineered gold‐layer DataFrame into SQL.
+    """
+    if f"Volume_{suffix}_Millions" not in df.columns:            # frames from compute_enhanced_metrics
+        df[f"Volume_{suffix}_Millions"] = df[f"Volume_{suffix}"] / 1e6
 
-    # 2) load cleaned silver
-    btc_silver = load_cleaned_silver_data("raw_btc_prices_sil", "BTC")
-    eth_silver = load_cleaned_silver_data("raw_eth_prices_sil", "ETH")
+    # convert column by column and stream in chunks
+    int_cols = [f"Volume_{suffix}", "Year", "Month", "DayOfWeek", "IsImputed"]
+    n = storage.get_backend().replace_table(table_name, df, gold_columns(suffix),
+                                            int_cols=int_cols, chunk_size=chunk_size)
+    print(f"✅  Swapped in {n:,} rows into {table_name}")
 
-    # 3) compute base metrics
-    btc_base = compute_base_metrics(btc_silver, "BTC")
-    eth_base = compute_base_metrics(eth_silver, "ETH")
+# ---------- APPEND TO GOLD TABLE ----------
+def append_gold_table(df: pd.DataFrame, table_name: str, suffix: str,
+                      chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE):
+    """
+    Merge incrementally computed gold rows by (PriceDate, Coin) instead of
+    truncating and rewriting the whole table.
+    """
+    if df.empty:
+        print(f"⏭️  No new rows for {table_name}")
+        return
+    if f"Volume_{suffix}_Millions" not in df.columns:            # frames from compute_enhanced_metrics
+        df[f"Volume_{suffix}_Millions"] = df[f"Volume_{suffix}"] / 1e6
 
-    # 4) compute enhanced metrics
-    btc_gold = compute_enhanced_metrics(btc_base, "BTC")
-    eth_gold = compute_enhanced_metrics(eth_base, "ETH")
+    int_cols = [f"Volume_{suffix}", "Year", "Month", "DayOfWeek", "IsImputed"]
+    n = storage.get_backend().merge_frame(table_name, df, gold_columns(suffix),
+                                          key_cols=["PriceDate", "Coin"],
+                                          int_cols=int_cols, chunk_size=chunk_size)
+    print(f"✅  Appended {n:,} rows to {table_name}")
 
-    # 5) upsert into gold tables
-    upsert_gold_table(btc_gold, "gold_btc_prices", "BTC")
-    upsert_gold_table(eth_gold, "gold_eth_prices", "ETH")
+# ---------- MAIN PIPELINE ----------
+def main():
+    # Run Bronze → Silver → Gold with in-memory handoff (see pipeline_orchestrator)
+    import pipeline_orchestrator
+    pipeline_orchestrator.run_pipeline(["bronze", "silver", "gold"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,246 @@
+import numpy as np                         # NumPy for array recurrences
+import pandas as pd                        # pandas for DataFrame output
+from numpy.lib.stride_tricks import sliding_window_view   # overlapping segments without a copy
+
+# ---------- CONFIG ----------
+# The indicator set is plain data, like the data-quality rules: each spec
+# names a kind from KINDS plus its parameters. Output columns get the coin
+# suffix (RSI14_BTC, MACD_BTC, ...). Changing the set needs matching gold
+# table columns (see Table_schemas/schemas.sql).
+INDICATORS = [
+    {"kind": "rsi",       "window": 14},
+    {"kind": "macd",      "fast": 12, "slow": 26, "signal": 9},
+    {"kind": "bollinger", "window": 20, "k": 2.0},
+    {"kind": "momentum",  "window": 10},
+    {"kind": "momentum",  "window": 30},
+    {"kind": "obv"},
+]
+
+# rolling sums restart from a local anchor every ROLLING_SEGMENT rows, so
+# E[x²] - E[x]² cancels over local price moves rather than the whole history
+ROLLING_SEGMENT = 1024
+
+# ---------- RECURRENCES ----------
+def ema(values: np.ndarray, alpha: float, prev=None):
+    """
+    y[t] = alpha * x[t] + (1 - alpha) * y[t-1] in one lfilter call.
+    Continues from prev (the last y of an earlier pass), or starts at the
+    first finite value on a cold start; leading NaNs stay NaN.
+    Returns (y, last y).
+    """
+    if not len(values):
+        return np.empty(0), prev
+    start = 0
+    if prev is None:
+        finite = np.isfinite(values)
+        start = int(np.argmax(finite))
+        if not finite[start]:
+            return np.full(len(values), np.nan), None
+        prev = values[start]
+    from scipy.signal import lfilter       # EMA recurrences; scipy is slow to import
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], values[start:], zi=[(1.0 - alpha) * prev])
+    if start:
+        y = np.concatenate([np.full(start, np.nan), y])
+    return y, y[-1]
+
+class IndicatorPass:
+    """
+    One pass over a block of new closes/volumes. Intermediates (price
+    deltas, prefix sums, EMAs) are computed once and shared by every
+    indicator and window that needs them, so extra indicators cost a few
+    vectorized subtractions rather than another rolling pass.
+    state carries what the next block needs: the last closes (rolling
+    windows), the last EMA and OBV values, and the number of rows seen.
+    """
+
+    def __init__(self, close, volume, state: dict):
+        self.close  = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.tail   = state.get("tail", np.empty(0))
+        self.x      = np.concatenate([self.tail, self.close])   # tail gives windows their lookback
+        self.n      = len(self.close)
+        self.first  = state.get("count", 0)                      # rows seen before close[0]
+        self.ema_prev = state.get("ema", {})
+        self.ema_last = {}
+        self.obv_prev = state.get("obv")
+        self.memo = {}
+
+    def warm(self, rows: int) -> int:
+        """Leading new rows whose row number is below `rows` (not enough history yet)."""
+        return min(self.n, max(0, rows - self.first))
+
+    def cached(self, key, calc):
+        if key not in self.memo:
+            self.memo[key] = calc()
+        return self.memo[key]
+
+    def delta(self) -> np.ndarray:
+        """close[t] - close[t-1]; NaN for the very first close."""
+        def calc():
+            prev = self.tail[-1:] if len(self.tail) else np.array([np.nan])
+            return np.diff(np.concatenate([prev, self.close]))
+        return self.cached("delta", calc)
+
+    def rolling_mean_std(self, window: int):
+        """
+        Mean and population std of the last `window` closes, in O(n).
+        Window ends are split into segments of ROLLING_SEGMENT rows; each
+        segment takes prefix sums of (x - its first close) over its rows
+        plus the window - 1 before them, so the sums stay the size of
+        local moves and the std keeps its precision on long histories.
+        """
+        def calc():
+            i0 = self.warm(window - 1)                     # window ending at new row i0 is full
+            ends = self.n - i0
+            mean, sd = np.full(self.n, np.nan), np.full(self.n, np.nan)
+            if ends <= 0:
+                return mean, sd
+            seg = ROLLING_SEGMENT
+            k = -(-ends // seg)
+            x = self.x[len(self.x) - ends - window + 1:]  # rows of every full window
+            pad = k * seg + window - 1 - len(x)
+            if pad:
+                x = np.concatenate([x, np.full(pad, x[-1])])
+            blocks = sliding_window_view(x, seg + window - 1)[::seg]   # (k, seg + window - 1)
+            anchor = blocks[:, :1]
+            d = blocks - anchor
+            s1 = np.zeros((k, seg + window))
+            s2 = np.zeros((k, seg + window))
+            np.cumsum(d, axis=1, out=s1[:, 1:])
+            np.cumsum(d * d, axis=1, out=s2[:, 1:])
+            m1 = (s1[:, window:] - s1[:, :-window]) / window
+            m2 = (s2[:, window:] - s2[:, :-window]) / window
+            mean[i0:] = (m1 + anchor).ravel()[:ends]
+            sd[i0:] = np.sqrt(np.maximum(m2 - m1 ** 2, 0.0)).ravel()[:ends]
+            return mean, sd
+        return self.cached(("window", window), calc)
+
+    def ema(self, source: str, values: np.ndarray, alpha: float) -> np.ndarray:
+        """EMA of a named input, continued from the saved state of the same (source, alpha)."""
+        key = (source, alpha)
+        def calc():
+            out, self.ema_last[key] = ema(values, alpha, self.ema_prev.get(key))
+            return out
+        return self.cached(("ema",) + key, calc)
+
+    def state(self, lookback: int, specs) -> dict:
+        ema_last = dict(self.ema_prev)
+        ema_last.update({k: v for k, v in self.ema_last.items() if v is not None})
+        return {
+            "specs": [dict(s) for s in specs],
+            "tail":  self.x[-lookback:].copy() if lookback else np.empty(0),
+            "ema":   ema_last,
+            "obv":   self.obv_prev,
+            "count": self.first + self.n,
+        }
+
+# ---------- INDICATORS ----------
+# Each kind returns {column name without suffix: values for the new rows}.
+def rsi(p: IndicatorPass, spec) -> dict:
+    """Wilder RSI: EMA (alpha = 1/window) of gains and losses."""
+    w = spec["window"]
+    d = p.delta()
+    gain = p.ema("gain", np.clip(d, 0.0, None), 1.0 / w)
+    loss = p.ema("loss", np.clip(-d, 0.0, None), 1.0 / w)
+    total = gain + loss
+    out = np.divide(100.0 * gain, total, out=np.full(p.n, 50.0), where=total > 0)
+    out[np.isnan(total)] = np.nan
+    out[:p.warm(w)] = np.nan
+    return {f"RSI{w}": out}
+
+def macd(p: IndicatorPass, spec) -> dict:
+    """MACD line (fast EMA - slow EMA), its signal EMA and the histogram."""
+    fast, slow, sig = spec["fast"], spec["slow"], spec["signal"]
+    name = spec.get("name", "MACD")
+    line = p.ema("close", p.close, 2.0 / (fast + 1)) - p.ema("close", p.close, 2.0 / (slow + 1))
+    signal = p.ema(f"{name}_line", line, 2.0 / (sig + 1))
+    hist = line - signal
+    signal = signal.copy()                         # the EMA itself stays cached unmasked
+    line[:p.warm(slow - 1)] = np.nan
+    signal[:p.warm(slow + sig - 2)] = np.nan
+    hist[:p.warm(slow + sig - 2)] = np.nan
+    return {name: line, f"{name}Signal": signal, f"{name}Hist": hist}
+
+def bollinger(p: IndicatorPass, spec) -> dict:
+    """Bands at mean ± k population std of `window` closes, and %B (position within the bands)."""
+    w, k = spec["window"], spec["k"]
+    mean, sd = p.rolling_mean_std(w)
+    upper, lower = mean + k * sd, mean - k * sd
+    width = upper - lower
+    pct_b = np.divide(p.close - lower, width, out=np.full(p.n, np.nan), where=width > 0)
+    return {f"BBUpper{w}": upper, f"BBLower{w}": lower, f"BBPctB{w}": pct_b}
+
+def momentum(p: IndicatorPass, spec) -> dict:
+    """Rate of change over `window` rows: close[t] / close[t-window] - 1."""
+    w = spec["window"]
+    i0 = p.warm(w)                                 # the tail holds >= w closes once past warm-up
+    start = len(p.x) - p.n + i0 - w
+    out = np.full(p.n, np.nan)
+    out[i0:] = p.close[i0:] / p.x[start:len(p.x) - w] - 1
+    return {f"Momentum{w}": out}
+
+def obv(p: IndicatorPass, spec) -> dict:
+    """On-balance volume: running sum of volume signed by the close-to-close move."""
+    step = np.nan_to_num(np.sign(p.delta())) * p.volume
+    out = (p.obv_prev or 0.0) + np.cumsum(step)
+    if p.n:
+        p.obv_prev = out[-1]
+    return {"OBV": out}
+
+# kind → (function, rows of close history the next block needs)
+KINDS = {
+    "rsi":       (rsi,       lambda s: 1),
+    "macd":      (macd,      lambda s: 0),
+    "bollinger": (bollinger, lambda s: s["window"] - 1),
+    "momentum":  (momentum,  lambda s: s["window"]),
+    "obv":       (obv,       lambda s: 1),
+}
+
+def indicator_names(specs=INDICATORS) -> list:
+    """Output column names (without suffix) in spec order."""
+    p = IndicatorPass(np.empty(0), np.empty(0), {})
+    return [name for spec in specs for name in KINDS[spec["kind"]][0](p, spec)]
+
+def indicator_columns(suffix: str, specs=INDICATORS) -> list:
+    return [f"{name}_{suffix}" for name in indicator_names(specs)]
+
+# ---------- ENGINE ----------
+def compute_indicators(close, volume, specs=INDICATORS, state=None, out=None):
+    """
+    Compute every indicator in specs for the new closes/volumes, in one
+    pass that shares deltas, prefix sums and EMAs across indicators.
+      - state: returned by the previous call on the rows just before these;
+        None starts from scratch
+      - out: {column name without suffix: array of len(close)} to write
+        into (e.g. rows of a preallocated block); each indicator's result
+        is then copied there and released right away
+    Returns ({column name without suffix: array}, new state); the dict is
+    `out` when given.
+    """
+    state = state or {}
+    p = IndicatorPass(close, volume, state)
+    cols = {}
+    for spec in specs:
+        for name, values in KINDS[spec["kind"]][0](p, spec).items():
+            if out is None:
+                cols[name] = values
+            else:
+                out[name][:] = values
+    cols = cols if out is None else out
+    lookback = max([KINDS[s["kind"]][1](s) for s in specs] + [0])
+    return cols, p.state(lookback, specs)
+
+def can_resume(state, specs=INDICATORS) -> bool:
+    """True when state was produced with the same indicator set."""
+    return state is not None and state.get("specs") == [dict(s) for s in specs]
+
+def add_indicators(df: pd.DataFrame, suffix: str, specs=INDICATORS, state=None):
+    """
+    Append the indicator columns (with suffix) to df, computed from
+    Close_<suffix> / Volume_<suffix>. Returns (frame, state after its last row).
+    """
+    cols, new_state = compute_indicators(df[f"Close_{suffix}"].to_numpy(dtype=np.float64),
+                                         df[f"Volume_{suffix}"].to_numpy(dtype=np.float64),
+                                         specs, state)
+    block = pd.DataFrame({f"{k}_{suffix}": v for k, v in cols.items()}, index=df.index)
+    return pd.concat([df, block], axis=1), new_state
@@ -0,0 +1,245 @@
+import time                                # wall-clock timing
+from datetime import datetime, timedelta, timezone   # fetch windows
+import numpy as np                         # NumPy for returns and dtype checks
+import pandas as pd                        # pandas for DataFrame operations
+import market_data                         # cached, rate-limited Yahoo Finance downloads
+
+import data_quality                        # intraday cleaning rules
+import multi_asset_pipeline                # asset universe
+import pipeline_orchestrator               # stage cache helpers
+import storage                             # pooled storage backend
+import trading_calendar                    # bar gap statistics per coin
+
+# ---------- CONFIG ----------
+# Yahoo only serves recent intraday history, and minute bars in short requests
+INTERVALS = {
+    "1h": {"bar": "1h",   "lookback_days": 729, "request_days": 729},
+    "1m": {"bar": "1min", "lookback_days": 29,  "request_days": 7},
+}
+# rolling windows in time units (short / medium / long), per interval
+WINDOWS = {
+    "1h": {"Short": "24h",   "Medium": "7D",  "Long": "30D"},
+    "1m": {"Short": "60min", "Medium": "24h", "Long": "7D"},
+}
+OVERLAP_BARS = 3                           # bars re-fetched before the watermark (restatements)
+FLOAT32_RTOL = 1e-6                        # max relative error accepted when narrowing to float32
+
+BRONZE_TABLE = "intraday_bars_bnz"
+SILVER_TABLE = "intraday_bars_sil"
+GOLD_TABLE   = "intraday_features_gold"
+KEY_COLS     = ["Coin", "BarInterval", "BarTime"]
+BAR_COLS     = KEY_COLS + ["OpenPrice", "HighPrice", "LowPrice", "ClosePrice", "Volume"]
+PRICE_COLS   = ["OpenPrice", "HighPrice", "LowPrice", "ClosePrice"]
+
+def gold_columns() -> list:
+    cols = KEY_COLS + ["ClosePrice", "BarReturn", "LogReturn"]
+    for name in ("Short", "Medium", "Long"):
+        cols += [f"SMA_{name}", f"Vol_{name}", f"VolumeSum_{name}"]
+    return cols
+
+# ---------- COMPACT DTYPES ----------
+def to_float32_if_safe(s: pd.Series) -> pd.Series:
+    """Narrow a float column to float32 when no value moves by more than FLOAT32_RTOL."""
+    values = s.to_numpy(dtype=np.float64)
+    narrow = values.astype(np.float32)
+    finite = np.isfinite(values) & (values != 0)
+    err = np.abs(narrow[finite] - values[finite]) / np.abs(values[finite])
+    return s.astype(np.float32) if not err.size or err.max() <= FLOAT32_RTOL else s
+
+def compact_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """float32 prices (where safe), int64 volume, categorical Coin / BarInterval."""
+    out = df.copy()
+    for col in PRICE_COLS:
+        out[col] = to_float32_if_safe(out[col])
+    out["Volume"] = pd.to_numeric(out["Volume"]).fillna(0).round().astype(np.int64)
+    out["Coin"] = out["Coin"].astype("category")
+    out["BarInterval"] = out["BarInterval"].astype("category")
+    return out
+
+# ---------- BRONZE: FETCH ----------
+def fetch_windows(interval: str, watermark=None):
+    """(start, end) datetime pairs covering lookback or the days after watermark."""
+    cfg = INTERVALS[interval]
+    now = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+    earliest = now - timedelta(days=cfg["lookback_days"])
+    start = earliest
+    if watermark is not None:
+        start = max(earliest, pd.Timestamp(watermark).to_pydatetime()
+                    - OVERLAP_BARS * pd.Timedelta(cfg["bar"]).to_pytimedelta())
+    step = timedelta(days=cfg["request_days"])
+    windows = []
+    while start < now:
+        windows.append((start, min(start + step, now)))
+        start += step
+    return windows
+
+def fetch_bars(ticker: str, suffix: str, interval: str, watermark=None) -> pd.DataFrame:
+    """
+    Download intraday bars for one ticker in Yahoo-sized requests and return
+    them in compact long form (BAR_COLS), BarTime as naive UTC.
+    """
+    parts = []
+    requests = [(ticker, start, end, interval) for start, end in fetch_windows(interval, watermark)]
+    for raw in market_data.fetch_many(requests):                    # naive-UTC index, flat columns
+        if raw.empty:
+            continue
+        parts.append(pd.DataFrame({
+            "BarTime":    raw.index,
+            "OpenPrice":  raw["Open"].to_numpy(),
+            "HighPrice":  raw["High"].to_numpy(),
+            "LowPrice":   raw["Low"].to_numpy(),
+            "ClosePrice": raw["Close"].to_numpy(),
+            "Volume":     raw["Volume"].to_numpy(),
+        }))
+    if not parts:
+        print(f"⏭️  No {interval} bars returned for {ticker}")
+        return pd.DataFrame(columns=BAR_COLS)
+    bars = pd.concat(parts, ignore_index=True)
+    bars.insert(0, "Coin", suffix)
+    bars.insert(1, "BarInterval", interval)
+    print(f"📥 {ticker}: {len(bars):,} {interval} bars")
+    return compact_bars(bars[BAR_COLS])
+
+def merge_bars(history, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """Append new bars to the history; a re-fetched BarTime replaces the old bar."""
+    if history is None or history.empty:
+        return new_rows.reset_index(drop=True)
+    if new_rows.empty:
+        return history
+    merged = pd.concat([history, new_rows], ignore_index=True)
+    merged = merged.drop_duplicates(subset=["BarTime"], keep="last")
+    return compact_bars(merged.sort_values("BarTime").reset_index(drop=True))
+
+# ---------- SILVER: CLEAN ----------
+def clean_bars(bars: pd.DataFrame, interval: str):
+    """Run the intraday rules; returns (clean bars sorted by BarTime, counts, quarantine)."""
+    rules = data_quality.intraday_rules(INTERVALS[interval]["bar"])
+    clean, counts, quarantine = data_quality.run_rules(bars, rules, date_col="BarTime")
+    return clean.sort_values("BarTime").reset_index(drop=True), counts, quarantine
+
+# ---------- GOLD: TIME-WINDOW FEATURES ----------
+def compute_bar_features(bars: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Bar returns plus rolling mean price, return volatility and volume over
+    time-based windows (e.g. '24h', '7D'), so a window means the same span
+    of time whatever gaps the bar series has. Outputs are float32.
+    """
+    work = bars.set_index("BarTime")
+    close = work["ClosePrice"].astype(np.float64)
+    log_ret = np.log(close / close.shift(1))
+    out = bars[KEY_COLS + ["ClosePrice"]].copy()
+    out["BarReturn"] = (close.pct_change()).to_numpy(dtype=np.float32)
+    out["LogReturn"] = log_ret.to_numpy(dtype=np.float32)
+    for name, window in WINDOWS[interval].items():
+        out[f"SMA_{name}"] = close.rolling(window).mean().to_numpy(dtype=np.float32)
+        out[f"Vol_{name}"] = log_ret.rolling(window).std().to_numpy(dtype=np.float32)
+        out[f"VolumeSum_{name}"] = work["Volume"].rolling(window).sum().to_numpy(dtype=np.int64)
+    return out
+
+def compute_bar_features_incremental(silver: pd.DataFrame, last_time, interval: str) -> pd.DataFrame:
+    """
+    Features only for bars after last_time. Time windows look back at most
+    the longest window, so computing over that tail (plus one bar for the
+    first return) gives the same values as a full recompute.
+    """
+    longest = max(pd.Timedelta(w) for w in WINDOWS[interval].values())
+    times = silver["BarTime"].to_numpy()
+    start = max(0, int(np.searchsorted(times, np.datetime64(last_time - longest), "right")) - 1)
+    feats = compute_bar_features(silver.iloc[start:].reset_index(drop=True), interval)
+    return feats[feats["BarTime"] > last_time].reset_index(drop=True)
+
+# ---------- PERSIST ----------
+def persist_rows(table: str, df: pd.DataFrame, cols):
+    """Upsert rows by (Coin, BarInterval, BarTime); other coins/intervals are untouched."""
+    if df.empty:
+        return
+    n = storage.get_backend().merge_frame(table, df, cols, key_cols=KEY_COLS,
+                                          int_cols=[c for c in cols if c.startswith("Volume")])
+    print(f"✅ Merged {n:,} rows into {table}")
+
+# ---------- RUNNER ----------
+def run_intraday(universe=None, interval: str = "1h", persist: bool = True,
+                 full_refresh: bool = False) -> dict:
+    """
+    Bronze → silver → gold for intraday bars of one interval.
+    Bar history, silver and gold per coin are cached as
+    'intraday_<interval>'; each run fetches only bars after the cached
+    watermark, and writes only the bars and features that changed when
+    the cached coin was also written to the current backend (its 'backend'
+    marker); otherwise the full bronze, silver and gold frames are. Bar
+    gaps per coin go to calendar_gap_stats; bars are not imputed, since the
+    gold windows are already time-based.
+    Returns {suffix: {'bronze', 'silver', 'gold', 'backend'}}.
+    """
+    universe = multi_asset_pipeline.parse_universe() if universe is None else universe
+    cache_key = f"intraday_{interval}"
+    previous = {} if full_refresh else (pipeline_orchestrator.load_cached(cache_key) or {})
+    backend_name = storage.get_backend().name if persist else None
+    out, gaps = {}, []
+    t0 = time.perf_counter()
+    for ticker, _, suffix in universe:
+        prev = previous.get(suffix, {})
+        history = prev.get("bronze")
+        watermark = None if history is None or history.empty else history["BarTime"].max()
+        new_bars = fetch_bars(ticker, suffix, interval, watermark)
+        bronze = merge_bars(history, new_bars)
+        if bronze.empty:
+            continue
+
+        silver, counts, _ = clean_bars(bronze, interval)
+        flagged = {k: v for k, v in counts.items() if v}
+        if flagged:
+            print(f"🔎 {suffix} {interval}: {flagged}")
+        gaps.append(trading_calendar.gap_stats(silver, date_col="BarTime",
+                                               freq=INTERVALS[interval]["bar"], asset=suffix))
+
+        # gold: keep cached features before the first re-fetched bar, compute the rest
+        prev_gold = prev.get("gold")
+        since = None if history is None or history.empty else (
+            new_bars["BarTime"].min() if not new_bars.empty else pd.Timestamp.max)
+        kept = None if prev_gold is None or since is None else prev_gold[prev_gold["BarTime"] < since]
+        if kept is not None and not kept.empty:
+            fresh = compute_bar_features_incremental(silver, kept["BarTime"].max(), interval)
+            gold = pd.concat([kept, fresh], ignore_index=True)
+        else:
+            gold = fresh = compute_bar_features(silver, interval)
+            since = None                                     # everything is new
+
+        if persist:
+            if prev.get("backend") != backend_name:
+                since, fresh = None, gold                    # tables may lag the cache
+            persist_rows(BRONZE_TABLE, bronze if since is None else bronze[bronze["BarTime"] >= since],
+                         BAR_COLS)
+            persist_rows(SILVER_TABLE, silver if since is None else silver[silver["BarTime"] >= since],
+                         BAR_COLS)
+            persist_rows(GOLD_TABLE, fresh, gold_columns())
+        out[suffix] = {"bronze": bronze, "silver": silver, "gold": gold, "backend": backend_name}
+
+    pipeline_orchestrator.save_cached(cache_key, out)
+    if gaps:
+        gaps = pd.concat(gaps, ignore_index=True)
+        trading_calendar.print_gap_stats(gaps)
+        if persist:
+            trading_calendar.write_gap_stats(gaps)
+    print(f"⏱️  {interval} bars for {len(out)} assets in {time.perf_counter() - t0:.2f}s")
+    return out
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run bronze → silver → gold on intraday bars")
+    parser.add_argument("--interval", choices=sorted(INTERVALS), default="1h",
+                        help="bar interval (default: %(default)s)")
+    parser.add_argument("--assets", default=multi_asset_pipeline.UNIVERSE_ENV,
+                        help="comma-separated tickers or a file with one ticker per line")
+    parser.add_argument("--no-persist", action="store_true", help="do not write tables")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="ignore cached bars and re-download the full lookback")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.BACKEND,
+                        help="storage backend (default: %(default)s)")
+    parser.add_argument("--source", choices=sorted(market_data.SOURCES), default=market_data.SOURCE,
+                        help="market data source; 'fake' needs no network (default: %(default)s)")
+    args = parser.parse_args()
+    storage.set_backend(args.backend)
+    market_data.set_fetcher(args.source)
+    run_intraday(multi_asset_pipeline.parse_universe(args.assets), interval=args.interval,
+                 persist=not args.no_persist, full_refresh=args.full_refresh)
@@ -0,0 +1,309 @@
+import os                                  # lake root and partition paths
+import re                                  # table name → (layer, coin) mapping
+import shutil                              # drop a table's files on full replace
+from datetime import date                  # date filters
+import numpy as np                         # inf → null before writing
+import pandas as pd                        # pandas for DataFrame conversion
+import pyarrow as pa                       # Arrow tables and types
+import pyarrow.compute as pc               # year extraction and max over Arrow columns
+import pyarrow.dataset as ds               # partitioned Parquet datasets with filter pushdown
+import pyarrow.fs as pafs                  # memory-mapped local filesystem
+
+import storage                             # StorageBackend base class
+
+# ---------- CONFIG ----------
+LAKE_PATH = os.environ.get("CRYPTO_LAKE_PATH", "lakehouse")     # root directory of the lake
+
+# table name → (layer directory, coin) for the per-coin layer tables
+TABLE_PATTERNS = [
+    (re.compile(r"^raw_(\w+)_prices_bnz$"), "bronze"),
+    (re.compile(r"^raw_(\w+)_prices_sil$"), "silver"),
+    (re.compile(r"^gold_(\w+)_prices$"),    "gold"),
+]
+# long-format multi-asset tables → layer directory, partitioned by asset and year
+LONG_TABLES = {
+    "asset_prices_bnz":  "bronze_long",
+    "asset_prices_sil":  "silver_long",
+    "asset_prices_gold": "gold_long",
+}
+# intraday bar tables → layer directory, partitioned by coin and year of BarTime
+INTRADAY_TABLES = {
+    "intraday_bars_bnz":      "intraday_bronze",
+    "intraday_bars_sil":      "intraday_silver",
+    "intraday_features_gold": "intraday_gold",
+}
+YEAR_PARTITIONING = ds.partitioning(pa.schema([("year", pa.int32())]), flavor="hive")
+ASSET_YEAR_PARTITIONING = ds.partitioning(
+    pa.schema([("Asset", pa.string()), ("year", pa.int32())]), flavor="hive")
+COIN_YEAR_PARTITIONING = ds.partitioning(
+    pa.schema([("Coin", pa.string()), ("year", pa.int32())]), flavor="hive")
+DATE_COLUMNS = {"PriceDate"}                                    # stored as date32, like SQL DATE
+POINTER_FILE = "_CURRENT"                  # names a table's live version directory
+VERSION_DIR = re.compile(r"^_v(\d+)$")     # full rewrites go to <table>/_v<N>/ ('_' hides them from scans)
+
+# ---------- ARROW → PANDAS ----------
+def to_frame(arrow_table: pa.Table) -> pd.DataFrame:
+    """
+    Convert to pandas with the dtypes a SQL read would give: datetime64
+    dates and plain numpy ints/floats (no nullable extension dtypes).
+    """
+    return arrow_table.to_pandas(date_as_object=False, ignore_metadata=True)
+
+# ---------- LAKEHOUSE BACKEND ----------
+class LakehouseBackend(storage.StorageBackend):
+    """
+    File-based alternative to the SQL tables. Each layer table is stored as
+    Parquet under <root>/<layer>/coin=<COIN>/year=<YYYY>/, and reads are
+    memory-mapped with column and date filters pushed down to the files,
+    so only the partitions and columns a loader asks for are touched.
+    Long-format multi-asset tables go under <root>/<layer>_long/Asset=<A>/year=<YYYY>/,
+    intraday bar tables under <root>/intraday_<layer>/Coin=<C>/year=<YYYY>/.
+    Tables outside these patterns (e.g. platinum_crypto_horizon) are
+    stored unpartitioned under <root>/<table>/.
+    Every table directory holds versions (_v1/, _v2/, ...) and a _CURRENT
+    file naming the live one; the partitions above sit inside it. Tables
+    written before versioning (partitions directly in the table directory,
+    no _CURRENT) are read as they are until their next full rewrite.
+    """
+
+    name = "lakehouse"
+
+    def __init__(self, root: str = LAKE_PATH):
+        self.root = root
+        self.fs = pafs.LocalFileSystem(use_mmap=True)   # memory-map Parquet reads
+        os.makedirs(root, exist_ok=True)
+
+    # --- layout ---
+    def table_path(self, table: str) -> str:
+        if table in LONG_TABLES:
+            return os.path.join(self.root, LONG_TABLES[table])
+        if table in INTRADAY_TABLES:
+            return os.path.join(self.root, INTRADAY_TABLES[table])
+        for pattern, layer in TABLE_PATTERNS:
+            m = pattern.match(table)
+            if m:
+                return os.path.join(self.root, layer, f"coin={m.group(1).upper()}")
+        return os.path.join(self.root, table)
+
+    def partitioning(self, table: str):
+        if table in LONG_TABLES:
+            return ASSET_YEAR_PARTITIONING
+        if table in INTRADAY_TABLES:
+            return COIN_YEAR_PARTITIONING
+        if any(pattern.match(table) for pattern, _ in TABLE_PATTERNS):
+            return YEAR_PARTITIONING
+        return None
+
+    def is_partitioned(self, table: str) -> bool:
+        return self.partitioning(table) is not None
+
+    @staticmethod
+    def partition_date_col(table: str) -> str:
+        """Column whose year picks the partition."""
+        return "BarTime" if table in INTRADAY_TABLES else "PriceDate"
+
+    def current_path(self, table: str) -> str:
+        """Live version directory of the table (the table directory itself before versioning)."""
+        path = self.table_path(table)
+        try:
+            with open(os.path.join(path, POINTER_FILE)) as f:
+                return os.path.join(path, f.read().strip())
+        except FileNotFoundError:
+            return path
+
+    def dataset(self, table: str):
+        path = self.current_path(table)
+        if not os.path.isdir(path):
+            return None
+        return ds.dataset(path, format="parquet", filesystem=self.fs,
+                          partitioning=self.partitioning(table))
+
+    # --- type normalisation ---
+    @staticmethod
+    def to_arrow(df: pd.DataFrame, table_cols, frame_cols, int_cols) -> pa.Table:
+        """
+        Select/rename frame columns to table columns and apply the same value
+        rules as db_writer: dates → date32, volumes → int64, NaN/inf → null,
+        categoricals → their plain value type.
+        """
+        out = df[list(frame_cols)].copy()
+        out.columns = list(table_cols)
+        for col in out.columns:
+            s = out[col]
+            if pd.api.types.is_datetime64_any_dtype(s):
+                continue
+            if col in int_cols:
+                out[col] = pd.to_numeric(s).replace([np.inf, -np.inf], np.nan).round().astype("Int64")
+            elif pd.api.types.is_float_dtype(s):
+                out[col] = s.replace([np.inf, -np.inf], np.nan)
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        for i, field in enumerate(table.schema):
+            if field.name in DATE_COLUMNS and pa.types.is_timestamp(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+            elif pa.types.is_dictionary(field.type):
+                table = table.set_column(i, field.name,
+                                         table.column(i).cast(field.type.value_type))
+        return table
+
+    def write(self, table: str, arrow_table: pa.Table, replace_all: bool):
+        """
+        Write arrow_table into the table's partitions. replace_all writes a
+        complete new version directory, checks its row count and then points
+        _CURRENT at it with one atomic os.replace, so readers see the old or
+        the new table (never a missing one), and a failed write leaves the
+        old one live. The version before stays on disk until the next
+        rewrite, for readers that resolved the pointer just before the switch.
+        """
+        path = self.table_path(table)
+        pointer = os.path.join(path, POINTER_FILE)
+        if not replace_all and (os.path.exists(pointer) or os.path.isdir(path)):
+            self.write_dataset(table, arrow_table, self.current_path(table))
+            return
+        live = os.path.basename(self.current_path(table)) if os.path.exists(pointer) else None
+        os.makedirs(path, exist_ok=True)
+        versions = [int(m.group(1)) for m in map(VERSION_DIR.match, os.listdir(path)) if m]
+        version = f"_v{max(versions, default=0) + 1}"
+        stage = os.path.join(path, version)
+        self.write_dataset(table, arrow_table, stage)
+        written = 0                                    # an empty table writes no files at all
+        if os.path.isdir(stage):
+            written = ds.dataset(stage, format="parquet", filesystem=self.fs,
+                                 partitioning=self.partitioning(table)).count_rows()
+        if written != arrow_table.num_rows:
+            shutil.rmtree(stage, ignore_errors=True)
+            raise RuntimeError(f"{stage} holds {written:,} rows, expected {arrow_table.num_rows:,}")
+        tmp = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(version)
+        os.replace(tmp, pointer)                       # the switch: readers resolve the new version
+        for name in os.listdir(path):                  # older versions, failed writes, pre-versioning files
+            if name in (POINTER_FILE, version, live) or name.endswith(".tmp"):
+                continue
+            full = os.path.join(path, name)
+            if os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+            else:
+                os.remove(full)
+
+    def write_dataset(self, table: str, arrow_table: pa.Table, path: str):
+        if self.is_partitioned(table):
+            years = pc.year(arrow_table.column(self.partition_date_col(table))).cast(pa.int32())
+            arrow_table = arrow_table.append_column("year", years)
+            ds.write_dataset(arrow_table, path, format="parquet", filesystem=self.fs,
+                             partitioning=self.partitioning(table),
+                             existing_data_behavior="delete_matching",
+                             basename_template="part-{i}.parquet")
+        else:
+            ds.write_dataset(arrow_table, path, format="parquet", filesystem=self.fs,
+                             existing_data_behavior="delete_matching",
+                             basename_template="part-{i}.parquet")
+
+    # --- StorageBackend operations ---
+    def read_sql(self, sql: str, params=None, parse_dates=None):
+        raise NotImplementedError("The lakehouse backend has no SQL engine; use read_table().")
+
+    def execute(self, sql: str, params=()):
+        raise NotImplementedError("The lakehouse backend has no SQL engine.")
+
+    @storage.timed
+    def read_table(self, table: str, columns, start=None, end=None,
+                   date_col: str = "PriceDate") -> pd.DataFrame:
+        """
+        Read `columns` of `table` between start and end (inclusive).
+        The date range prunes year partitions and Parquet row groups; only
+        the requested columns are decoded. Non-DATE columns (BarTime) are
+        filtered as timestamps.
+        """
+        dataset = self.dataset(table)
+        if dataset is None:
+            return pd.DataFrame(columns=list(columns))
+
+        flt = None
+        partitioned = self.is_partitioned(table)
+
+        def bound(value):
+            if date_col in DATE_COLUMNS:
+                return pa.scalar(value.date(), pa.date32())
+            return pa.scalar(value.to_pydatetime(), pa.timestamp("us"))
+
+        if start is not None:
+            start = pd.Timestamp(start)
+            flt = ds.field(date_col) >= bound(start)
+            if partitioned:
+                flt = flt & (ds.field("year") >= start.year)
+        if end is not None:
+            end = pd.Timestamp(end)
+            cond = ds.field(date_col) <= bound(end)
+            if partitioned:
+                cond = cond & (ds.field("year") <= end.year)
+            flt = cond if flt is None else flt & cond
+
+        arrow_table = dataset.to_table(columns=list(columns), filter=flt)
+        df = to_frame(arrow_table)
+        if date_col in df.columns:
+            df[date_col] = pd.to_datetime(df[date_col])
+            df = df.sort_values(date_col, kind="stable").reset_index(drop=True)
+        return df
+
+    @storage.timed
+    def max_date(self, table: str, column: str = "PriceDate"):
+        dataset = self.dataset(table)
+        if dataset is None:
+            return None
+        values = dataset.to_table(columns=[column]).column(column)
+        if len(values) == 0:
+            return None
+        value = pc.max(values).as_py()
+        return value if isinstance(value, date) else pd.Timestamp(value).date()
+
+    @storage.timed
+    def max_timestamp(self, table: str, column: str):
+        dataset = self.dataset(table)
+        if dataset is None:
+            return None
+        values = dataset.to_table(columns=[column]).column(column)
+        value = pc.max(values).as_py() if len(values) else None
+        return None if value is None else pd.Timestamp(value)
+
+    @storage.timed
+    def replace_table(self, table: str, df: pd.DataFrame, table_cols, frame_cols=None,
+                      int_cols=(), chunk_size: int = None) -> int:
+        """Rewrite every partition of `table` from df."""
+        frame_cols = table_cols if frame_cols is None else frame_cols
+        self.write(table, self.to_arrow(df, table_cols, frame_cols, set(int_cols)),
+                   replace_all=True)
+        return len(df)
+
+    @storage.timed
+    def merge_frame(self, table: str, df: pd.DataFrame, table_cols, key_cols, frame_cols=None,
+                    int_cols=(), timestamp_col=None, chunk_size: int = None) -> int:
+        """
+        Upsert df by key_cols. Only the year partitions touched by df are
+        read, combined (new rows win) and rewritten.
+        """
+        frame_cols = table_cols if frame_cols is None else frame_cols
+        new = to_frame(self.to_arrow(df, table_cols, frame_cols, set(int_cols)))
+        if timestamp_col:
+            new[timestamp_col] = pd.Timestamp.now(tz="UTC").tz_localize(None)
+
+        dataset = self.dataset(table)
+        if dataset is not None and self.is_partitioned(table):
+            years = sorted(pd.to_datetime(new[self.partition_date_col(table)])
+                           .dt.year.unique().tolist())
+            old = to_frame(dataset.to_table(filter=ds.field("year").isin(years)))
+            old = old.drop(columns=["year"], errors="ignore")
+            combined = pd.concat([old, new], ignore_index=True)
+        elif dataset is not None:
+            combined = pd.concat([to_frame(dataset.to_table()), new], ignore_index=True)
+        else:
+            combined = new
+        combined = combined.drop_duplicates(subset=list(key_cols), keep="last")
+        combined = combined.sort_values(list(key_cols), kind="stable")
+        cols = list(combined.columns)
+        int_present = {c for c in cols if pd.api.types.is_integer_dtype(combined[c])}
+        self.write(table, self.to_arrow(combined, cols, cols, int_present),
+                   replace_all=not self.is_partitioned(table))
+        return len(df)
+
+    def close(self):
+        pass
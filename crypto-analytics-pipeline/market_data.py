@@ -0,0 +1,284 @@
+import os                                  # environment config and cache paths
+import re                                  # safe cache file names
+import time                                # rate limiting and backoff sleeps
+import random                              # backoff jitter
+import zlib                                # stable per-ticker seeds for the fake source
+import threading                           # rate limiter and per-key cache locks
+from concurrent.futures import ThreadPoolExecutor   # concurrent downloads (network-bound)
+import numpy as np                         # NumPy for the fake source
+import pandas as pd                        # pandas for bar frames and the pickle cache
+
+# ---------- CONFIG ----------
+SOURCE        = os.environ.get("CRYPTO_FETCH_SOURCE", "yahoo")          # 'yahoo' or 'fake'
+FETCH_WORKERS = int(os.environ.get("CRYPTO_FETCH_WORKERS", "4"))        # concurrent requests
+RATE_LIMIT    = float(os.environ.get("CRYPTO_FETCH_RATE", "2"))         # request starts per second (0 = no limit)
+CACHE_DIR     = os.environ.get("CRYPTO_FETCH_CACHE",                  # '' disables the cache
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fetch_cache"))
+MAX_RETRIES   = 4                          # attempts after the first failure
+BACKOFF_BASE  = 1.0                        # seconds before the first retry, doubled each time
+BACKOFF_MAX   = 30.0                       # cap on one backoff sleep
+# bars newer than this are re-downloaded on every request, so late
+# restatements still arrive (longer than bronze RESTATEMENT_OVERLAP_DAYS)
+SETTLE = {"1d": "7D", "1h": "1D", "1m": "1D"}
+
+PRICE_FIELDS = ["Close", "High", "Low", "Open", "Volume"]   # yf.download column order
+
+# ---------- SOURCES ----------
+# A source has download(ticker, start, end, interval) → frame with a
+# DatetimeIndex and PRICE_FIELDS columns for bars in [start, end), and
+# raises on a failed request (the fetcher retries it).
+class YahooSource:
+    """yf.download; yfinance is imported on first use."""
+
+    def __init__(self):
+        import yfinance                                # only needed for live downloads
+        self.yf = yfinance
+
+    def download(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp, interval: str):
+        if interval == "1d":
+            start, end = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+        else:
+            start, end = start.to_pydatetime(), end.to_pydatetime()
+        return self.yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+
+class FakeSource:
+    """
+    Deterministic local bars for tests and benchmarks without network.
+    Every bar is a function of (ticker, bar time) only, so overlapping
+    requests agree. latency adds a sleep per request; fail_rate makes
+    that share of requests raise, to exercise retries.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def download(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp, interval: str):
+        with self.lock:
+            self.requests += 1
+            fail = self.rng.random() < self.fail_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError(f"fake source: injected failure for {ticker}")
+        bar = "1D" if interval == "1d" else interval.replace("m", "min")
+        index = pd.date_range(start.ceil(bar), end, freq=bar, inclusive="left", name="Date")
+        seed = zlib.crc32(ticker.encode()) % 1000
+        days = index.to_numpy(dtype="datetime64[s]").astype(np.int64) / 86400.0
+        step = (index.asi8 // pd.Timedelta(bar).value).astype(np.uint64)
+        noise = ((step * np.uint64(2654435761) + np.uint64(seed)) % np.uint64(2**32)) / 2**32 - 0.5
+        close = (50 + seed) * np.exp(0.3 * np.sin(days / 90 + seed) + 0.05 * np.sin(days / 7)
+                                     + 0.02 * noise)
+        return pd.DataFrame({
+            "Close":  close,
+            "High":   close * (1.01 + 0.01 * np.abs(noise)),
+            "Low":    close * (0.99 - 0.01 * np.abs(noise)),
+            "Open":   close * (1 + 0.005 * noise),
+            "Volume": np.round(1e6 * (1.5 + np.sin(days / 3) + noise)).astype(np.int64),
+        }, index=index)
+
+SOURCES = {
+    "yahoo": YahooSource,
+    "fake":  FakeSource,
+}
+
+def normalize(raw: pd.DataFrame) -> pd.DataFrame:
+    """Flatten yfinance MultiIndex columns, keep PRICE_FIELDS, naive-UTC 'Date' index, sorted."""
+    df = raw.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)            # ('Close', 'BTC-USD') → 'Close'
+    df = df[[c for c in PRICE_FIELDS if c in df.columns]]
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    df.index = index.rename("Date")
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+# ---------- RATE LIMIT / RETRY ----------
+class RateLimiter:
+    """Space request starts at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float = RATE_LIMIT):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for retry number attempt (0-based)."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+# ---------- ON-DISK CACHE ----------
+# One pickle per (interval, ticker): the bars downloaded so far and the
+# [start, end) ranges they cover. A request only downloads the parts of
+# its range that no earlier request covered.
+def missing_ranges(ranges, start: pd.Timestamp, end: pd.Timestamp) -> list:
+    """Sub-ranges of [start, end) not covered by the sorted, disjoint ranges."""
+    gaps, cursor = [], start
+    for lo, hi in ranges:
+        if hi <= cursor:
+            continue
+        if lo >= end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo))
+        cursor = max(cursor, hi)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+def add_range(ranges, start: pd.Timestamp, end: pd.Timestamp) -> list:
+    """Union of the ranges with [start, end), merged and sorted."""
+    merged = []
+    for lo, hi in sorted(list(ranges) + [(start, end)]):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+class FetchCache:
+    def __init__(self, root: str = CACHE_DIR):
+        self.root = root
+
+    def path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, re.sub(r"[^\w.-]", "_", ticker) + ".pkl")
+
+    def load(self, ticker: str, interval: str) -> dict:
+        path = self.path(ticker, interval)
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+        return {"ranges": [], "bars": pd.DataFrame(columns=PRICE_FIELDS,
+                                                   index=pd.DatetimeIndex([], name="Date"))}
+
+    def save(self, ticker: str, interval: str, entry: dict):
+        path = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pd.to_pickle(entry, tmp)
+        os.replace(tmp, path)                                   # readers never see a partial file
+
+# ---------- FETCHER ----------
+class Fetcher:
+    """
+    Cached, rate-limited, retrying downloads over a thread pool.
+      - source: a SOURCES name or an object with download(...)
+      - rate: request starts per second shared by all threads (0 = unlimited)
+      - cache_dir=None: no on-disk cache
+    """
+
+    def __init__(self, source=None, workers: int = FETCH_WORKERS, rate: float = RATE_LIMIT,
+                 cache_dir=CACHE_DIR):
+        source = SOURCE if source is None else source
+        self.source = SOURCES[source]() if isinstance(source, str) else source
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate)
+        self.cache = FetchCache(cache_dir) if cache_dir else None
+        self.locks = {}
+        self.locks_lock = threading.Lock()
+        self.stats = {"requests": 0, "downloads": 0, "retries": 0, "cached": 0}
+
+    def key_lock(self, ticker: str, interval: str) -> threading.Lock:
+        with self.locks_lock:
+            return self.locks.setdefault((ticker, interval), threading.Lock())
+
+    def count(self, key: str, n: int = 1):
+        with self.locks_lock:
+            self.stats[key] += n
+
+    def request(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp,
+                interval: str) -> pd.DataFrame:
+        """One source request under the rate limit, retried with exponential backoff."""
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.wait()
+            try:
+                self.count("downloads")
+                return normalize(self.source.download(ticker, start, end, interval))
+            except Exception as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = backoff_seconds(attempt)
+                self.count("retries")
+                print(f"🔁 {ticker} {interval} {start:%Y-%m-%d} → {end:%Y-%m-%d}: {e} "
+                      f"(retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s)")
+                time.sleep(delay)
+
+    def download(self, ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+        """
+        Bars for ticker in [start, end), normalized (see normalize). Only
+        the parts of the range missing from the cache are requested; bars
+        younger than SETTLE[interval] are never treated as cached.
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        self.count("requests")
+        if self.cache is None:
+            return self.request(ticker, start, end, interval)
+        with self.key_lock(ticker, interval):
+            entry = self.cache.load(ticker, interval)
+            gaps = missing_ranges(entry["ranges"], start, end)
+            if not gaps:
+                self.count("cached")
+            else:
+                fresh = [self.request(ticker, lo, hi, interval) for lo, hi in gaps]
+                parts = [b for b in [entry["bars"]] + fresh if not b.empty]
+                if parts:
+                    bars = pd.concat(parts)
+                    entry["bars"] = bars[~bars.index.duplicated(keep="last")].sort_index()
+                settled = (pd.Timestamp.now(tz="UTC").tz_localize(None)
+                           - pd.Timedelta(SETTLE.get(interval, "1D"))).floor("1min")
+                if interval == "1d":
+                    settled = settled.floor("1D")
+                for lo, hi in gaps:
+                    if lo < settled:
+                        entry["ranges"] = add_range(entry["ranges"], lo, min(hi, settled))
+                self.cache.save(ticker, interval, entry)
+        bars = entry["bars"]
+        return bars[(bars.index >= start) & (bars.index < end)].copy()
+
+    def fetch_many(self, requests) -> list:
+        """
+        Run download(*request) for every (ticker, start, end, interval)
+        request on the thread pool; results come back in request order.
+        """
+        requests = list(requests)
+        before = dict(self.stats)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(requests)))) as pool:
+            out = list(pool.map(lambda r: self.download(*r), requests))
+        delta = {k: self.stats[k] - before[k] for k in self.stats}
+        print(f"📥 {delta['requests']} requests: {delta['cached']} from cache, "
+              f"{delta['downloads']} downloads, {delta['retries']} retries "
+              f"in {time.perf_counter() - t0:.2f}s")
+        return out
+
+_fetcher = None
+
+def get_fetcher() -> Fetcher:
+    """Return the process-wide fetcher, creating it from CONFIG on first use."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = Fetcher()
+    return _fetcher
+
+def set_fetcher(fetcher) -> Fetcher:
+    """Install the process-wide fetcher: a Fetcher or a SOURCES name ('yahoo', 'fake')."""
+    global _fetcher
+    _fetcher = Fetcher(fetcher) if isinstance(fetcher, str) else fetcher
+    return _fetcher
+
+def download(ticker: str, start, end, interval: str = "1d") -> pd.DataFrame:
+    return get_fetcher().download(ticker, start, end, interval)
+
+def fetch_many(requests) -> list:
+    return get_fetcher().fetch_many(requests)
@@ -0,0 +1,108 @@
+import os                                  # environment config
+import numpy as np                         # vectorized path simulation
+import pandas as pd                        # pandas for DataFrame operations
+
+import platinum_forecasting                # HORIZONS, FORECAST_START, PLAT_COLS
+import storage                             # pooled storage backend
+import trading_calendar                    # imputed calendar days are not bootstrapped
+
+# ---------- CONFIG ----------
+BANDS_TABLE = "platinum_horizon_bands"
+N_PATHS     = int(os.environ.get("CRYPTO_MC_PATHS", "20000"))   # simulated paths per coin
+CHUNK_PATHS = 2_000                        # paths simulated together (bounds peak memory)
+BLOCK_DAYS  = 365                          # days drawn per step inside a chunk
+N_BINS      = 8_192                        # histogram bins per horizon for the percentiles
+SPAN_SIGMAS = 12                           # histogram covers ±SPAN_SIGMAS · σ·√h
+PERCENTILES = (5, 25, 50, 75, 95)
+SOURCES     = ("bootstrap", "residuals")   # gold LogReturn, or the selected model's log residuals
+SOURCE      = os.environ.get("CRYPTO_MC_SOURCE", "bootstrap")
+
+BAND_COLS = ["Coin", "HorizonLabel", "TargetDate", "Source", "Paths",
+             "P5", "P25", "P50", "P75", "P95"]
+
+# ---------- INNOVATIONS ----------
+def gold_log_returns(gold_df: pd.DataFrame, suffix: str) -> np.ndarray:
+    """Observed daily gold LogReturn since FORECAST_START, the pool for bootstrapping."""
+    dates = pd.to_datetime(gold_df["PriceDate"])
+    values = trading_calendar.mask_imputed(gold_df, f"LogReturn_{suffix}")
+    values = values[(dates >= platinum_forecasting.FORECAST_START).to_numpy()]
+    return values[np.isfinite(values)]
+
+# ---------- SIMULATION ----------
+def simulate_quantiles(innovations: np.ndarray, horizons, n_paths: int = N_PATHS,
+                       chunk_paths: int = CHUNK_PATHS, block_days: int = BLOCK_DAYS,
+                       percentiles=PERCENTILES, seed: int = 0) -> np.ndarray:
+    """
+    Percentiles of the cumulative log shock after each horizon (in days).
+    Innovations are demeaned and resampled i.i.d.; each chunk of paths is
+    walked forward block_days at a time with a running sum, and the sums at
+    the horizon days are binned into a fixed histogram per horizon. Memory
+    is O(chunk_paths · block_days + len(horizons) · N_BINS) regardless of
+    n_paths or the longest horizon.
+    Returns an array of shape (len(horizons), len(percentiles)).
+    """
+    pool = (innovations - innovations.mean()).astype(np.float32)
+    horizons = np.asarray(horizons, dtype=int)
+    longest = int(horizons.max())
+    rng = np.random.default_rng(seed)
+
+    # histogram range per horizon, wide enough that clipping is negligible
+    half = SPAN_SIGMAS * max(float(pool.std()), 1e-12) * np.sqrt(horizons)
+    lo, width = -half, 2 * half / N_BINS
+    counts = np.zeros((len(horizons), N_BINS), dtype=np.int64)
+
+    for start in range(0, n_paths, chunk_paths):
+        n = min(chunk_paths, n_paths - start)
+        level = np.zeros(n, dtype=np.float64)           # running log shock per path
+        for day0 in range(0, longest, block_days):
+            days = min(block_days, longest - day0)
+            draws = pool[rng.integers(0, len(pool), size=(n, days))]
+            walk = level[:, None] + np.cumsum(draws, axis=1, dtype=np.float64)
+            level = walk[:, -1]
+            inside = np.nonzero((horizons > day0) & (horizons <= day0 + days))[0]
+            for h in inside:
+                values = walk[:, horizons[h] - day0 - 1]
+                bins = np.clip(((values - lo[h]) / width[h]).astype(np.int64), 0, N_BINS - 1)
+                counts[h] += np.bincount(bins, minlength=N_BINS)
+
+    # invert each histogram's CDF, interpolating linearly inside the bin
+    cdf = np.cumsum(counts, axis=1) / n_paths
+    out = np.empty((len(horizons), len(percentiles)))
+    for j, p in enumerate(percentiles):
+        q = p / 100
+        i = np.argmax(cdf >= q, axis=1)                 # first bin reaching q
+        below = np.where(i > 0, cdf[np.arange(len(horizons)), i - 1], 0.0)
+        inbin = counts[np.arange(len(horizons)), i] / n_paths
+        frac = np.divide(q - below, inbin, out=np.full(len(horizons), 0.5), where=inbin > 0)
+        out[:, j] = lo + width * (i + frac)
+    return out
+
+# ---------- PLATINUM BANDS ----------
+def horizon_bands(plat_rows: pd.DataFrame, innovations: dict, source: str,
+                  n_paths: int = N_PATHS, seed: int = 0) -> pd.DataFrame:
+    """
+    Percentile price bands around each coin's point forecast.
+      - plat_rows: platinum rows (PLAT_COLS) for one or more coins
+      - innovations: {coin: daily log innovations}
+    Simulated shocks are centred, so P50 sits on the point forecast and the
+    band width comes from the spread of the innovations.
+    """
+    out = []
+    for coin, rows in plat_rows.groupby("Coin", sort=False):
+        if coin not in innovations or len(innovations[coin]) < 2:
+            continue
+        days = rows["HorizonLabel"].map(platinum_forecasting.HORIZONS).to_numpy()
+        q = simulate_quantiles(innovations[coin], days, n_paths=n_paths, seed=seed)
+        bands = rows["Forecast"].to_numpy()[:, None] * np.exp(q)
+        frame = rows[["Coin", "HorizonLabel", "TargetDate"]].copy()
+        frame["Source"], frame["Paths"] = source, n_paths
+        frame[[f"P{p}" for p in PERCENTILES]] = bands
+        out.append(frame)
+    if not out:
+        return pd.DataFrame(columns=BAND_COLS)
+    return pd.concat(out, ignore_index=True)[BAND_COLS]
+
+def write_bands(bands: pd.DataFrame):
+    """Truncate and reload the platinum percentile bands."""
+    n = storage.get_backend().replace_table(BANDS_TABLE, bands, BAND_COLS, int_cols=["Paths"])
+    print(f"Inserted {n} rows into {BANDS_TABLE}")
@@ -0,0 +1,286 @@
+import os                                  # CPU count, environment config, cache path
+import re                                  # suffix stripping for wide → long columns
+import time                                # wall-clock timing
+from concurrent.futures import ProcessPoolExecutor   # one process per core
+import pandas as pd                        # pandas for DataFrame operations
+
+import bronze_raw_ingest                   # fetch_coins / clean_df per ticker
+import silver_clean_transform              # clean_bronze per asset
+import gold_feature_engineering            # compute_gold_features
+import platinum_forecasting                # gold_frame_since_2018
+import forecast_models                     # model zoo with holdout selection, as in the orchestrator
+import market_data                         # concurrent, cached downloads for the whole universe
+import cross_asset                         # rolling pair statistics across the universe
+import scenarios                           # buy-and-hold outcomes per start date and horizon
+import trading_calendar                    # gap statistics across the universe
+import pipeline_orchestrator               # stage cache helpers
+import storage                             # pooled storage backend
+
+# ---------- CONFIG ----------
+# comma-separated Yahoo tickers, e.g. "BTC-USD,ETH-USD,SOL-USD"; default is BTC + ETH
+UNIVERSE_ENV = os.environ.get("CRYPTO_ASSETS", "")
+MAX_WORKERS  = int(os.environ.get("CRYPTO_WORKERS", "0")) or os.cpu_count()
+
+LAYER_TABLES = {
+    "bronze":   "asset_prices_bnz",
+    "silver":   "asset_prices_sil",
+    "gold":     "asset_prices_gold",
+    "platinum": "asset_forecast_horizon",
+}
+LAYERS = list(LAYER_TABLES)
+
+# wide per-coin names that are T-SQL keywords once the suffix is removed
+PRICE_RENAMES = {"Open": "OpenPrice", "High": "HighPrice", "Low": "LowPrice", "Close": "ClosePrice"}
+
+# ---------- ASSET UNIVERSE ----------
+def parse_universe(spec: str = UNIVERSE_ENV):
+    """
+    Build the asset universe as a list of (ticker, coin label, suffix).
+      - spec: comma-separated tickers, or a path to a file with one ticker
+        per line; empty means the BTC/ETH defaults from the bronze layer.
+    """
+    if not spec:
+        return [(t, label, s) for t, label, s, _ in bronze_raw_ingest.BRONZE_TARGETS]
+    if os.path.isfile(spec):
+        with open(spec, encoding="utf-8") as f:
+            tickers = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        tickers = [t.strip() for t in spec.split(",") if t.strip()]
+
+    known = {t: label for t, label, _, _ in bronze_raw_ingest.BRONZE_TARGETS}
+    universe = []
+    for ticker in tickers:
+        suffix = re.sub(r"\W", "", ticker.split("-")[0]).upper()  # 'SOL-USD' → 'SOL'
+        universe.append((ticker, known.get(ticker, suffix), suffix))
+    return universe
+
+# ---------- WIDE ↔ LONG ----------
+def to_long(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    Convert a per-coin frame (Close_BTC, SMA7_BTC, Volume_BTC_Millions, ...)
+    into the asset-agnostic long shape (Asset, PriceDate, ClosePrice, SMA7, ...).
+    """
+    token = re.compile(rf"_{re.escape(suffix)}(?=$|_)")
+    renamed = {}
+    for col in df.columns:
+        base = token.sub("", col)
+        renamed[col] = PRICE_RENAMES.get(base, base)
+    out = df.rename(columns=renamed)
+    out.insert(0, "Asset", suffix)
+    return out
+
+def to_wide(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    Inverse of to_long for the bronze/silver columns, so the existing
+    suffix-based layer functions can run on one asset's long rows.
+    """
+    back = {v: k for k, v in PRICE_RENAMES.items()}
+    renamed = {c: f"{back[c]}_{suffix}" for c in df.columns if c in back}
+    renamed["Volume"] = f"Volume_{suffix}"
+    return df.drop(columns=["Asset"], errors="ignore").rename(columns=renamed)
+
+# ---------- PER-ASSET WORKER ----------
+def process_asset(task):
+    """
+    Run bronze → silver → gold → platinum for one asset inside a worker process.
+      task = (ticker, coin label, suffix, bronze history in long form or None,
+              last layer to run, cleaned new bars or None when not fetching)
+    Returns {layer: long-format DataFrame} for every layer that ran, plus
+    'bronze_new' with just the rows fetched in this run. For platinum it
+    returns the forecast input series ('platinum_series'); the model zoo
+    runs in the parent across the whole universe.
+    """
+    ticker, coin_label, suffix, history, upto, fetched = task
+    out = {}
+
+    # bronze: history + bars fetched by the parent
+    bronze = None if history is None or history.empty else to_wide(history, suffix)
+    if fetched is not None:
+        new_rows = bronze_raw_ingest.to_table_frame(fetched)
+        bronze = pipeline_orchestrator.merge_history(bronze, new_rows)
+        if not new_rows.empty:
+            out["bronze_new"] = to_long(new_rows, suffix)         # only these rows need merging
+    if bronze is None or bronze.empty:
+        return out
+    out["bronze"] = to_long(bronze, suffix)
+    if upto == "bronze":
+        return out
+
+    # silver
+    silver = silver_clean_transform.clean_bronze(bronze, suffix)
+    out["silver"] = to_long(silver, suffix)
+    if upto == "silver":
+        return out
+
+    # gold
+    gold = gold_feature_engineering.compute_gold_features(silver, suffix)
+    out["gold"] = to_long(gold, suffix)
+    if upto == "gold":
+        return out
+
+    # platinum input
+    series = platinum_forecasting.gold_frame_since_2018(gold, suffix)
+    if len(series) > 2:
+        out["platinum_series"] = series
+    return out
+
+# ---------- PLATINUM ----------
+def forecast_universe(series_by_asset: dict, full_refresh: bool, max_workers: int):
+    """
+    Forecast every asset with the same model-zoo selection as the
+    orchestrator's platinum stage: every model is scored on a holdout and
+    the best one per asset forecasts every horizon. Fitted parameters are
+    cached as 'universe_model_params', so unchanged gold skips fitting.
+    Returns (long-format forecast rows, holdout scores).
+    """
+    cache = None if full_refresh else pipeline_orchestrator.load_cached("universe_model_params")
+    rows, scores, cache = forecast_models.select_and_forecast(
+        series_by_asset, cache, max_workers=max_workers)
+    pipeline_orchestrator.save_cached("universe_model_params", cache)
+    plat = pd.DataFrame(rows, columns=["Asset", "HorizonLabel", "TargetDate", "Forecast", "ReturnPct"])
+    return plat, scores
+
+# ---------- PERSIST ----------
+LONG_INT_COLS = ["Volume", "Year", "Month", "DayOfWeek", "IsImputed"]
+
+def persist_layer(layer: str, df: pd.DataFrame, full_reload: bool):
+    """
+    Write one long-format layer: bronze merges by (Asset, PriceDate) (pass
+    only the newly fetched rows), the other layers truncate and reload.
+    Silver stores only observed days; gold keeps every calendar day with
+    its IsImputed flag.
+    """
+    table = LAYER_TABLES[layer]
+    if layer == "silver":
+        df = trading_calendar.observed(df)
+    cols = [c for c in df.columns if c not in ("RetrievedAt", "GapLength")]
+    int_cols = [c for c in LONG_INT_COLS if c in cols]
+    backend = storage.get_backend()
+    if layer == "bronze" and not full_reload:
+        n = backend.merge_frame(table, df, cols, key_cols=["Asset", "PriceDate"],
+                                int_cols=int_cols, timestamp_col="RetrievedAt")
+        print(f"✅ Merged {n:,} rows into {table}")
+    else:
+        n = backend.replace_table(table, df, cols, int_cols=int_cols)
+        print(f"✅ Swapped in {n:,} rows into {table}")
+
+# ---------- UNIVERSE RUNNER ----------
+def watermark(history):
+    """Last PriceDate of an asset's long bronze history, or None for a full backfill."""
+    if history is None or history.empty:
+        return None
+    return pd.Timestamp(history["PriceDate"].max()).date()
+
+def run_universe(universe=None, upto: str = "platinum", persist: bool = True,
+                 full_refresh: bool = False, fetch: bool = True,
+                 max_workers: int = MAX_WORKERS) -> dict:
+    """
+    Run the pipeline for every asset in the universe across a process pool.
+    Downloads run first, concurrently (market_data); then each asset is an
+    independent task (clean, features), so wall time scales with
+    len(universe) / max_workers. Platinum then selects and fits the
+    forecast models for every asset at once (forecast_universe).
+      - upto: last layer to compute ('bronze', 'silver', 'gold', 'platinum')
+      - fetch=False: reuse the cached bronze history without downloading
+    Returns {layer: long-format DataFrame across all assets}.
+    """
+    universe = parse_universe() if universe is None else universe
+    previous = None if full_refresh else pipeline_orchestrator.load_cached("universe_bronze")
+    by_asset = {} if previous is None else dict(tuple(previous.groupby("Asset", sort=False)))
+
+    # downloads run in the parent on the fetcher's thread pool, so one rate
+    # limit and one on-disk cache cover the whole universe
+    fetched = {}
+    if fetch:
+        fetched = bronze_raw_ingest.fetch_coins(
+            [(ticker, label, suffix, watermark(by_asset.get(suffix)))
+             for ticker, label, suffix in universe])
+    tasks = [(ticker, label, suffix, by_asset.get(suffix), upto, fetched.get(suffix))
+             for ticker, label, suffix in universe]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        # chunk tasks so hundreds of small assets don't pay per-task IPC
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        parts = list(pool.map(process_asset, tasks, chunksize=chunksize))
+    print(f"⏱️  {len(tasks)} assets processed on {max_workers} workers "
+          f"in {time.perf_counter() - t0:.2f}s")
+
+    results = {}
+    if upto == "platinum":
+        series = {suffix: p["platinum_series"]
+                  for (_, _, suffix), p in zip(universe, parts) if "platinum_series" in p}
+        plat, results["model_scores"] = forecast_universe(series, full_refresh, max_workers)
+        parts.append({"platinum": plat})
+    for layer in LAYERS[:LAYERS.index(upto) + 1]:
+        frames = [p[layer] for p in parts if layer in p and not p[layer].empty]
+        if not frames:
+            continue
+        results[layer] = pd.concat(frames, ignore_index=True)
+        pipeline_orchestrator.save_cached(f"universe_{layer}", results[layer])
+        if not persist:
+            continue
+        if layer == "bronze" and previous is not None:
+            new = [p["bronze_new"] for p in parts if "bronze_new" in p]
+            if new:
+                persist_layer(layer, pd.concat(new, ignore_index=True), full_reload=False)
+        else:
+            persist_layer(layer, results[layer], full_reload=True)
+
+    # calendar gaps: one grouped pass over the universe's observed silver days
+    if "silver" in results:
+        gaps = trading_calendar.gap_stats(results["silver"], group_col="Asset")
+        trading_calendar.print_gap_stats(gaps)
+        pipeline_orchestrator.save_cached("universe_calendar_gaps", gaps)
+        results["calendar_gaps"] = gaps
+        if persist:
+            trading_calendar.write_gap_stats(gaps)
+
+    # cross-asset: every pair of the universe at once, in the parent process
+    if "gold" in results:
+        returns = cross_asset.return_matrix_long(results["gold"])
+        state = None if full_refresh else pipeline_orchestrator.load_cached("universe_cross_state")
+        t0 = time.perf_counter()
+        rows, state, full = cross_asset.compute_cross_asset(returns, state)
+        n_pairs = returns.shape[1] * (returns.shape[1] - 1) // 2
+        print(f"⏱️  {len(rows):,} cross-asset rows for {n_pairs:,} pairs "
+              f"{'rebuilt' if full else 'added'} in {time.perf_counter() - t0:.2f}s")
+        pipeline_orchestrator.save_cached("universe_cross_state", state)
+        results["cross"] = rows
+        if persist:
+            cross_asset.write_cross_asset(rows)
+
+        # horizon scenarios: every start date × horizon × asset in one cube
+        t0 = time.perf_counter()
+        closes, imputed = scenarios.close_matrix_long(results["gold"])
+        scenario = scenarios.compute_scenarios(closes, imputed)
+        print(f"⏱️  {len(scenario['summary']):,} horizon scenario rows for {closes.shape[1]:,} assets "
+              f"in {time.perf_counter() - t0:.2f}s")
+        results["scenario"] = scenario["summary"]
+        results["scenario_yearly"] = scenario["yearly"]
+        if persist:
+            scenarios.write_scenarios(scenario)
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the pipeline for an N-asset universe")
+    parser.add_argument("--assets", default=UNIVERSE_ENV,
+                        help="comma-separated tickers or a file with one ticker per line")
+    parser.add_argument("--upto", choices=LAYERS, default="platinum",
+                        help="last layer to compute (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--no-persist", action="store_true", help="do not write tables")
+    parser.add_argument("--no-fetch", action="store_true", help="reuse cached bronze history")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="ignore cached history and re-download everything")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.BACKEND,
+                        help="storage backend (default: %(default)s)")
+    parser.add_argument("--source", choices=sorted(market_data.SOURCES), default=market_data.SOURCE,
+                        help="market data source; 'fake' needs no network (default: %(default)s)")
+    args = parser.parse_args()
+    storage.set_backend(args.backend)
+    market_data.set_fetcher(args.source)
+    run_universe(parse_universe(args.assets), upto=args.upto, persist=not args.no_persist,
+                 full_refresh=args.full_refresh, fetch=not args.no_fetch,
+                 max_workers=args.workers)
@@ -0,0 +1,111 @@
+import sys                                 # exit codes
+import time                                # total wall-clock time
+import argparse                            # command-line parsing
+from datetime import date                  # --since validation
+# pandas and the pipeline modules are imported after parsing, and each stage
+# imports its own layer (statsmodels, scipy, ...), so `--help` and quick jobs
+# such as `run --stages rollup` start fast
+
+# ---------- CLI ----------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pipeline_cli.py",
+                                     description="Crypto analytics pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run stages of the Bronze→Silver→Gold→Platinum DAG")
+    run.add_argument("--stages", default=None,
+                     help="comma-separated stages (bronze, silver, gold, rollup, cross, "
+                          "scenario, platinum); upstream stages not listed come from the stage cache "
+                          "(default: all)")
+    run.add_argument("--assets", default=None,
+                     help="comma-separated coins for bronze/silver/gold, e.g. BTC,ETH or "
+                          "BTC-USD (default: all)")
+    run.add_argument("--since", default=None,
+                     help="re-fetch bronze and rewrite silver/gold rows from this date (YYYY-MM-DD)")
+    run.add_argument("--dry-run", action="store_true",
+                     help="print the stages and where their inputs come from, then exit")
+    run.add_argument("-j", "--workers", type=int, default=None,
+                     help="parallel downloads and model fits (default: CRYPTO_FETCH_WORKERS / "
+                          "CRYPTO_WORKERS)")
+    run.add_argument("--backend", default=None,
+                     help="storage backend: sqlserver, sqlite or lakehouse "
+                          "(default: CRYPTO_STORAGE_BACKEND)")
+    run.add_argument("--source", default=None,
+                     help="market data source; 'fake' needs no network (default: CRYPTO_FETCH_SOURCE)")
+    run.add_argument("--no-persist", action="store_true",
+                     help="keep results in memory/cache only; do not write tables")
+    run.add_argument("--full-refresh", action="store_true",
+                     help="re-download the full bronze history")
+    run.add_argument("--profile", default=None,
+                     help="comma-separated stages to cProfile, or 'all'")
+    return parser
+
+def parse_assets(value: str, targets) -> list:
+    """Coin suffixes for 'BTC,ETH' or 'BTC-USD,ETH-USD'; unknown coins raise ValueError."""
+    by_name = {}
+    for ticker, _, suffix, _ in targets:
+        by_name[ticker.upper()] = by_name[suffix.upper()] = suffix
+    names = [n.strip().upper() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown asset(s): {', '.join(unknown)} "
+                         f"(known: {', '.join(suffix for _, _, suffix, _ in targets)})")
+    return list(dict.fromkeys(by_name[n] for n in names))
+
+def print_plan(plan: list, assets, since):
+    """One line per stage with the source of each input."""
+    scope = ", ".join(sorted(assets)) if assets else "all coins"
+    print(f"🔎 Dry run ({scope}{f', since {since}' if since else ''}):")
+    for step in plan:
+        inputs = ", ".join(f"{dep} ({source})" for dep, source in step["inputs"].items())
+        print(f"   {step['stage']:<9} ← {inputs or 'market data'}")
+
+def run(args, parser) -> int:
+    import pipeline_orchestrator               # pandas, storage and market data; layers stay lazy
+    import bronze_raw_ingest                   # BRONZE_TARGETS for --assets
+    import market_data
+    import storage
+
+    if args.backend is not None and args.backend not in storage.BACKENDS:
+        parser.error(f"unknown backend '{args.backend}' (choose from {', '.join(sorted(storage.BACKENDS))})")
+    if args.source is not None and args.source not in market_data.SOURCES:
+        parser.error(f"unknown source '{args.source}' (choose from {', '.join(sorted(market_data.SOURCES))})")
+    stages = args.stages.split(",") if args.stages else None
+    try:
+        assets = parse_assets(args.assets, bronze_raw_ingest.BRONZE_TARGETS) if args.assets else None
+        plan = pipeline_orchestrator.plan_pipeline(stages)
+        if args.since:
+            date.fromisoformat(args.since)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.dry_run:
+        print_plan(plan, assets, args.since)
+        missing = [dep for step in plan for dep, source in step["inputs"].items()
+                   if source == "missing"]
+        if missing:
+            print(f"❌ No cached output for: {', '.join(dict.fromkeys(missing))}")
+            return 1
+        return 0
+
+    if args.workers is not None:
+        market_data.set_fetcher(market_data.Fetcher(args.source, workers=args.workers))
+    elif args.source is not None:
+        market_data.set_fetcher(args.source)
+    start = time.perf_counter()
+    pipeline_orchestrator.run_pipeline(
+        [step["stage"] for step in plan], persist=not args.no_persist,
+        full_refresh=args.full_refresh, backend=args.backend, profile=args.profile,
+        assets=assets, since=args.since, workers=args.workers)
+    print(f"⏱️  Pipeline finished in {time.perf_counter() - start:.2f}s")
+    return 0
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args, parser)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,504 @@
+import os                                  # paths for the stage cache
+import pandas as pd                        # pandas for DataFrame handoff and pickling
+
+import storage                             # pooled storage backend shared by every layer
+import market_data                         # bronze download source (Yahoo or the local fake)
+import run_metrics                         # per-stage timings, rows, memory and DB time
+import fingerprints                        # per-asset / per-year content digests of stage outputs
+# layer modules (statsmodels, scipy, ...) are imported by the stage that uses them,
+# so running one stage only pays for its own imports
+
+# ---------- CONFIG ----------
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pipeline_cache")
+
+# stage → upstream stages it consumes, listed in execution order
+STAGE_DEPS = {
+    "bronze":   [],
+    "silver":   ["bronze"],
+    "gold":     ["silver"],
+    "rollup":   ["gold"],
+    "cross":    ["gold"],
+    "scenario": ["gold"],
+    "platinum": ["gold"],
+}
+STAGE_ORDER = list(STAGE_DEPS)
+PER_COIN_STAGES = ("bronze", "silver", "gold")   # stages an asset selection applies to
+
+# ---------- STAGE CACHE ----------
+def cache_path(stage: str) -> str:
+    """Return the pickle path holding the last output of a stage."""
+    return os.path.join(CACHE_DIR, f"{stage}.pkl")
+
+def save_cached(stage: str, output) -> None:
+    """Pickle a stage's output so later runs can start from it."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    pd.to_pickle(output, cache_path(stage))
+
+def load_cached(stage: str):
+    """Return a stage's cached output, or None if it was never run."""
+    path = cache_path(stage)
+    return pd.read_pickle(path) if os.path.exists(path) else None
+
+# ---------- STAGES ----------
+def selected(ctx: dict, suffix: str) -> bool:
+    """True when the run covers this coin (no asset selection means every coin)."""
+    return ctx.get("assets") is None or suffix in ctx["assets"]
+
+def since_rows(df: pd.DataFrame, ctx: dict) -> pd.DataFrame:
+    """Rows on or after ctx['since'] (every row without one)."""
+    if ctx.get("since") is None:
+        return df
+    return df[pd.to_datetime(df["PriceDate"]) >= ctx["since"]]
+
+def merge_history(history, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Append freshly fetched bronze rows to the known history; restated days
+    replace the older copy of the same PriceDate.
+    """
+    if history is None or history.empty:
+        return new_rows.reset_index(drop=True)
+    if new_rows.empty:
+        return history
+    merged = pd.concat([history, new_rows], ignore_index=True)
+    merged = merged.drop_duplicates(subset=["PriceDate"], keep="last")
+    return merged.sort_values("PriceDate").reset_index(drop=True)
+
+def run_bronze(inputs: dict, ctx: dict) -> dict:
+    """
+    Fetch new bars per coin and return the full bronze history per suffix.
+    The watermark comes from the cached bronze output when the run that
+    cached it also wrote that coin's table to the current backend (tracked
+    per coin in the 'bronze_tables' cache), so an incremental run never has
+    to read the bronze table back; otherwise the table's own watermark is
+    used, or it is fully reloaded. Failed table writes raise.
+    ctx['since'] moves the watermark back to re-fetch from that date; coins
+    outside ctx['assets'] keep their cached history without a download.
+    """
+    import bronze_raw_ingest               # Bronze layer: Yahoo Finance → raw_*_bnz
+
+    previous = None if ctx["full_refresh"] else load_cached("bronze")
+    written = load_cached("bronze_tables") or {}   # suffix → backend its table was written to
+    backend_name = storage.get_backend().name if ctx["persist"] else None
+    histories, watermarks, out = {}, {}, {}
+    targets = []
+    for ticker, coin_label, suffix, table_name in bronze_raw_ingest.BRONZE_TARGETS:
+        if not selected(ctx, suffix):
+            if previous is not None and suffix in previous:
+                out[suffix] = previous[suffix]
+            continue
+        targets.append((ticker, coin_label, suffix, table_name))
+        history, watermark = None, None
+        in_sync = not ctx["persist"] or written.get(suffix) == backend_name
+        if previous is not None and suffix in previous and in_sync:
+            history = previous[suffix]
+            watermark = pd.Timestamp(history["PriceDate"].max()).date()
+        elif ctx["persist"] and not ctx["full_refresh"]:
+            watermark = bronze_raw_ingest.get_watermark(table_name)
+            if watermark is not None:
+                history = bronze_raw_ingest.load_bronze_table(table_name, suffix)
+        if watermark is not None and ctx.get("since") is not None:
+            watermark = min(watermark, (ctx["since"] - pd.Timedelta(days=1)).date())
+        histories[suffix], watermarks[suffix] = history, watermark
+
+    # every coin's download runs concurrently
+    fetched = bronze_raw_ingest.fetch_coins(
+        [(ticker, coin_label, suffix, watermarks[suffix])
+         for ticker, coin_label, suffix, _ in targets])
+    for ticker, coin_label, suffix, table_name in targets:
+        history, watermark, new_rows = histories[suffix], watermarks[suffix], fetched[suffix]
+        if ctx["persist"]:
+            bronze_raw_ingest.persist_coin(new_rows, table_name, suffix,
+                                           full_reload=watermark is None, strict=True)
+        written[suffix] = backend_name
+        out[suffix] = merge_history(history, bronze_raw_ingest.to_table_frame(new_rows))
+    save_cached("bronze_tables", written)
+    return out
+
+def run_silver(inputs: dict, ctx: dict) -> dict:
+    """
+    Clean each coin's bronze frame and optionally write raw_*_sil.
+    Per-rule counts and quarantined rows are cached as 'silver_quality'
+    and written to the data-quality tables. Silver frames are aligned to
+    the trading calendar; per-coin gap statistics are cached as
+    'calendar_gaps' and written to calendar_gap_stats. Coins whose bronze
+    fingerprint is unchanged (or that ctx['assets'] leaves out) reuse the
+    cached silver frame; for the others only the year partitions that
+    changed (or the rows since ctx['since']) are merged into the table
+    when possible.
+    """
+    import silver_clean_transform          # Silver layer: cleaning → raw_*_sil
+    import data_quality                    # rule counts and quarantine for the silver stage
+    import trading_calendar                # gap statistics of the silver calendar
+
+    changed = ctx["changed"]["bronze"] if ctx["changed"] is not None else None
+    reusable = changed is not None or ctx.get("assets") is not None
+    previous = load_cached("silver") if reusable else None
+    prev_quality = load_cached("silver_quality") if previous is not None else None
+    out, counts, quarantine = {}, [], []
+    for suffix, bronze_df in inputs["bronze"].items():
+        table = f"raw_{suffix.lower()}_prices_sil"
+        cached = prev_quality is not None and suffix in previous
+        if not selected(ctx, suffix) or (cached and changed is not None and suffix not in changed):
+            if cached:
+                print(f"⏭️  {suffix}: {'not selected' if not selected(ctx, suffix) else 'bronze unchanged'}"
+                      f", reusing silver")
+                out[suffix] = previous[suffix]
+                counts.append(prev_quality[0][prev_quality[0]["Coin"] == suffix])
+                quarantine.append(prev_quality[1][prev_quality[1]["Coin"] == suffix])
+            continue
+
+        out[suffix], rule_counts, rejected = silver_clean_transform.clean_bronze_with_report(
+            bronze_df, suffix)
+        counts.append(data_quality.summarize(rule_counts, "silver", suffix,
+                                             data_quality.SILVER_RULES))
+        quarantine.append(rejected.assign(Layer="silver", Coin=suffix))
+        if ctx["persist"]:
+            rows = None
+            if ctx.get("since") is not None:
+                rows = since_rows(out[suffix], ctx)
+            elif previous is not None and suffix in previous:
+                rows = fingerprints.changed_partition_rows(
+                    trading_calendar.observed(previous[suffix]),
+                    trading_calendar.observed(out[suffix]))
+            if rows is None:
+                silver_clean_transform.refresh_silver(out[suffix], table, suffix)
+            else:
+                silver_clean_transform.merge_silver(rows, table, suffix)
+
+    counts = pd.concat(counts, ignore_index=True)
+    quarantine = pd.concat(quarantine, ignore_index=True)[data_quality.QUARANTINE_COLS]
+    save_cached("silver_quality", (counts, quarantine))
+    gaps = pd.concat([trading_calendar.gap_stats(df, asset=suffix) for suffix, df in out.items()],
+                     ignore_index=True)
+    trading_calendar.print_gap_stats(gaps)
+    save_cached("calendar_gaps", gaps)
+    if ctx["persist"]:
+        data_quality.write_report(counts, quarantine)
+        trading_calendar.write_gap_stats(gaps)
+    return out
+
+def run_gold(inputs: dict, ctx: dict) -> dict:
+    """
+    Compute gold features per coin and optionally write gold_*_prices.
+    With a cached gold output and tail state, only days after the last gold
+    date are computed and appended; otherwise (first run, full refresh, or
+    restated history) the full history is recomputed, and only its changed
+    year partitions (or the rows since ctx['since']) are written when the
+    table can be patched. Appends and patches are only used when the cached
+    gold was also written to the current backend (tracked per coin in the
+    'gold_tables' cache); otherwise the full frame is upserted. Coins whose
+    silver fingerprint is unchanged (or that ctx['assets'] leaves out)
+    reuse the cached gold frame.
+    """
+    import gold_feature_engineering        # Gold layer: features → gold_*_prices
+
+    prev_gold  = None if ctx["full_refresh"] else load_cached("gold")
+    prev_state = None if ctx["full_refresh"] else load_cached("gold_state")
+    written = load_cached("gold_tables") or {}     # suffix → backend its table was written to
+    backend_name = storage.get_backend().name if ctx["persist"] else None
+    changed = ctx["changed"]["silver"] if ctx["changed"] is not None else None
+    out, states = {}, {}
+    for suffix, silver_df in inputs["silver"].items():
+        table = f"gold_{suffix.lower()}_prices"
+        cached = (prev_gold is not None and suffix in prev_gold
+                  and prev_state is not None and suffix in prev_state)
+        if not selected(ctx, suffix) or (cached and changed is not None and suffix not in changed):
+            if cached:
+                print(f"⏭️  {suffix}: {'not selected' if not selected(ctx, suffix) else 'silver unchanged'}"
+                      f", reusing gold")
+                out[suffix], states[suffix] = prev_gold[suffix], prev_state[suffix]
+            continue
+
+        in_sync = not ctx["persist"] or written.get(suffix) == backend_name
+        result = None
+        if (prev_gold is not None and prev_state is not None and suffix in prev_state
+                and ctx.get("since") is None and in_sync):
+            result = gold_feature_engineering.compute_gold_incremental(
+                silver_df, prev_state[suffix], suffix)
+
+        if result is not None:
+            new_rows, states[suffix] = result
+            print(f"➕ {suffix}: {len(new_rows):,} new gold rows (incremental)")
+            if ctx["persist"]:
+                gold_feature_engineering.append_gold_table(new_rows, table, suffix)
+            out[suffix] = pd.concat([prev_gold[suffix], new_rows], ignore_index=True)
+        else:
+            out[suffix], state = gold_feature_engineering.compute_gold_features_with_state(
+                silver_df, suffix)
+            if state is not None:
+                states[suffix] = state
+            if ctx["persist"]:
+                rows = None                # None: the whole frame is upserted
+                if in_sync and ctx.get("since") is not None:
+                    rows = since_rows(out[suffix], ctx)
+                elif in_sync and changed is not None and prev_gold is not None and suffix in prev_gold:
+                    rows = fingerprints.changed_partition_rows(prev_gold[suffix], out[suffix])
+                if rows is None:
+                    gold_feature_engineering.upsert_gold_table(out[suffix], table, suffix)
+                else:
+                    what = (f"since {ctx['since']:%Y-%m-%d}" if ctx.get("since") is not None
+                            else "in changed years")
+                    print(f"➕ {suffix}: {len(rows):,} gold rows {what}")
+                    gold_feature_engineering.append_gold_table(rows, table, suffix)
+        written[suffix] = backend_name
+    save_cached("gold_state", states)
+    save_cached("gold_tables", written)
+    return out
+
+def run_rollup(inputs: dict, ctx: dict) -> dict:
+    """
+    Materialize weekly / monthly / yearly rollups per coin and the
+    COMPARE_PAIRS comparison for the dashboards. With a cached rollup and
+    unchanged history only the periods containing new gold days are
+    recomputed and merged into the tables.
+    """
+    import rollups                         # Gold rollups: weekly / monthly / yearly + BTC vs ETH
+
+    previous = None if ctx["full_refresh"] else load_cached("rollup")
+    state = None if ctx["full_refresh"] else load_cached("rollup_state")
+    result, state, changes, full = rollups.compute_rollups(inputs["gold"], previous, state)
+    print(f"🧮 {len(changes['coins']):,} coin periods and {len(changes['pairs']):,} pair periods "
+          f"{'rebuilt' if full else 'updated'}")
+    save_cached("rollup_state", state)
+    if ctx["persist"]:
+        rollups.write_rollups(result, changes, full_reload=full)
+    return result
+
+def run_cross(inputs: dict, ctx: dict) -> pd.DataFrame:
+    """
+    Rolling 30/90/365-day correlation, covariance and beta for every pair
+    of coins, joined on PriceDate. With cached state and unchanged history
+    only the new dates are computed; returns the rows written this run.
+    """
+    import cross_asset                     # Gold rolling correlation / covariance / beta per pair
+
+    returns = cross_asset.return_matrix(inputs["gold"])
+    state = None if ctx["full_refresh"] else load_cached("cross_state")
+    rows, state, full = cross_asset.compute_cross_asset(returns, state)
+    print(f"🧮 {len(rows):,} cross-asset rows {'rebuilt' if full else 'added'} "
+          f"for {returns.shape[1]} coins")
+    save_cached("cross_state", state)
+    if ctx["persist"]:
+        cross_asset.write_cross_asset(rows)
+    return rows
+
+def run_scenario(inputs: dict, ctx: dict) -> dict:
+    """
+    Realized return and max drawdown of buying on every observed day since
+    SCENARIO_START and holding for every HORIZONS label, for all coins at
+    once; returns and optionally writes the per-horizon and per-start-year
+    summaries (the full date × horizon × coin cube is not stored).
+    """
+    import scenarios                       # Gold buy-and-hold outcomes per start date and horizon
+
+    closes, imputed = scenarios.close_matrix(inputs["gold"])
+    result = scenarios.compute_scenarios(closes, imputed)
+    print(f"🧮 {len(result['summary']):,} horizon scenario rows for {closes.shape[1]} coins "
+          f"({len(result['yearly']):,} by start year)")
+    if ctx["persist"]:
+        scenarios.write_scenarios(result)
+    return result
+
+def run_platinum(inputs: dict, ctx: dict) -> pd.DataFrame:
+    """
+    Pick the best forecast model per coin on a holdout, forecast every
+    horizon and optionally write the platinum tables. Fitted parameters are
+    cached between runs, so unchanged gold skips fitting and a few new days
+    warm-start from the previous fit. Monte Carlo percentile bands per
+    horizon are cached as 'platinum_bands'. ctx['workers'] caps the model
+    fitting processes.
+    """
+    import platinum_forecasting            # Platinum layer: forecasts → platinum_crypto_horizon
+    import forecast_models                 # Platinum model zoo with holdout selection
+    import monte_carlo                     # Platinum percentile bands by simulation
+
+    frames = {suffix: platinum_forecasting.gold_frame_since_2018(gold_df, suffix)
+              for suffix, gold_df in inputs["gold"].items()}
+    cache = None if ctx["full_refresh"] else load_cached("model_params")
+    all_rows, scores, cache = forecast_models.select_and_forecast(
+        frames, cache, max_workers=ctx.get("workers") or forecast_models.MAX_WORKERS)
+    save_cached("model_params", cache)
+    plat = pd.DataFrame(all_rows, columns=platinum_forecasting.PLAT_COLS)
+
+    # uncertainty bands: bootstrap gold LogReturn or the selected model's residuals
+    if monte_carlo.SOURCE == "residuals":
+        innovations = forecast_models.selected_residuals(scores, cache)
+    else:
+        innovations = {suffix: monte_carlo.gold_log_returns(gold_df, suffix)
+                       for suffix, gold_df in inputs["gold"].items()}
+    bands = monte_carlo.horizon_bands(plat, innovations, monte_carlo.SOURCE)
+    save_cached("platinum_bands", bands)
+
+    if ctx["persist"]:
+        platinum_forecasting.write_platinum(all_rows)
+        forecast_models.write_scores(scores)
+        monte_carlo.write_bands(bands)
+    return plat
+
+STAGE_FUNCS = {
+    "bronze":   run_bronze,
+    "silver":   run_silver,
+    "gold":     run_gold,
+    "rollup":   run_rollup,
+    "cross":    run_cross,
+    "scenario": run_scenario,
+    "platinum": run_platinum,
+}
+
+# ---------- DAG RUNNER ----------
+def plan_pipeline(stages=None) -> list:
+    """
+    The stages a run would execute, in DAG order, as dicts with 'stage'
+    and 'inputs' ({dep: 'run' when computed earlier in the run, 'cache'
+    when read from the stage cache, 'missing' when neither}). Nothing is
+    loaded or imported, so a dry run is instant.
+    """
+    stages = STAGE_ORDER if stages is None else list(stages)
+    unknown = [s for s in stages if s not in STAGE_DEPS]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+    plan = []
+    for stage in [s for s in STAGE_ORDER if s in stages]:
+        inputs = {dep: "run" if dep in stages else
+                  "cache" if os.path.exists(cache_path(dep)) else "missing"
+                  for dep in STAGE_DEPS[stage]}
+        plan.append({"stage": stage, "inputs": inputs})
+    return plan
+
+def run_pipeline(stages=None, persist: bool = True, full_refresh: bool = False,
+                 backend=None, profile=None, assets=None, since=None,
+                 workers: int = None) -> dict:
+    """
+    Run the requested stages in DAG order, passing DataFrames in memory.
+      - stages: subset of STAGE_ORDER (default: all). Upstream stages that
+        are not requested are read from the stage cache, e.g.
+        run_pipeline(["platinum"]) re-forecasts from the cached gold output.
+      - persist: also write each stage's SQL table (side effect only)
+      - full_refresh: ignore the bronze watermark and re-download everything
+      - backend: storage backend instance or name ('sqlserver', 'sqlite');
+        default is storage.get_backend(). All stages share its connection pool.
+      - profile: stages to run under cProfile, or 'all' (default: CRYPTO_PROFILE_STAGES)
+      - assets: coin suffixes the per-coin stages (PER_COIN_STAGES) process;
+        other coins keep their cached output (default: every coin)
+      - since: bronze re-fetches from this date and silver / gold write only
+        rows on or after it (merged, not swapped in)
+      - workers: processes for platinum model fitting (default: CRYPTO_WORKERS)
+    Each stage's output is fingerprinted per asset and year partition. A
+    stage whose inputs match the fingerprints it last ran on (and whose
+    tables were written to the same backend) is skipped and its cached
+    output reused; otherwise ctx['changed'] tells it which assets and
+    partitions of each input changed.
+    Every stage is measured by run_metrics; the run log is written to
+    .pipeline_runs/<run id>.json (and pipeline_run_log when persisting),
+    also when a stage fails.
+    Returns {stage: output} for every stage that ran or was loaded.
+    """
+    plan = plan_pipeline(stages)
+    stages = [step["stage"] for step in plan]
+    missing = [(step["stage"], dep) for step in plan
+               for dep, source in step["inputs"].items() if source == "missing"]
+    if missing:
+        stage, dep = missing[0]
+        raise RuntimeError(f"Stage '{stage}' needs '{dep}', which was not run and has no cache "
+                           f"in {CACHE_DIR}; include '{dep}' in stages.")
+
+    if backend is not None:
+        storage.set_backend(backend)
+
+    ctx = {"persist": persist, "full_refresh": full_refresh, "changed": None,
+           "assets": None if assets is None else set(assets),
+           "since": None if since is None else pd.Timestamp(since),
+           "workers": workers}
+    recorder = run_metrics.RunRecorder(profile)
+    backend_name = storage.get_backend().name if persist else None
+    prints = {} if full_refresh else (load_cached("fingerprints") or {})
+    results = {}
+    try:
+        for stage in stages:
+            # resolve inputs: in-memory result from this run, else the stage cache
+            inputs = {}
+            for dep in STAGE_DEPS[stage]:
+                if dep not in results:
+                    cached = load_cached(dep)
+                    if cached is None:
+                        raise RuntimeError(
+                            f"Stage '{stage}' needs '{dep}', which was not run and has no cache "
+                            f"in {CACHE_DIR}; include '{dep}' in stages.")
+                    print(f"📦 Using cached {dep} output")
+                    results[dep] = cached
+                inputs[dep] = results[dep]
+
+            # compare input fingerprints with the ones this stage last ran on
+            input_prints = {dep: fingerprints.output_fingerprints(inputs[dep])
+                            for dep in STAGE_DEPS[stage]}
+            last = prints.get(stage)
+            usable = last is not None and (not persist or (last["persisted"]
+                                                           and last["backend"] == backend_name))
+            if ctx["since"] is not None and stage in PER_COIN_STAGES:
+                usable = False             # --since asks for those rows to be rewritten
+            ctx["changed"] = None
+            if usable:
+                ctx["changed"] = {dep: fingerprints.changed_assets(last["inputs"].get(dep, {}), fp)
+                                  for dep, fp in input_prints.items()}
+            cached = None
+            if usable and input_prints and not any(ctx["changed"].values()):
+                cached = load_cached(stage)
+
+            with recorder.stage(stage, inputs) as rec:
+                if cached is not None:
+                    print(f"⏭️  {stage}: inputs unchanged, reusing the cached output")
+                    results[stage] = cached
+                else:
+                    results[stage] = STAGE_FUNCS[stage](inputs, ctx)
+                    save_cached(stage, results[stage])
+                rec["RowsOut"] = run_metrics.count_rows(results[stage])
+
+            if ctx["assets"] is not None and stage in PER_COIN_STAGES:
+                # coins left out still reflect the inputs they last ran on
+                for dep, fp in input_prints.items():
+                    before = last["inputs"].get(dep, {}) if last is not None else {}
+                    for suffix in [a for a in fp if a not in ctx["assets"]]:
+                        if suffix in before:
+                            fp[suffix] = before[suffix]
+                        else:
+                            del fp[suffix]
+            prints[stage] = {
+                "inputs":    input_prints,
+                "output":    fingerprints.output_fingerprints(results[stage]),
+                # a skipped stage left the tables as its last real run wrote them
+                "persisted": last["persisted"] if cached is not None else persist,
+                "backend":   last["backend"] if cached is not None else backend_name,
+            }
+            save_cached("fingerprints", prints)
+    finally:
+        run_metrics.write_run(recorder, persist)
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the Bronze→Silver→Gold→Platinum DAG")
+    parser.add_argument("--stages", default=",".join(STAGE_ORDER),
+                        help="comma-separated stages to run (default: all)")
+    parser.add_argument("--no-persist", action="store_true",
+                        help="keep results in memory/cache only; do not write SQL tables")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="re-download the full bronze history")
+    parser.add_argument("--backend", choices=sorted(storage.BACKENDS), default=storage.BACKEND,
+                        help="storage backend (default: %(default)s)")
+    parser.add_argument("--profile", default=None,
+                        help="comma-separated stages to cProfile, or 'all' "
+                             "(default: CRYPTO_PROFILE_STAGES)")
+    parser.add_argument("--source", choices=sorted(market_data.SOURCES), default=market_data.SOURCE,
+                        help="market data source; 'fake' needs no network (default: %(default)s)")
+    parser.add_argument("--assets", default=None,
+                        help="comma-separated coin suffixes for bronze/silver/gold (default: all)")
+    parser.add_argument("--since", default=None,
+                        help="re-fetch and rewrite rows from this date (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for platinum model fitting (default: CRYPTO_WORKERS)")
+    args = parser.parse_args()
+    market_data.set_fetcher(args.source)
+    run_pipeline(args.stages.split(","), persist=not args.no_persist,
+                 full_refresh=args.full_refresh, backend=args.backend, profile=args.profile,
+                 assets=args.assets.split(",") if args.assets else None, since=args.since,
+                 workers=args.workers)
@@ -1,16 +1,13 @@
 import warnings                             # to control warning messages
 import pandas as pd                        # pandas for DataFrame operations
-import pyodbc                               # pyodbc for ODBC database connections
-from statsmodels.tsa.holtwinters import ExponentialSmoothing  # Holt–Winters forecasting model
 from datetime import datetime, timedelta   # datetime and timedelta for date arithmetic
-import gold_feature_engineering                        # our Gold layer module, which itself calls Silver (and Bronze) when run
+import storage                             # pooled storage backend (SQL Server / SQLite)
+import trading_calendar                    # shared gap-aware daily calendar
 
 # ---------- SUPPRESS WARNINGS & CONFIG ----------
 warnings.filterwarnings("ignore")          # ignore deprecation and other warnings
-SERVER   = r"KRISHNA\KVSTG"                # SQL Server instance name
-DATABASE = "Crypto_Analytics"              # target database name
-DRIVER   = "ODBC Driver 17 for SQL Server" # ODBC driver name
-PLAT_TABLE = "dbo.platinum_crypto_horizon" # fully qualified forecast results table
+PLAT_TABLE = "platinum_crypto_horizon"     # forecast results table
+FORECAST_START = "2018-01-01"              # first gold date used for fitting
 
 # ─── FORECAST HORIZONS DEFINITION (up to 10 years) ────────────────
 HORIZONS = {
@@ -38,82 +35,87 @@ def load_gold_since_2018(coin: str) -> pd.DataFrame:
     """
     yesterday = (datetime.now().date() - timedelta(days=1)).isoformat()  # yesterday's date
     tbl = f"gold_{coin.lower()}_prices"  # table name for this coin
-    sql = f"""
-      SELECT PriceDate AS ds, Close_{coin} AS y
-      FROM dbo.{tbl}
-      WHERE PriceDate >= '2018-01-01' AND PriceDate <= '{yesterday}'
-      ORDER BY PriceDate
+    df = storage.get_backend().read_table(  # only PriceDate/Close, only the forecast window
+        tbl, ["PriceDate", f"Close_{coin}"], start=FORECAST_START, end=yesterday)
+    return df.rename(columns={"PriceDate": "ds", f"Close_{coin}": "y"})
+
+# HELPER: SLICE IN-MEMORY GOLD DATA FOR FORECASTING 
+def gold_frame_since_2018(gold_df: pd.DataFrame, coin: str) -> pd.DataFrame:
+    """
+    Same window and shape as load_gold_since_2018, taken from a gold
+    DataFrame already in memory instead of re-reading the gold table.
+    Gold aligned to the trading calendar keeps its IsImputed flag, so
+    daily_series reuses the alignment.
     """
-    conn = pyodbc.connect(              # open a new DB connection
-        f"Driver={{{DRIVER}}};"
-        f"Server={SERVER};"
-        f"Database={DATABASE};"
-        "Trusted_Connection=yes;Encrypt=yes;TrustServerCertificate=yes;"
-    )
-    df = pd.read_sql(sql, conn, parse_dates=["ds"])  # execute and parse 'ds' as datetime
-    conn.close()                        # close the connection
-    return df                          # return the loaded DataFrame
+    yesterday = pd.Timestamp(datetime.now().date() - timedelta(days=1))
+    dates = pd.to_datetime(gold_df["PriceDate"])
+    mask = (dates >= FORECAST_START) & (dates <= yesterday)
+    df = pd.DataFrame({"ds": dates[mask], "y": gold_df.loc[mask, f"Close_{coin}"]})
+    if trading_calendar.is_aligned(gold_df):
+        df["IsImputed"] = gold_df.loc[mask, "IsImputed"]
+    return df.sort_values("ds").reset_index(drop=True)
 
-#  HOLT’S LINEAR FORECAST FUNCTION 
-def forecast_holt(df: pd.DataFrame, coin: str):
+#  DAILY SERIES FOR FITTING 
+def daily_series(df: pd.DataFrame) -> pd.Series:
     """
-    Fit a Holt’s linear trend model and forecast for each horizon.
-    Returns a list of tuples for DB insertion.
+    Turn a ds/y frame into a gap-free daily price series: frames already
+    on the trading calendar are used as is, others are aligned here.
+    """
+    return trading_calendar.calendar_series(df, "ds", "y")
+
+#  HOLT’S LINEAR MODEL FIT 
+def fit_holt(ts: pd.Series):
+    """
+    Fit Holt’s linear trend model (additive trend, no seasonality).
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing  # only needed when fitting
+    return ExponentialSmoothing(ts, trend="add", seasonal=None).fit(optimized=True)
+
+#  FORECAST PATH → HORIZON ROWS 
+def horizon_rows(ts: pd.Series, path, coin: str):
+    """
+    Turn a daily forecast path (path[0] is the day after ts ends) into one
+    row per horizon. Returns a list of tuples for DB insertion.
     """
-    ts = (
-        df.set_index("ds")["y"]         # select the 'y' series indexed by 'ds'
-          .asfreq("D")                  # ensure daily frequency
-          .ffill()                      # forward-fill missing days
-    )
-    model = ExponentialSmoothing(ts, trend="add", seasonal=None).fit(optimized=True)
     last_price = ts.iloc[-1]           # last observed price
     last_date  = ts.index[-1]          # last date in the series
 
     rows = []                          # collect forecast tuples here
     for label, days in HORIZONS.items():
-        fc_val = model.forecast(days)[-1]  # forecast 'days' ahead, take last
+        fc_val = path[days - 1]        # value 'days' ahead
         target = last_date + timedelta(days=days)  # compute the target date
         ret_pct = (fc_val - last_price) / last_price * 100  # percent return
         rows.append((coin, label, target.date(), float(fc_val), float(ret_pct)))
     return rows                        # return list of (Coin, HorizonLabel, TargetDate, Forecast, ReturnPct)
 
-#  MAIN ENTRY POINT 
-def main():
-    # 1) Run the entire upstream pipeline: Bronze → Silver → Gold
-    gold_feature_engineering.main()
-
-    # 2) Load gold-layer data for forecasting
-    btc_df = load_gold_since_2018("BTC")
-    eth_df = load_gold_since_2018("ETH")
-
-    # 3) Generate forecasts
-    btc_rows = forecast_holt(btc_df, "BTC")
-    eth_rows = forecast_holt(eth_df, "ETH")
-    all_rows = btc_rows + eth_rows
+#  HOLT’S LINEAR FORECAST FUNCTION 
+def forecast_holt(df: pd.DataFrame, coin: str):
+    """
+    Fit a Holt’s linear trend model and forecast for each horizon.
+    Returns a list of tuples for DB insertion.
+    """
+    ts = daily_series(df)
+    model = fit_holt(ts)
+    path = model.forecast(max(HORIZONS.values())).to_numpy()  # one forecast path covers every horizon
+    return horizon_rows(ts, path, coin)
 
-    # 4) Connect and upsert into the platinum table
-    conn = pyodbc.connect(
-        f"Driver={{{DRIVER}}};"
-        f"Server={SERVER};"
-        f"Database={DATABASE};"
-        "Trusted_Connection=yes;Encrypt=yes;TrustServerCertificate=yes;"
-    )
-    cursor = conn.cursor()
-    cursor.fast_executemany = True     # enable fast bulk inserts
+#  WRITE FORECASTS TO PLATINUM TABLE 
+PLAT_COLS = ["Coin", "HorizonLabel", "TargetDate", "Forecast", "ReturnPct"]
 
-    cursor.execute(f"TRUNCATE TABLE {PLAT_TABLE}")  # clear existing forecasts
-    insert_sql = f"""
-      INSERT INTO {PLAT_TABLE}
-        (Coin, HorizonLabel, TargetDate, Forecast, ReturnPct)
-      VALUES (?, ?, ?, ?, ?)
+def write_platinum(all_rows):
     """
-    cursor.executemany(insert_sql, all_rows)  # bulk-insert forecasts
-    conn.commit()                           # commit transaction
-    print(f"Inserted {len(all_rows)} rows into {PLAT_TABLE}")  # confirmation
+    Truncate the platinum table and bulk-insert forecast tuples.
+    """
+    df = pd.DataFrame(all_rows, columns=PLAT_COLS)
+    n = storage.get_backend().replace_table(PLAT_TABLE, df, PLAT_COLS)
+    print(f"Inserted {n} rows into {PLAT_TABLE}")  # confirmation
 
-    # 5) Cleanup
-    cursor.close()
-    conn.close()
+#  MAIN ENTRY POINT 
+def main():
+    # Run Bronze → Silver → Gold → Platinum with in-memory handoff
+    # (see pipeline_orchestrator)
+    import pipeline_orchestrator
+    pipeline_orchestrator.run_pipeline(["bronze", "silver", "gold", "platinum"])
 
 if __name__ == "__main__":
     main()
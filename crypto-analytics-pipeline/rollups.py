@@ -0,0 +1,229 @@
+import hashlib                             # digest of the history a rollup was built from
+import numpy as np                         # NumPy for digests and correlation sums
+import pandas as pd                        # pandas for period grouping
+
+import storage                             # pooled storage backend
+import trading_calendar                    # rollups count observed days only
+
+# ---------- CONFIG ----------
+ROLLUP_TABLE = "gold_price_rollups"
+PAIR_TABLE   = "gold_pair_rollups"
+# period label → pandas period frequency (weeks run Monday–Sunday)
+PERIODS = {"W": "W-SUN", "M": "M", "Y": "Y"}
+COMPARE_PAIRS = [("BTC", "ETH")]           # (CoinA, CoinB) suffix pairs compared per period
+
+ROLLUP_KEYS = ["Coin", "Period", "PeriodStart"]
+ROLLUP_COLS = ROLLUP_KEYS + ["PeriodEnd", "Days", "OpenPrice", "HighPrice", "LowPrice", "ClosePrice",
+                             "Volume", "PeriodReturn", "LogReturn", "Volatility", "MaxDrawdown",
+                             "EndDrawdown"]
+PAIR_KEYS = ["CoinA", "CoinB", "Period", "PeriodStart"]
+PAIR_COLS = PAIR_KEYS + ["Days", "ReturnA", "ReturnB", "ReturnSpread", "PriceRatio",
+                         "RatioReturn", "Correlation", "VolatilityRatio"]
+
+# ---------- DAILY INPUT ----------
+def daily_frame(gold_df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    The gold columns a rollup needs, with suffix-free names, sorted by date.
+    Days imputed by the trading calendar are left out.
+    """
+    gold_df = trading_calendar.observed(gold_df)
+    out = pd.DataFrame({
+        "PriceDate":  pd.to_datetime(gold_df["PriceDate"]),
+        "OpenPrice":  gold_df[f"Open_{suffix}"].astype(float),
+        "HighPrice":  gold_df[f"High_{suffix}"].astype(float),
+        "LowPrice":   gold_df[f"Low_{suffix}"].astype(float),
+        "ClosePrice": gold_df[f"Close_{suffix}"].astype(float),
+        "Volume":     gold_df[f"Volume_{suffix}"].astype(float),
+        "LogReturn":  gold_df[f"LogReturn_{suffix}"].astype(float),
+        "Drawdown":   gold_df[f"Drawdown_{suffix}"].astype(float),
+    })
+    return out.sort_values("PriceDate", kind="stable").reset_index(drop=True)
+
+def digest(daily: pd.DataFrame, upto) -> str:
+    """Hash of the dates and prices up to `upto`, to notice restated history."""
+    part = daily[daily["PriceDate"] <= upto]
+    h = hashlib.sha1()
+    h.update(part["PriceDate"].to_numpy(dtype="datetime64[ns]").tobytes())
+    h.update(np.ascontiguousarray(part[["ClosePrice", "Volume"]].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+def period_start(dates: pd.Series, period: str) -> pd.Series:
+    return dates.dt.to_period(PERIODS[period]).dt.start_time
+
+# ---------- PER-COIN ROLLUPS ----------
+def rollup_periods(daily: pd.DataFrame, period: str, suffix: str, since=None) -> pd.DataFrame:
+    """
+    OHLCV, return, volatility and drawdown per period, for every period
+    starting on or after `since` (all periods when None):
+      - PeriodReturn: close vs. the previous period's close (first open for
+        the first period in history)
+      - LogReturn / Volatility: sum / std of the daily log returns
+      - MaxDrawdown: worst close vs. the running max within the period;
+        EndDrawdown: gold Drawdown (vs. all-time high) on the last day
+    Only the days of those periods (plus the day before) are grouped.
+    """
+    begin = 0
+    if since is not None:
+        begin = max(0, int(np.searchsorted(daily["PriceDate"].to_numpy(),
+                                           np.datetime64(since), "left")) - 1)
+    work = daily.iloc[begin:].copy()
+    work["PrevClose"] = work["ClosePrice"].shift(1).fillna(work["OpenPrice"])
+    work["PeriodStart"] = period_start(work["PriceDate"], period)
+    if since is not None:
+        work = work[work["PeriodStart"] >= since]
+    if work.empty:
+        return pd.DataFrame(columns=ROLLUP_COLS)
+
+    grouped = work.groupby("PeriodStart", sort=True)
+    work["PeriodMax"] = grouped["ClosePrice"].cummax()
+    work["IntraDrawdown"] = work["ClosePrice"] / work["PeriodMax"] - 1
+    out = work.groupby("PeriodStart", sort=True).agg(
+        PeriodEnd=("PriceDate", "max"),
+        Days=("PriceDate", "size"),
+        OpenPrice=("OpenPrice", "first"),
+        HighPrice=("HighPrice", "max"),
+        LowPrice=("LowPrice", "min"),
+        ClosePrice=("ClosePrice", "last"),
+        Volume=("Volume", "sum"),
+        PrevClose=("PrevClose", "first"),
+        LogReturn=("LogReturn", "sum"),
+        Volatility=("LogReturn", "std"),
+        MaxDrawdown=("IntraDrawdown", "min"),
+        EndDrawdown=("Drawdown", "last"),
+    ).reset_index()
+    out["PeriodReturn"] = out["ClosePrice"] / out["PrevClose"] - 1
+    out["Coin"], out["Period"] = suffix, period
+    return out[ROLLUP_COLS]
+
+# ---------- PAIR COMPARISON ----------
+def pair_rollups(daily_a: pd.DataFrame, daily_b: pd.DataFrame, a: str, b: str,
+                 period: str, since=None) -> pd.DataFrame:
+    """
+    Compare two coins per period on the days both traded: period returns,
+    return spread (A - B), price ratio B/A at period end and its change,
+    correlation of daily log returns and volatility ratio (B / A).
+    Correlation comes from per-period sums, so every period is one groupby.
+    """
+    cols = ["PriceDate", "OpenPrice", "ClosePrice", "LogReturn"]
+    joined = daily_a[cols].merge(daily_b[cols], on="PriceDate", suffixes=("A", "B"))
+    if since is not None:
+        begin = max(0, int(np.searchsorted(joined["PriceDate"].to_numpy(),
+                                           np.datetime64(since), "left")) - 1)
+        joined = joined.iloc[begin:]
+    joined = joined.assign(
+        PrevA=joined["ClosePriceA"].shift(1).fillna(joined["OpenPriceA"]),
+        PrevB=joined["ClosePriceB"].shift(1).fillna(joined["OpenPriceB"]),
+        PeriodStart=period_start(joined["PriceDate"], period))
+    if since is not None:
+        joined = joined[joined["PeriodStart"] >= since]
+    if joined.empty:
+        return pd.DataFrame(columns=PAIR_COLS)
+
+    x, y = joined["LogReturnA"], joined["LogReturnB"]
+    sums = joined.assign(x=x, y=y, xx=x * x, yy=y * y, xy=x * y).groupby("PeriodStart", sort=True)
+    s = sums[["x", "y", "xx", "yy", "xy"]].sum()
+    n = sums.size()
+    cov = s["xy"] - s["x"] * s["y"] / n
+    var_a = s["xx"] - s["x"] ** 2 / n
+    var_b = s["yy"] - s["y"] ** 2 / n
+    first = sums[["PrevA", "PrevB"]].first()
+    last = sums[["ClosePriceA", "ClosePriceB"]].last()
+
+    out = pd.DataFrame({"Days": n})
+    out["ReturnA"] = last["ClosePriceA"] / first["PrevA"] - 1
+    out["ReturnB"] = last["ClosePriceB"] / first["PrevB"] - 1
+    out["ReturnSpread"] = out["ReturnA"] - out["ReturnB"]
+    out["PriceRatio"] = last["ClosePriceB"] / last["ClosePriceA"]
+    out["RatioReturn"] = (1 + out["ReturnB"]) / (1 + out["ReturnA"]) - 1
+    denom = np.sqrt(var_a * var_b)
+    out["Correlation"] = cov / denom.where(denom > 0)
+    out["VolatilityRatio"] = np.sqrt(var_b / var_a.where(var_a > 0))
+    out = out.reset_index()
+    out["CoinA"], out["CoinB"], out["Period"] = a, b, period
+    return out[PAIR_COLS]
+
+# ---------- INCREMENTAL DRIVER ----------
+def floor_to_period(day, period: str) -> pd.Timestamp:
+    return pd.Timestamp(day).to_period(PERIODS[period]).start_time
+
+def combine(kept, fresh, keys, cols) -> pd.DataFrame:
+    """Previous rows (or None) with recomputed periods replaced by the fresh rows."""
+    frames = [f for f in [kept] + fresh if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=cols)
+    out = pd.concat(frames, ignore_index=True).drop_duplicates(subset=keys, keep="last")
+    return out.sort_values(keys, kind="stable").reset_index(drop=True)
+
+def compute_rollups(gold: dict, previous=None, state=None):
+    """
+    Roll every coin's gold frame up to PERIODS, and COMPARE_PAIRS per period.
+      - previous: {'coins', 'pairs'} output of the last run
+      - state: {suffix: {'last_date', 'digest'}} of the gold it was built from
+    A coin whose history up to last_date is unchanged recomputes only the
+    periods containing new days (nothing when there are none); a coin
+    without state or with restated history is recomputed in full, and so is
+    every pair it belongs to.
+    Returns ({'coins', 'pairs'}, new state, {'coins', 'pairs'} recomputed rows,
+    full: True when some coin was recomputed in full).
+    """
+    state = state or {}
+    dailies = {s: daily_frame(df, s) for s, df in gold.items() if not df.empty}
+    if not previous:
+        previous, state = {}, {}
+    full, first_new, new_state = set(), {}, {}
+    for suffix, daily in dailies.items():
+        prev = state.get(suffix)
+        if prev is None or digest(daily, prev["last_date"]) != prev["digest"]:
+            full.add(suffix)
+        elif daily["PriceDate"].iloc[-1] > prev["last_date"]:
+            first_new[suffix] = daily.loc[daily["PriceDate"] > prev["last_date"], "PriceDate"].iloc[0]
+        last = daily["PriceDate"].iloc[-1]
+        new_state[suffix] = {"last_date": last, "digest": digest(daily, last)}
+
+    coin_rows, pair_rows = [], []
+    for period in PERIODS:
+        for suffix in full:
+            coin_rows.append(rollup_periods(dailies[suffix], period, suffix))
+        for suffix, day in first_new.items():
+            coin_rows.append(rollup_periods(dailies[suffix], period, suffix,
+                                            floor_to_period(day, period)))
+        for a, b in COMPARE_PAIRS:
+            if a not in dailies or b not in dailies:
+                continue
+            if a in full or b in full:
+                start = None
+            elif a in first_new or b in first_new:
+                start = min(floor_to_period(first_new[c], period) for c in (a, b) if c in first_new)
+            else:
+                continue
+            pair_rows.append(pair_rollups(dailies[a], dailies[b], a, b, period, start))
+
+    # rows of fully recomputed coins are rebuilt from scratch, not patched
+    kept_coins = previous.get("coins", pd.DataFrame(columns=ROLLUP_COLS))
+    kept_coins = kept_coins[~kept_coins["Coin"].isin(full)]
+    kept_pairs = previous.get("pairs", pd.DataFrame(columns=PAIR_COLS))
+    kept_pairs = kept_pairs[~(kept_pairs["CoinA"].isin(full) | kept_pairs["CoinB"].isin(full))]
+
+    result = {"coins": combine(kept_coins, coin_rows, ROLLUP_KEYS, ROLLUP_COLS),
+              "pairs": combine(kept_pairs, pair_rows, PAIR_KEYS, PAIR_COLS)}
+    changes = {"coins": combine(None, coin_rows, ROLLUP_KEYS, ROLLUP_COLS),
+               "pairs": combine(None, pair_rows, PAIR_KEYS, PAIR_COLS)}
+    return result, new_state, changes, bool(full)
+
+# ---------- PERSIST ----------
+def write_rollups(result: dict, changes: dict, full_reload: bool):
+    """
+    Upsert only the recomputed periods; after a full recompute of any coin,
+    truncate and reload both tables instead (a few hundred rows per coin).
+    """
+    backend = storage.get_backend()
+    for table, cols, keys, name in ((ROLLUP_TABLE, ROLLUP_COLS, ROLLUP_KEYS, "coins"),
+                                    (PAIR_TABLE, PAIR_COLS, PAIR_KEYS, "pairs")):
+        if full_reload:
+            n = backend.replace_table(table, result[name], cols, int_cols=["Days"])
+            print(f"✅ Swapped in {n:,} rows into {table}")
+        elif not changes[name].empty:
+            n = backend.merge_frame(table, changes[name], cols, key_cols=keys, int_cols=["Days"])
+            print(f"✅ Merged {n:,} rows into {table}")
+        else:
+            print(f"⏭️  No new periods for {table}")
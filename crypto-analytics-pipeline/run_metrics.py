@@ -0,0 +1,202 @@
+import os                                  # run-log directory and CPU times
+import json                                # one JSON document per run
+import time                                # wall-clock timing
+import cProfile                            # optional per-stage profile dumps
+import pstats                              # top functions of a profile dump
+import threading                           # background RSS sampler
+from contextlib import contextmanager      # stage() context manager
+from datetime import datetime, timezone    # run ids and stage start times
+import pandas as pd                        # row counts and run-log frames
+
+import storage                             # DB_STATS round-trip counters and the run-log table
+
+# ---------- CONFIG ----------
+RUN_LOG_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pipeline_runs")
+RUN_LOG_TABLE = "pipeline_run_log"
+RUN_LOG_COLS  = ["RunId", "Stage", "StartedAt", "WallSeconds", "CpuSeconds", "RowsIn", "RowsOut",
+                 "RowsPerSecond", "PeakRssMiB", "DbCalls", "DbSeconds", "Succeeded"]
+PROFILE_STAGES = os.environ.get("CRYPTO_PROFILE_STAGES", "")   # e.g. 'gold,platinum' or 'all'
+RSS_SAMPLE_SECONDS = 0.05                  # RSS polling interval while a stage runs
+SLOWDOWN_RATIO = 1.5                       # flag stages slower than this × their recent median
+
+# ---------- PROBES ----------
+def count_rows(obj) -> int:
+    """Rows in a stage input/output: a DataFrame, or dicts / tuples of them."""
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(count_rows(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(count_rows(v) for v in obj)
+    return 0
+
+def cpu_seconds() -> float:
+    """User + system CPU of this process and its finished worker processes."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+def current_rss() -> int:
+    """Resident set size in bytes from /proc (Linux), or 0 where unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+class RssSampler:
+    """
+    Poll RSS in a daemon thread and keep the maximum, so each stage gets
+    its own peak (the process high-water mark only ever grows).
+    Worker processes of the platinum pool are not included.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = current_rss()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+
+    def poll(self):
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.done.set()
+        self.thread.join()
+        self.peak = max(self.peak, current_rss())
+
+# ---------- RECORDER ----------
+class RunRecorder:
+    """
+    Collects one metrics record per stage of a pipeline run: wall and CPU
+    time, rows in/out, rows per second, peak RSS and the time spent in
+    storage backend calls. Stages listed in `profile` (or 'all') are also
+    run under cProfile, dumped to <RUN_LOG_DIR>/<run id>/<stage>.prof.
+    """
+
+    def __init__(self, profile=None):
+        self.run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}"
+        profile = PROFILE_STAGES if profile is None else profile
+        if isinstance(profile, str):
+            profile = [s for s in profile.split(",") if s]
+        self.profile = set(profile)
+        self.records = []
+
+    def profile_path(self, stage: str) -> str:
+        return os.path.join(RUN_LOG_DIR, self.run_id, f"{stage}.prof")
+
+    @contextmanager
+    def stage(self, name: str, inputs):
+        """
+        Measure the with-block as stage `name`. The block may set
+        rec['RowsOut']; a raised exception is recorded as Succeeded=0.
+        """
+        rec = {"RunId": self.run_id, "Stage": name,
+               "StartedAt": f"{datetime.now(timezone.utc):%Y-%m-%d %H:%M:%S}",
+               "RowsIn": count_rows(inputs), "RowsOut": 0, "Succeeded": 0}
+        profiler = cProfile.Profile() if ({name, "all"} & self.profile) else None
+        db0 = dict(storage.DB_STATS)
+        cpu0 = cpu_seconds()
+        t0 = time.perf_counter()
+        rss = RssSampler().start()
+        if profiler:
+            profiler.enable()
+        try:
+            yield rec
+            rec["Succeeded"] = 1
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - t0
+            rss.stop()
+            rec.update({
+                "WallSeconds":   wall,
+                "CpuSeconds":    cpu_seconds() - cpu0,
+                "RowsPerSecond": max(rec["RowsIn"], rec["RowsOut"]) / wall if wall > 0 else None,
+                "PeakRssMiB":    rss.peak / 2**20 if rss.peak else None,
+                "DbCalls":       storage.DB_STATS["calls"] - db0["calls"],
+                "DbSeconds":     storage.DB_STATS["seconds"] - db0["seconds"],
+            })
+            self.records.append(rec)
+            if profiler:
+                self.dump_profile(name, profiler)
+            print(f"📊 {name}: wall {wall:.2f}s  cpu {rec['CpuSeconds']:.2f}s  "
+                  f"rows {rec['RowsIn']:,} → {rec['RowsOut']:,}  "
+                  f"db {rec['DbSeconds']:.2f}s/{rec['DbCalls']} calls  "
+                  f"peak RSS {rec['PeakRssMiB'] or 0:.0f} MiB")
+
+    def dump_profile(self, stage: str, profiler: cProfile.Profile):
+        path = self.profile_path(stage)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+        print(f"🧪 Profile of {stage} written to {path}")
+        pstats.Stats(path).sort_stats("cumulative").print_stats(10)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records, columns=RUN_LOG_COLS)
+
+# ---------- PERSIST ----------
+def write_run(recorder: RunRecorder, persist: bool = True) -> str:
+    """
+    Write the run to <RUN_LOG_DIR>/<run id>.json and, when persisting,
+    upsert its rows into RUN_LOG_TABLE. Returns the JSON path.
+    """
+    os.makedirs(RUN_LOG_DIR, exist_ok=True)
+    path = os.path.join(RUN_LOG_DIR, f"{recorder.run_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"run_id": recorder.run_id, "stages": recorder.records}, f, indent=2)
+    print(f"📝 Run log written to {path}")
+    if persist and recorder.records:
+        df = recorder.frame()
+        df["StartedAt"] = pd.to_datetime(df["StartedAt"])
+        n = storage.get_backend().merge_frame(RUN_LOG_TABLE, df, RUN_LOG_COLS,
+                                              key_cols=["RunId", "Stage"],
+                                              int_cols=["RowsIn", "RowsOut", "DbCalls", "Succeeded"])
+        print(f"✅ Merged {n:,} rows into {RUN_LOG_TABLE}")
+    return path
+
+# ---------- HISTORY ----------
+def load_runs(limit: int = 20) -> pd.DataFrame:
+    """Stage records of the last `limit` runs from RUN_LOG_DIR, oldest first."""
+    if not os.path.isdir(RUN_LOG_DIR):
+        return pd.DataFrame(columns=RUN_LOG_COLS)
+    names = sorted(n for n in os.listdir(RUN_LOG_DIR) if n.endswith(".json"))[-limit:]
+    records = []
+    for name in names:
+        with open(os.path.join(RUN_LOG_DIR, name), encoding="utf-8") as f:
+            records.extend(json.load(f)["stages"])
+    return pd.DataFrame(records, columns=RUN_LOG_COLS)
+
+def compare_last(runs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest run's wall / CPU / DB time per stage next to the median of the
+    earlier runs in `runs`; Slower marks stages above SLOWDOWN_RATIO × median.
+    """
+    if runs.empty:
+        return pd.DataFrame()
+    last_id = runs["RunId"].iloc[-1]
+    metrics = ["WallSeconds", "CpuSeconds", "DbSeconds", "RowsOut", "PeakRssMiB"]
+    last = runs[runs["RunId"] == last_id].set_index("Stage")[metrics]
+    median = runs[(runs["RunId"] != last_id) & (runs["Succeeded"] == 1)] \
+        .groupby("Stage")[metrics].median()
+    out = last.join(median, rsuffix="_Median")
+    out["Slower"] = out["WallSeconds"] > SLOWDOWN_RATIO * out["WallSeconds_Median"]
+    return out
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compare the latest pipeline run with earlier runs")
+    parser.add_argument("--last", type=int, default=20, help="runs to read (default: %(default)s)")
+    args = parser.parse_args()
+    report = compare_last(load_runs(args.last))
+    if report.empty:
+        print(f"ℹ️  No run logs in {RUN_LOG_DIR}")
+    else:
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(report.round(2))
+        for stage in report.index[report["Slower"]]:
+            print(f"🐢 {stage} is over {SLOWDOWN_RATIO}× its median wall time")
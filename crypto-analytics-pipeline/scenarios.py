@@ -0,0 +1,248 @@
+import os                                  # environment config
+import numpy as np                         # NumPy for the date × horizon × asset cube
+import pandas as pd                        # pandas for the close matrix and summary frames
+
+import platinum_forecasting                # HORIZONS
+import storage                             # pooled storage backend
+import trading_calendar                    # imputed calendar days are not start dates
+
+# ---------- CONFIG ----------
+SUMMARY_TABLE = "gold_horizon_scenarios"
+YEARLY_TABLE  = "gold_horizon_scenarios_yearly"
+SCENARIO_START = pd.Timestamp(os.environ.get("CRYPTO_SCENARIO_START", "2014-01-01"))
+PERCENTILES = (5, 25, 50, 75, 95)
+ASSET_BLOCK = 64                           # assets per drawdown pass (bounds memory)
+
+SUMMARY_KEYS = ["Asset", "HorizonLabel"]
+SUMMARY_COLS = SUMMARY_KEYS + ["HorizonDays", "FirstStart", "LastStart", "Starts", "MeanReturn"] \
+    + [f"P{p}Return" for p in PERCENTILES] \
+    + ["ShareUp", "BestReturn", "WorstReturn", "MeanMaxDrawdown", "MedianMaxDrawdown",
+       "WorstMaxDrawdown"]
+YEARLY_KEYS = ["Asset", "HorizonLabel", "StartYear"]
+YEARLY_COLS = YEARLY_KEYS + ["HorizonDays", "Starts", "MeanReturn", "ShareUp", "BestReturn",
+                             "WorstReturn", "MeanMaxDrawdown", "WorstMaxDrawdown"]
+
+# ---------- CLOSE MATRIX ----------
+def close_matrix(gold: dict):
+    """
+    Daily closes of every coin on one gap-free calendar: (closes frame with
+    one column per suffix, sorted; imputed mask of the same shape). Days a
+    coin has no row are NaN; imputed days keep the carried-forward close so
+    they can end a holding period, but never start one.
+    """
+    closes, imputed = {}, {}
+    for suffix, df in gold.items():
+        if df.empty:
+            continue
+        index = pd.to_datetime(df["PriceDate"])
+        closes[suffix] = pd.Series(df[f"Close_{suffix}"].to_numpy(dtype=float), index=index)
+        flags = (df["IsImputed"].to_numpy(dtype=bool) if trading_calendar.is_aligned(df)
+                 else np.zeros(len(df), dtype=bool))
+        imputed[suffix] = pd.Series(flags, index=index)
+    return calendar_frames(pd.DataFrame(closes), pd.DataFrame(imputed))
+
+def close_matrix_long(gold_long: pd.DataFrame):
+    """close_matrix for the long-format universe gold (Asset, PriceDate, ClosePrice)."""
+    gold_long = gold_long.assign(PriceDate=pd.to_datetime(gold_long["PriceDate"]))
+    if not trading_calendar.is_aligned(gold_long):
+        gold_long = gold_long.assign(IsImputed=False)
+    closes = gold_long.pivot_table(index="PriceDate", columns="Asset", values="ClosePrice",
+                                   aggfunc="last")
+    imputed = gold_long.pivot_table(index="PriceDate", columns="Asset", values="IsImputed",
+                                    aggfunc="last")
+    return calendar_frames(closes, imputed)
+
+def calendar_frames(closes: pd.DataFrame, imputed: pd.DataFrame):
+    """Both frames reindexed onto every calendar day between the first and last date."""
+    if closes.empty:
+        return closes, imputed
+    days = pd.date_range(closes.index.min(), closes.index.max(), freq="D")
+    closes = closes.sort_index(axis=1).reindex(days)
+    imputed = imputed.astype(float).reindex(index=days, columns=closes.columns)
+    return closes, imputed.fillna(0).astype(bool)
+
+# ---------- SCENARIO CUBE ----------
+def merge_windows(left, right, shift: int):
+    """
+    (max, min, drawdown) of the windows made of a `left` window followed by
+    the `right` window starting `shift` days later. Both are (max, min,
+    drawdown) arrays of log closes over (start day × asset); the result
+    covers the start days both have. The drawdown of the joined window is
+    the worse of each half's and of a peak in the left before a trough in
+    the right. NaN (a day without a close) propagates.
+    """
+    n = min(len(left[0]), len(right[0]) - shift)
+    l_max, l_min, l_dd = (a[:n] for a in left)
+    r_max, r_min, r_dd = (a[shift:shift + n] for a in right)
+    return (np.maximum(l_max, r_max), np.minimum(l_min, r_min),
+            np.minimum(np.minimum(l_dd, r_dd), r_min - l_max))
+
+def window_drawdowns(logs: np.ndarray, horizons) -> dict:
+    """
+    {h: max drawdown (log) over days t..t+h for every start day t} with
+    start days along axis 0 (len(logs) - h rows). Windows of 2^k days are
+    built by doubling, each level from two shifted views of the previous
+    one, and every horizon is joined from the power-of-two blocks of h + 1
+    days. Cost is O(days · assets · log h) for all start days at once,
+    instead of materializing an h-day window per start day.
+    """
+    levels = [(logs, logs, logs - logs)]
+    longest = max(horizons) + 1
+    while 2 ** len(levels) <= min(longest, len(logs)):
+        half = 2 ** (len(levels) - 1)
+        levels.append(merge_windows(levels[-1], levels[-1], half))
+
+    out = {}
+    for h in horizons:
+        if h >= len(logs):
+            continue
+        acc, offset = None, 0
+        for k in range(len(levels)):
+            if (h + 1) >> k & 1:
+                acc = levels[k] if acc is None else merge_windows(acc, levels[k], offset)
+                offset += 2 ** k
+        out[h] = acc[2][:len(logs) - h]
+    return out
+
+def scenario_cube(closes: pd.DataFrame, imputed: pd.DataFrame, horizons: dict = None,
+                  start=SCENARIO_START) -> dict:
+    """
+    Realized outcome of buying on every observed day since `start` and
+    holding for every horizon, for every asset at once:
+      - returns[d, h, a]: close h days later vs. the start close
+      - max_drawdown[d, h, a]: worst close vs. its running max while held
+    NaN where the start day was imputed or has no close, or the horizon
+    ends after the last day. Returns {'dates', 'labels', 'days', 'assets',
+    'returns', 'max_drawdown'}.
+    """
+    horizons = platinum_forecasting.HORIZONS if horizons is None else horizons
+    labels, days = list(horizons), np.asarray(list(horizons.values()), dtype=np.int64)
+    first = int(np.searchsorted(closes.index.to_numpy(), np.datetime64(pd.Timestamp(start)), "left"))
+    dates = closes.index[first:]
+    shape = (len(dates), len(days), closes.shape[1])
+    returns, drawdown = np.full(shape, np.nan), np.full(shape, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logs = np.log(closes.to_numpy(dtype=float))
+    for lo in range(0, logs.shape[1], ASSET_BLOCK):
+        block = logs[:, lo:lo + ASSET_BLOCK]
+        dd = window_drawdowns(block, days)
+        for j, h in enumerate(days):
+            n = len(block) - h - first            # start days whose horizon has ended
+            if n <= 0:
+                continue
+            returns[:n, j, lo:lo + ASSET_BLOCK] = block[first + h:] - block[first:first + n]
+            drawdown[:n, j, lo:lo + ASSET_BLOCK] = dd[h][first:]
+
+    no_start = np.broadcast_to(imputed.to_numpy(dtype=bool)[first:, None, :], shape)
+    returns[no_start] = np.nan
+    drawdown[no_start] = np.nan
+    return {"dates": dates, "labels": labels, "days": days, "assets": list(closes.columns),
+            "returns": np.expm1(returns, out=returns),
+            "max_drawdown": np.expm1(drawdown, out=drawdown)}
+
+# ---------- SUMMARIES ----------
+def percentiles(values: np.ndarray, qs) -> np.ndarray:
+    """
+    Linear-interpolated percentiles over axis 0 ignoring NaN, for every
+    column at once: one sort (NaN last) and two gathers per percentile.
+    Shape (len(qs),) + values.shape[1:].
+    """
+    ordered = np.sort(values, axis=0)
+    n = np.isfinite(values).sum(axis=0)
+    out = np.full((len(qs),) + values.shape[1:], np.nan)
+    for i, q in enumerate(qs):
+        pos = (n - 1) * q / 100.0
+        lo = np.floor(pos).astype(np.int64).clip(0)
+        hi = np.ceil(pos).astype(np.int64).clip(0)
+        a = np.take_along_axis(ordered, lo[None], axis=0)[0]
+        b = np.take_along_axis(ordered, hi[None], axis=0)[0]
+        out[i] = np.where(n > 0, a + (b - a) * (pos - lo), np.nan)
+    return out
+
+def summarize(cube: dict) -> pd.DataFrame:
+    """One SUMMARY_COLS row per asset and horizon with at least one start day."""
+    r, dd = cube["returns"], cube["max_drawdown"]
+    if not len(r):
+        return pd.DataFrame(columns=SUMMARY_COLS)
+    valid = np.isfinite(r)
+    starts = valid.sum(axis=0)
+    dates = cube["dates"].to_numpy()
+    with np.errstate(invalid="ignore"):
+        first_idx = np.where(starts > 0, valid.argmax(axis=0), 0)
+        last_idx = np.where(starts > 0, len(dates) - 1 - valid[::-1].argmax(axis=0), 0)
+        ret_p = percentiles(r, PERCENTILES)
+        dd_median = percentiles(dd, (50,))[0]
+        n_h, n_a = starts.shape
+        out = pd.DataFrame({
+            "Asset":        np.tile(np.asarray(cube["assets"], dtype=object), n_h),
+            "HorizonLabel": np.repeat(np.asarray(cube["labels"], dtype=object), n_a),
+            "HorizonDays":  np.repeat(cube["days"], n_a),
+            "FirstStart":   dates[first_idx.ravel()],
+            "LastStart":    dates[last_idx.ravel()],
+            "Starts":       starts.ravel(),
+            "MeanReturn":   (np.where(valid, r, 0).sum(axis=0) / starts).ravel(),
+            **{f"P{p}Return": ret_p[i].ravel() for i, p in enumerate(PERCENTILES)},
+            "ShareUp":      ((r > 0).sum(axis=0) / starts).ravel(),
+            "BestReturn":   np.fmax.reduce(r, axis=0).ravel(),
+            "WorstReturn":  np.fmin.reduce(r, axis=0).ravel(),
+            "MeanMaxDrawdown":   (np.where(valid, dd, 0).sum(axis=0) / starts).ravel(),
+            "MedianMaxDrawdown": dd_median.ravel(),
+            "WorstMaxDrawdown":  np.fmin.reduce(dd, axis=0).ravel(),
+        })
+    return out[out["Starts"] > 0].reset_index(drop=True)[SUMMARY_COLS]
+
+def summarize_yearly(cube: dict) -> pd.DataFrame:
+    """
+    One YEARLY_COLS row per asset, horizon and start year with at least one
+    start day. Start days are sorted, so each year is one contiguous block
+    reduced with ufunc.reduceat.
+    """
+    r, dd = cube["returns"], cube["max_drawdown"]
+    if not len(r):
+        return pd.DataFrame(columns=YEARLY_COLS)
+    years = cube["dates"].year.to_numpy()
+    bounds = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    valid = np.isfinite(r)
+    starts = np.add.reduceat(valid, bounds, axis=0)
+    with np.errstate(invalid="ignore"):
+        stats = {
+            "Starts":           starts,
+            "MeanReturn":       np.add.reduceat(np.where(valid, r, 0), bounds, axis=0) / starts,
+            "ShareUp":          np.add.reduceat(r > 0, bounds, axis=0) / starts,
+            "BestReturn":       np.fmax.reduceat(r, bounds, axis=0),
+            "WorstReturn":      np.fmin.reduceat(r, bounds, axis=0),
+            "MeanMaxDrawdown":  np.add.reduceat(np.where(valid, dd, 0), bounds, axis=0) / starts,
+            "WorstMaxDrawdown": np.fmin.reduceat(dd, bounds, axis=0),
+        }
+    n_y, n_h, n_a = starts.shape
+    out = pd.DataFrame({
+        "Asset":        np.tile(np.asarray(cube["assets"], dtype=object), n_y * n_h),
+        "HorizonLabel": np.tile(np.repeat(np.asarray(cube["labels"], dtype=object), n_a), n_y),
+        "StartYear":    np.repeat(years[bounds], n_h * n_a),
+        "HorizonDays":  np.tile(np.repeat(cube["days"], n_a), n_y),
+        **{k: v.ravel() for k, v in stats.items()},
+    })
+    return out[out["Starts"] > 0].reset_index(drop=True)[YEARLY_COLS]
+
+def compute_scenarios(closes: pd.DataFrame, imputed: pd.DataFrame, start=SCENARIO_START) -> dict:
+    """{'summary': SUMMARY_COLS frame, 'yearly': YEARLY_COLS frame} for a close matrix."""
+    cube = scenario_cube(closes, imputed, start=start)
+    return {"summary": summarize(cube), "yearly": summarize_yearly(cube)}
+
+# ---------- PERSIST ----------
+def write_scenarios(result: dict):
+    """
+    Upsert both summaries by asset and horizon (and start year), so the
+    BTC/ETH orchestrator and the multi-asset universe share the tables.
+    """
+    backend = storage.get_backend()
+    for name, table, key, cols, int_cols in (
+            ("summary", SUMMARY_TABLE, SUMMARY_KEYS, SUMMARY_COLS, ["HorizonDays", "Starts"]),
+            ("yearly", YEARLY_TABLE, YEARLY_KEYS, YEARLY_COLS, ["StartYear", "HorizonDays", "Starts"])):
+        rows = result[name]
+        if rows.empty:
+            print(f"⏭️  No rows for {table}")
+            continue
+        n = backend.merge_frame(table, rows, cols, key_cols=key, int_cols=int_cols)
+        print(f"✅ Merged {n:,} rows into {table}")
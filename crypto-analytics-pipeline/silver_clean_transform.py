@@ -1,102 +1,106 @@
 import pandas as pd                        # pandas for DataFrame operations
-import pyodbc                              # pyodbc for DB connections
-import bronze_raw_ingest                              # our Bronze layer module
-
-# ---------- CONFIG ----------
-SERVER   = r"KRISHNA\KVSTG"                # SQL Server instance
-DATABASE = "Crypto_Analytics"              # target database
-DRIVER   = "ODBC Driver 17 for SQL Server" # ODBC driver
+import db_writer                                      # shared columnar executemany writer
+import data_quality                                   # declarative, vectorized cleaning rules
+import storage                                        # pooled storage backend (SQL Server / SQLite)
+import trading_calendar                               # shared gap-aware daily calendar
 
 # ---------- LOAD & CLEAN BRONZE DATA ----------
 def load_and_clean_bronze(table_name: str, suffix: str) -> pd.DataFrame:
     """
     1) Load raw bronze data into DataFrame
-    2) Drop duplicates, remove non-positive values,
-       forward-fill missing, trim Coin, reset index
-    """
-    sql = f"""
-    SELECT
-      PriceDate,
-      Open_{suffix},
-      High_{suffix},
-      Low_{suffix},
-      Close_{suffix},
-      Volume_{suffix},
-      Coin
-    FROM {table_name}
-    ORDER BY PriceDate
+    2) Clean it with clean_bronze
     """
-    df = pd.read_sql(sql, conn, parse_dates=["PriceDate"])
+    cols = [
+        "PriceDate",
+        f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
+        f"Volume_{suffix}", "Coin"
+    ]
+    df = storage.get_backend().read_table(table_name, cols)   # only the columns we clean
+    return clean_bronze(df, suffix)
 
-    # 1) Drop exact duplicate dates
-    df = df.drop_duplicates(subset=["PriceDate"])
+# ---------- CLEAN BRONZE FRAME ----------
+def clean_bronze(df: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """
+    Clean a bronze-shaped frame (PriceDate, OHLCV, Coin), whether it was
+    read from SQL or handed over in memory. See clean_bronze_with_report.
+    """
+    return clean_bronze_with_report(df, suffix)[0]
 
-    # 2) Remove rows with zero or negative prices/volume
-    price_cols = [f"{c}_{suffix}" for c in ("Open","High","Low","Close")]
-    df = df[(df[price_cols] > 0).all(axis=1) & (df[f"Volume_{suffix}"] > 0)]
+def clean_bronze_with_report(df: pd.DataFrame, suffix: str):
+    """
+    Clean a bronze-shaped frame with data_quality.SILVER_RULES:
+    non-positive or missing prices/volume, High/Low outside Open/Close and
+    duplicate dates are rejected; date gaps and outlier returns are flagged.
+    Then sort by date, trim Coin and align to the trading calendar: missing
+    days become flat bars at the previous close with zero volume, marked
+    IsImputed / GapLength, so every later stage sees one row per day.
+    Returns (clean frame, {rule: failing rows}, quarantine frame).
+    """
+    cols = [
+        "PriceDate",
+        f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
+        f"Volume_{suffix}", "Coin"
+    ]
+    df = df[cols].copy()
+    df["PriceDate"] = pd.to_datetime(df["PriceDate"])
 
-    # 3) Forward-fill then drop any remaining NaNs
-    df.sort_values("PriceDate", inplace=True)
-    df.fillna(method="ffill", inplace=True)
-    df.dropna(inplace=True)
+    # 1) Run every rule as whole-column checks
+    df, counts, quarantine = data_quality.run_rules(df, data_quality.SILVER_RULES, suffix)
 
-    # 4) Trim whitespace in Coin column
-    df["Coin"] = df["Coin"].str.strip()
+    # 2) Sort, fill a missing Coin label from the previous day, trim whitespace
+    df = df.sort_values("PriceDate")
+    df["Coin"] = df["Coin"].ffill().str.strip()
+    df = df.dropna(subset=["Coin"])
 
-    # 5) Reset index
-    df.reset_index(drop=True, inplace=True)
-    return df
+    # 3) One row per calendar day (reset index)
+    df = trading_calendar.align(df, fill=trading_calendar.DAILY_FILL, suffix=suffix)
+    return df, counts, quarantine
 
 # ---------- WRITE TO SILVER TABLE ----------
-def refresh_silver(df: pd.DataFrame, table_name: str, suffix: str):
+def refresh_silver(df: pd.DataFrame, table_name: str, suffix: str,
+                   chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE):
     """
-    Truncate and bulk-insert cleaned rows into the silver table.
+    Swap the observed (not imputed) cleaned rows into the silver table.
     """
-    cursor.execute(f"TRUNCATE TABLE {table_name}")
-    print(f"🗑️ Truncated {table_name}")
-
     cols = [
         "PriceDate",
         f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
         f"Volume_{suffix}", "Coin"
     ]
-    placeholders = ", ".join("?" for _ in cols)
-    insert_sql = f"INSERT INTO {table_name} ({', '.join(cols)}) VALUES ({placeholders})"
+    n = storage.get_backend().replace_table(
+        table_name, trading_calendar.observed(df), cols,
+        int_cols=[f"Volume_{suffix}"], chunk_size=chunk_size,
+    )
+    print(f"✅ Swapped in {n:,} rows into {table_name}")
 
-    rows = [tuple(row[col] for col in cols) for _, row in df.iterrows()]
-    cursor.executemany(insert_sql, rows)
-    conn.commit()
-    print(f"✅ Inserted {len(rows):,} rows into {table_name}")
+# ---------- MERGE INTO SILVER TABLE ----------
+def merge_silver(df: pd.DataFrame, table_name: str, suffix: str,
+                 chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE):
+    """
+    Upsert cleaned rows by (PriceDate, Coin), e.g. only the date partitions
+    whose content changed, instead of reloading the whole table. Imputed
+    calendar days are not stored.
+    """
+    df = trading_calendar.observed(df)
+    if df.empty:
+        print(f"⏭️  No changed rows for {table_name}")
+        return
+    cols = [
+        "PriceDate",
+        f"Open_{suffix}", f"High_{suffix}", f"Low_{suffix}", f"Close_{suffix}",
+        f"Volume_{suffix}", "Coin"
+    ]
+    n = storage.get_backend().merge_frame(
+        table_name, df, cols, key_cols=["PriceDate", "Coin"],
+        int_cols=[f"Volume_{suffix}"], chunk_size=chunk_size,
+    )
+    print(f"✅ Merged {n:,} rows into {table_name}")
 
 # ---------- MAIN ENTRY POINT ----------
 def main():
-    # 1) Ensure Bronze layer has run and populated raw tables
-    bronze_raw_ingest.main()
-
-    # 2) Connect to DB
-    global conn, cursor
-    conn = pyodbc.connect(
-        f"Driver={{{DRIVER}}};"
-        f"Server={SERVER};"
-        f"Database={DATABASE};"
-        "Trusted_Connection=yes;"
-        "Encrypt=yes;"
-        "TrustServerCertificate=yes;"
-    )
-    cursor = conn.cursor()
-    cursor.fast_executemany = True
-
-    # 3) Load, clean, and write BTC to silver
-    btc_clean = load_and_clean_bronze("raw_btc_prices_bnz", "BTC")
-    refresh_silver(btc_clean, "raw_btc_prices_sil", "BTC")
-
-    # 4) Load, clean, and write ETH to silver
-    eth_clean = load_and_clean_bronze("raw_eth_prices_bnz", "ETH")
-    refresh_silver(eth_clean, "raw_eth_prices_sil", "ETH")
-
-    # 5) Cleanup
-    cursor.close()
-    conn.close()
+    # Run Bronze → Silver with in-memory handoff (see pipeline_orchestrator)
+    import pipeline_orchestrator
+    pipeline_orchestrator.run_pipeline(["bronze", "silver"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,496 @@
+import os                                  # environment-driven config and schema path
+import re                                  # T-SQL → SQLite schema translation
+import time                                # round-trip timing of backend operations
+import queue                               # thread-safe pool of idle connections
+import sqlite3                             # embedded backend (standard library)
+import functools                           # wraps for the timing decorator
+import threading                           # per-thread nesting depth of timed calls
+from contextlib import contextmanager      # connection() context manager
+from datetime import date, datetime        # DATE values and watermark parsing
+import pandas as pd                        # pandas for read_sql
+
+import db_writer                           # shared columnar executemany writer
+
+# ---------- CONFIG ----------
+SERVER   = os.environ.get("CRYPTO_DB_SERVER", r"KRISHNA\KVSTG")                # SQL Server instance
+DATABASE = os.environ.get("CRYPTO_DB_DATABASE", "Crypto_Analytics")            # target database
+DRIVER   = os.environ.get("CRYPTO_DB_DRIVER", "ODBC Driver 17 for SQL Server")  # ODBC driver
+BACKEND  = os.environ.get("CRYPTO_STORAGE_BACKEND", "sqlserver")               # 'sqlserver', 'sqlite' or 'lakehouse'
+SQLITE_PATH = os.environ.get("CRYPTO_SQLITE_PATH", "crypto_analytics.db")      # embedded DB file
+POOL_SIZE = int(os.environ.get("CRYPTO_DB_POOL_SIZE", "4"))                    # idle connections kept
+
+STAGING_SUFFIX = "_staging"                 # shadow table a full reload is loaded into before the swap
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "..", "Table_schemas", "schemas.sql")
+
+# store DATE / DATETIME parameters as ISO text in SQLite
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(sep=" "))
+
+# ---------- ROUND-TRIP TIMING ----------
+# Cumulative calls and wall time spent inside backend operations (queries,
+# writes, file scans for the lakehouse); run_metrics reads the deltas per stage.
+DB_STATS = {"calls": 0, "seconds": 0.0}
+_stats_lock = threading.Lock()
+_nesting = threading.local()
+
+def timed(method):
+    """Add a backend operation's wall time to DB_STATS; nested operations count once."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_nesting, "depth", 0)
+        if depth:
+            return method(*args, **kwargs)
+        _nesting.depth = 1
+        t0 = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _nesting.depth = 0
+            with _stats_lock:
+                DB_STATS["calls"] += 1
+                DB_STATS["seconds"] += time.perf_counter() - t0
+    return wrapper
+
+# ---------- CONNECTION POOL ----------
+class ConnectionPool:
+    """
+    Keep up to max_size idle connections and hand them out for reuse.
+    A connection that raised while checked out is closed, not returned.
+    """
+
+    def __init__(self, factory, max_size: int = POOL_SIZE):
+        self.factory = factory
+        self.idle = queue.LifoQueue(maxsize=max_size)
+
+    @contextmanager
+    def acquire(self):
+        try:
+            conn = self.idle.get_nowait()      # reuse the most recently returned connection
+        except queue.Empty:
+            conn = self.factory()               # pool empty: open a new one
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+# ---------- BACKEND BASE ----------
+class StorageBackend:
+    """
+    Table-level operations every layer uses. Subclasses provide the
+    connection factory and the dialect-specific statements.
+    """
+
+    name = "base"
+
+    def __init__(self, pool_size: int = POOL_SIZE):
+        self.pool = ConnectionPool(self.connect, pool_size)
+
+    # --- dialect hooks ---
+    def connect(self):
+        raise NotImplementedError
+
+    def cursor(self, conn):
+        return conn.cursor()
+
+    def truncate_sql(self, table: str) -> str:
+        raise NotImplementedError
+
+    def merge_sql(self, table: str, cols, key_cols, timestamp_col=None) -> str:
+        raise NotImplementedError
+
+    def drop_sql(self, table: str) -> str:
+        raise NotImplementedError
+
+    def staging_ddl(self, table: str, stage: str) -> list:
+        """Statements creating `stage` with the same columns and keys as `table` ([] if unknown)."""
+        raise NotImplementedError
+
+    def swap_sql(self, table: str, stage: str) -> list:
+        """Statements, run in one transaction, that put the loaded `stage` in place of `table`."""
+        raise NotImplementedError
+
+    def to_date(self, value):
+        return value
+
+    # --- shared operations ---
+    @contextmanager
+    def connection(self):
+        """Check a pooled connection out for the duration of a with-block."""
+        with self.pool.acquire() as conn:
+            yield conn
+
+    @timed
+    def read_sql(self, sql: str, params=None, parse_dates=None) -> pd.DataFrame:
+        """Run a query on a pooled connection and return a DataFrame."""
+        with self.connection() as conn:
+            return pd.read_sql(sql, conn, params=params, parse_dates=parse_dates)
+
+    @timed
+    def read_table(self, table: str, columns, start=None, end=None,
+                   date_col: str = "PriceDate") -> pd.DataFrame:
+        """
+        Read only `columns` of `table`, optionally limited to
+        start <= date_col <= end, ordered by date_col.
+        """
+        where, params = [], []
+        if start is not None:
+            where.append(f"{date_col} >= ?")
+            params.append(start)
+        if end is not None:
+            where.append(f"{date_col} <= ?")
+            params.append(end)
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {date_col}"
+        return self.read_sql(sql, params=params or None, parse_dates=[date_col])
+
+    @timed
+    def execute(self, sql: str, params=()):
+        """Run one statement and commit."""
+        with self.connection() as conn:
+            cur = self.cursor(conn)
+            cur.execute(sql, params)
+            conn.commit()
+            cur.close()
+
+    @timed
+    def max_date(self, table: str, column: str = "PriceDate"):
+        """Return MAX(column) as a date, or None when the table is empty."""
+        with self.connection() as conn:
+            cur = self.cursor(conn)
+            cur.execute(f"SELECT MAX({column}) FROM {table}")
+            row = cur.fetchone()
+            cur.close()
+        value = row[0] if row else None
+        return None if value is None else self.to_date(value)
+
+    @timed
+    def max_timestamp(self, table: str, column: str):
+        """Return MAX(column) as a pandas Timestamp (intraday keys), or None."""
+        with self.connection() as conn:
+            cur = self.cursor(conn)
+            cur.execute(f"SELECT MAX({column}) FROM {table}")
+            row = cur.fetchone()
+            cur.close()
+        value = row[0] if row else None
+        return None if value is None else pd.Timestamp(value)
+
+    @timed
+    def replace_table(self, table: str, df: pd.DataFrame, table_cols, frame_cols=None,
+                      int_cols=(), chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Replace the table's contents with df without readers ever seeing an
+        empty or partial table:
+          1) load df into a fresh shadow table (<table>_staging); the live
+             table is not touched, so a failed load leaves it intact
+          2) check the shadow row count (keys are enforced by its PK)
+          3) swap it in with metadata-only statements in one short transaction
+        Tables missing from schemas.sql fall back to an in-place reload in
+        one transaction.
+        frame_cols names the df columns matching table_cols (default: same names).
+        """
+        frame_cols = table_cols if frame_cols is None else frame_cols
+        stage = f"{table}{STAGING_SUFFIX}"
+        ddl = self.staging_ddl(table, stage)
+        if not ddl:
+            return self.reload_in_place(table, df, table_cols, frame_cols, int_cols, chunk_size)
+        placeholders = ", ".join("?" for _ in table_cols)
+        insert_sql = f"INSERT INTO {stage} ({', '.join(table_cols)}) VALUES ({placeholders})"
+        with self.connection() as conn:
+            cur = self.cursor(conn)
+            try:
+                for stmt in [self.drop_sql(stage)] + ddl:
+                    cur.execute(stmt)
+                n = db_writer.executemany_frame(cur, insert_sql, df, frame_cols,
+                                                int_cols=int_cols, chunk_size=chunk_size)
+                conn.commit()
+                cur.execute(f"SELECT COUNT(*) FROM {stage}")
+                loaded = cur.fetchone()[0]
+                if loaded != n:
+                    raise RuntimeError(f"{stage} holds {loaded:,} rows, expected {n:,}")
+                for stmt in self.swap_sql(table, stage):
+                    cur.execute(stmt)
+                conn.commit()
+                cur.execute(self.drop_sql(stage))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self.drop_quietly(cur, conn, stage)
+                raise
+            finally:
+                cur.close()
+        return n
+
+    def drop_quietly(self, cur, conn, table: str):
+        """Best-effort cleanup of a half-loaded shadow table; the load error is what matters."""
+        try:
+            cur.execute(self.drop_sql(table))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+
+    def reload_in_place(self, table: str, df: pd.DataFrame, table_cols, frame_cols,
+                        int_cols=(), chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE) -> int:
+        """Empty the table and insert df in one transaction."""
+        placeholders = ", ".join("?" for _ in table_cols)
+        insert_sql = f"INSERT INTO {table} ({', '.join(table_cols)}) VALUES ({placeholders})"
+        with self.connection() as conn:
+            cur = self.cursor(conn)
+            try:
+                cur.execute(self.truncate_sql(table))
+                n = db_writer.executemany_frame(cur, insert_sql, df, frame_cols,
+                                                int_cols=int_cols, chunk_size=chunk_size)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        return n
+
+    @timed
+    def merge_frame(self, table: str, df: pd.DataFrame, table_cols, key_cols, frame_cols=None,
+                    int_cols=(), timestamp_col=None,
+                    chunk_size: int = db_writer.DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Upsert df by key_cols: matching keys are updated, new keys inserted.
+        timestamp_col, if given, is set to the server's current time on update.
+        """
+        frame_cols = table_cols if frame_cols is None else frame_cols
+        sql = self.merge_sql(table, table_cols, key_cols, timestamp_col)
+        with self.connection() as conn:
+            cur = self.cursor(conn)
+            try:
+                n = db_writer.executemany_frame(cur, sql, df, frame_cols,
+                                                int_cols=int_cols, chunk_size=chunk_size)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        return n
+
+    def close(self):
+        self.pool.close_all()
+
+# ---------- SQL SERVER BACKEND ----------
+class SqlServerBackend(StorageBackend):
+    """SQL Server over pyodbc (Windows auth), as used by the original scripts."""
+
+    name = "sqlserver"
+
+    def __init__(self, server: str = SERVER, database: str = DATABASE, driver: str = DRIVER,
+                 pool_size: int = POOL_SIZE):
+        self.conn_str = (
+            f"Driver={{{driver}}};"                # specify ODBC driver
+            f"Server={server};"                    # SQL Server instance
+            f"Database={database};"                # target database
+            "Trusted_Connection=yes;"              # use Windows authentication
+            "Encrypt=yes;"                         # encrypt connection
+            "TrustServerCertificate=yes;"          # trust the server cert
+        )
+        super().__init__(pool_size)
+
+    def connect(self):
+        import pyodbc                              # only needed for this backend
+        return pyodbc.connect(self.conn_str)
+
+    def cursor(self, conn):
+        cur = conn.cursor()
+        cur.fast_executemany = True                # enable fast bulk operations
+        return cur
+
+    def truncate_sql(self, table: str) -> str:
+        return f"TRUNCATE TABLE {table}"
+
+    def drop_sql(self, table: str) -> str:
+        return f"IF OBJECT_ID('{table}', 'U') IS NOT NULL DROP TABLE {table}"
+
+    def staging_ddl(self, table: str, stage: str) -> list:
+        with open(SCHEMA_FILE, encoding="utf-8") as f:
+            return staging_statements(f.read(), table, stage)
+
+    def swap_sql(self, table: str, stage: str) -> list:
+        # both are metadata operations: the live table is locked for milliseconds
+        return [f"TRUNCATE TABLE {table}", f"ALTER TABLE {stage} SWITCH TO {table}"]
+
+    def merge_sql(self, table: str, cols, key_cols, timestamp_col=None) -> str:
+        value_cols = [c for c in cols if c not in key_cols]
+        updates = [f"{c} = src.{c}" for c in value_cols]
+        if timestamp_col:
+            updates.append(f"{timestamp_col} = SYSUTCDATETIME()")
+        return f"""
+        MERGE {table} AS tgt
+        USING (VALUES ({', '.join('?' for _ in cols)})) AS src ({', '.join(cols)})
+           ON {' AND '.join(f"tgt.{k} = src.{k}" for k in key_cols)}
+        WHEN MATCHED THEN UPDATE SET {', '.join(updates)}
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(cols)})
+            VALUES ({', '.join(f"src.{c}" for c in cols)});
+        """
+
+# ---------- SCHEMA STATEMENTS ----------
+def schema_statements(sql_text: str) -> list:
+    """The statements of schemas.sql without comments, GO batches or the dbo schema."""
+    text = re.sub(r"--[^\n]*", "", sql_text)                         # strip comments
+    text = "\n".join(l for l in text.splitlines()
+                     if l.strip() not in ("GO", "\\"))             # batch separators / stray lines
+    text = re.sub(r"\bdbo\.", "", text)
+    return [s.strip() for s in text.split(";") if s.strip()]
+
+def staging_statements(sql_text: str, table: str, stage: str,
+                       rename_constraints: bool = True) -> list:
+    """
+    The CREATE TABLE / ALTER TABLE statements of `table`, rewritten for
+    its shadow table `stage`. Constraint names get STAGING_SUFFIX so they
+    stay unique (SQL Server); [] when the schema does not define the table.
+    """
+    head = re.compile(rf"(CREATE|ALTER)\s+TABLE\s+{re.escape(table)}\b", re.I)
+    out = []
+    for stmt in schema_statements(sql_text):
+        if head.match(stmt):
+            stmt = head.sub(lambda m: f"{m.group(1)} TABLE {stage}", stmt, count=1)
+            if rename_constraints:
+                stmt = re.sub(r"\bCONSTRAINT\s+(\w+)", rf"CONSTRAINT \1{STAGING_SUFFIX}", stmt)
+            out.append(stmt)
+    return out
+
+# ---------- SQLITE BACKEND ----------
+def translate_schema_for_sqlite(sql_text: str):
+    """
+    Turn the T-SQL in Table_schemas/schemas.sql into SQLite statements:
+    drop GO batches and the dbo schema, map DATETIME2/SYSUTCDATETIME,
+    make CREATE TABLE idempotent and split multi-column ALTER ... ADD.
+    Returns a list of (kind, statement) where kind is 'create' or
+    ('add', table, column).
+    """
+    statements = []
+    for stmt in schema_statements(sql_text):
+        stmt = re.sub(r"DATETIME2\(\d+\)", "TEXT", stmt, flags=re.I)
+        stmt = re.sub(r"SYSUTCDATETIME\(\)", "CURRENT_TIMESTAMP", stmt, flags=re.I)
+        alter = re.match(r"ALTER\s+TABLE\s+(\w+)\s+ADD\s+(.*)", stmt, flags=re.I | re.S)
+        if alter:
+            table, defs = alter.groups()
+            for col_def in (d.strip() for d in defs.split(",")):
+                column = col_def.split()[0].strip("[]")
+                statements.append((("add", table, column),
+                                   f"ALTER TABLE {table} ADD COLUMN {col_def}"))
+        else:
+            stmt = re.sub(r"CREATE\s+TABLE\s+(?!IF\s)", "CREATE TABLE IF NOT EXISTS ",
+                          stmt, flags=re.I)
+            statements.append(("create", stmt))
+    return statements
+
+class SqliteBackend(StorageBackend):
+    """
+    Embedded single-file backend built from Table_schemas/schemas.sql,
+    so the whole pipeline runs on one box without SQL Server.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH, schema_file: str = SCHEMA_FILE,
+                 pool_size: int = POOL_SIZE):
+        self.path = path
+        self.schema_file = schema_file
+        super().__init__(pool_size)
+        self.apply_schema(schema_file)
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")    # readers don't block the writer
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def apply_schema(self, schema_file: str):
+        """Create any missing tables/columns described in schemas.sql."""
+        with open(schema_file, encoding="utf-8") as f:
+            statements = translate_schema_for_sqlite(f.read())
+        with self.connection() as conn:
+            for kind, stmt in statements:
+                if kind != "create":
+                    _, table, column = kind
+                    existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+                    if column in existing:
+                        continue
+                conn.execute(stmt)
+            conn.commit()
+
+    def truncate_sql(self, table: str) -> str:
+        return f"DELETE FROM {table}"
+
+    def drop_sql(self, table: str) -> str:
+        return f"DROP TABLE IF EXISTS {table}"
+
+    def staging_ddl(self, table: str, stage: str) -> list:
+        with open(self.schema_file, encoding="utf-8") as f:
+            # constraint names are per table in SQLite, and the stage is renamed to `table`
+            text = ";\n".join(staging_statements(f.read(), table, stage, rename_constraints=False))
+        return [stmt for _, stmt in translate_schema_for_sqlite(text)]
+
+    def swap_sql(self, table: str, stage: str) -> list:
+        # sqlite3 does not open a transaction before DDL by itself
+        return ["BEGIN IMMEDIATE", f"DROP TABLE {table}", f"ALTER TABLE {stage} RENAME TO {table}"]
+
+    def merge_sql(self, table: str, cols, key_cols, timestamp_col=None) -> str:
+        value_cols = [c for c in cols if c not in key_cols]
+        updates = [f"{c} = excluded.{c}" for c in value_cols]
+        if timestamp_col:
+            updates.append(f"{timestamp_col} = CURRENT_TIMESTAMP")
+        return (
+            f"INSERT INTO {table} ({', '.join(cols)}) "
+            f"VALUES ({', '.join('?' for _ in cols)}) "
+            f"ON CONFLICT ({', '.join(key_cols)}) DO UPDATE SET {', '.join(updates)}"
+        )
+
+    def to_date(self, value):
+        return date.fromisoformat(str(value)[:10]) if isinstance(value, str) else value
+
+# ---------- BACKEND REGISTRY ----------
+def _lakehouse_backend():
+    import lakehouse_storage                       # pyarrow is only needed for this backend
+    return lakehouse_storage.LakehouseBackend()
+
+BACKENDS = {
+    "sqlserver": SqlServerBackend,
+    "sqlite":    SqliteBackend,
+    "lakehouse": _lakehouse_backend,
+}
+
+_backend = None
+
+def get_backend() -> StorageBackend:
+    """Return the process-wide backend, creating it from CONFIG on first use."""
+    global _backend
+    if _backend is None:
+        _backend = BACKENDS[BACKEND]()
+    return _backend
+
+def set_backend(backend) -> StorageBackend:
+    """
+    Install the process-wide backend: a StorageBackend instance or a
+    BACKENDS name ('sqlserver', 'sqlite', 'lakehouse'). Closes the previous one.
+    """
+    global _backend
+    if isinstance(backend, str):
+        backend = BACKENDS[backend]()
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+    return _backend
@@ -0,0 +1,76 @@
+import numpy as np                         # vectorized path generation
+import pandas as pd                        # pandas for DataFrame output
+from scipy.signal import lfilter           # AR(1) log-volatility without a Python loop
+
+# ---------- CONFIG ----------
+DAILY_MAX_ROWS = 100_000                   # longer series switch to minute bars (date range limits)
+VOL_PERSISTENCE = 0.98                     # AR(1) coefficient of log volatility (clustering)
+VOL_OF_VOL = 0.15                          # shock size of log volatility
+TAIL_DF = 4                                # Student-t degrees of freedom (fat-tailed returns)
+
+# ---------- GENERATOR ----------
+def synthetic_ohlcv(n_rows: int, suffix: str = "SYN", seed: int = 0,
+                    start: str = "2014-09-17", base_price: float = 400.0,
+                    daily_vol: float = 0.035, coin_label: str = None) -> pd.DataFrame:
+    """
+    Generate a realistic OHLCV series shaped like a bronze table read
+    (PriceDate, Close_X, High_X, Low_X, Open_X, Volume_X, Coin):
+      - fat-tailed (Student-t) log returns with clustered volatility
+        (AR(1) log-volatility via lfilter, no per-row Python)
+      - Open near the previous Close, High/Low outside max/min(Open, Close)
+      - Volume lognormal and higher on large moves
+    Daily bars up to DAILY_MAX_ROWS rows, minute bars beyond that.
+    """
+    rng = np.random.default_rng(seed)
+    freq = "D" if n_rows <= DAILY_MAX_ROWS else "min"
+    if freq == "min":
+        daily_vol /= np.sqrt(24 * 60)                      # per-minute volatility
+    log_vol = lfilter([VOL_OF_VOL], [1, -VOL_PERSISTENCE], rng.standard_normal(n_rows))
+    sigma = daily_vol * np.exp(log_vol - log_vol.mean())
+    shocks = rng.standard_t(TAIL_DF, n_rows) / np.sqrt(TAIL_DF / (TAIL_DF - 2))
+    log_ret = sigma * shocks
+    close = base_price * np.exp(np.cumsum(log_ret))
+
+    open_ = np.empty(n_rows)
+    open_[0] = base_price
+    open_[1:] = close[:-1] * np.exp(0.1 * sigma[1:] * rng.standard_normal(n_rows - 1))
+    wick = np.abs(rng.standard_normal((2, n_rows))) * sigma * 0.5
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+    volume = np.exp(rng.normal(17, 0.5, n_rows) + 8 * np.abs(log_ret)).round()
+
+    return pd.DataFrame({
+        "PriceDate":       pd.date_range(start, periods=n_rows, freq=freq),
+        f"Close_{suffix}":  close,
+        f"High_{suffix}":   high,
+        f"Low_{suffix}":    low,
+        f"Open_{suffix}":   open_,
+        f"Volume_{suffix}": volume.astype(np.int64),
+        "Coin":            coin_label or suffix,
+    })
+
+def synthetic_universe(n_assets: int, n_rows: int, seed: int = 0) -> dict:
+    """{suffix: synthetic_ohlcv frame} for n_assets independent assets (SYN0, SYN1, ...)."""
+    rng = np.random.default_rng(seed)
+    out = {}
+    for i in range(n_assets):
+        suffix = f"SYN{i}"
+        out[suffix] = synthetic_ohlcv(n_rows, suffix, seed=seed + i + 1,
+                                      base_price=float(rng.uniform(0.5, 50_000)),
+                                      daily_vol=float(rng.uniform(0.02, 0.08)))
+    return out
+
+def to_yfinance_frame(df: pd.DataFrame, suffix: str, ticker: str = None) -> pd.DataFrame:
+    """
+    Reshape a synthetic frame like yf.download output (Date index,
+    ('Price', 'Ticker') MultiIndex columns) plus the 'Coin' column
+    bronze_raw_ingest.fetch_coin adds, i.e. the input of clean_df.
+    """
+    ticker = ticker or f"{suffix}-USD"
+    prices = ["Close", "High", "Low", "Open", "Volume"]
+    raw = pd.DataFrame(df[[f"{p}_{suffix}" for p in prices]].to_numpy(),
+                       index=pd.DatetimeIndex(df["PriceDate"], name="Date"),
+                       columns=pd.MultiIndex.from_product([prices, [ticker]],
+                                                          names=["Price", "Ticker"]))
+    raw["Coin"] = df["Coin"].to_numpy()
+    return raw
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cross_asset
+
+def returns(days, assets=("BTC", "ETH", "SOL"), seed=0, gaps=0.05):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 0.03, (days, len(assets)))
+    values[rng.random(values.shape) < gaps] = np.nan
+    return pd.DataFrame(values, columns=list(assets),
+                        index=pd.date_range("2024-01-01", periods=days, freq="D"))
+
+def brute_force(df: pd.DataFrame) -> pd.DataFrame:
+    """Every window recomputed from its rows (sample statistics over days both assets have)."""
+    rows = []
+    values = df.to_numpy()
+    for i, j in zip(*np.triu_indices(df.shape[1], 1)):
+        for t, date in enumerate(df.index):
+            row = {"PriceDate": date, "AssetA": df.columns[i], "AssetB": df.columns[j]}
+            for w in cross_asset.WINDOWS:
+                a, b = values[max(0, t + 1 - w):t + 1, i], values[max(0, t + 1 - w):t + 1, j]
+                both = np.isfinite(a) & np.isfinite(b)
+                a, b = a[both], b[both]
+                cov = var = corr = np.nan
+                if len(a) >= max(2, np.ceil(w * cross_asset.MIN_COVERAGE)):
+                    cov = np.cov(a, b)[0, 1]
+                    var = np.var(a, ddof=1)
+                    corr = np.corrcoef(a, b)[0, 1]
+                row.update({f"Corr{w}": corr, f"Cov{w}": cov, f"Beta{w}": cov / var})
+            rows.append(row)
+    out = pd.DataFrame(rows)
+    return out[out[f"Corr{min(cross_asset.WINDOWS)}"].notna()]
+
+def sort(df):
+    return df.sort_values(cross_asset.KEY_COLS).reset_index(drop=True)
+
+@pytest.mark.parametrize("days", [20, 40, 200, 400])
+def test_rolling_stats_match_brute_force(days):
+    df = returns(days)
+    got = cross_asset.rolling_pair_stats(df)
+    expected = brute_force(df)
+    assert len(got) == len(expected)
+    if len(got):
+        pd.testing.assert_frame_equal(sort(got), sort(expected)[cross_asset.CROSS_COLS],
+                                      check_dtype=False, rtol=1e-8)
+
+@pytest.mark.parametrize("days,since", [(60, 40), (200, 150), (400, 100)])
+def test_incremental_rows_match_full_history(days, since):
+    df = returns(days, seed=1)
+    rows, state, full = cross_asset.compute_cross_asset(df.iloc[:since])
+    assert full
+    more, _, full = cross_asset.compute_cross_asset(df, state)
+    assert not full and more["PriceDate"].min() > df.index[since - 1]
+    expected = brute_force(df)
+    expected = expected[expected["PriceDate"] > df.index[since - 1]]
+    pd.testing.assert_frame_equal(sort(more), sort(expected)[cross_asset.CROSS_COLS],
+                                  check_dtype=False, rtol=1e-8)
+
+def test_restated_history_recomputes_everything():
+    df = returns(100)
+    _, state, _ = cross_asset.compute_cross_asset(df.iloc[:80])
+    df.iloc[10, 0] += 0.01
+    rows, _, full = cross_asset.compute_cross_asset(df, state)
+    assert full and rows["PriceDate"].min() < df.index[80]
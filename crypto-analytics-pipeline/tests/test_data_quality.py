@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+import data_quality
+
+SUFFIX = "SYN"
+
+def bars(close) -> pd.DataFrame:
+    """Consistent daily OHLCV bars around the given closes."""
+    close = np.asarray(close, dtype=float)
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "PriceDate": pd.date_range("2024-01-01", periods=len(close), freq="D"),
+        f"Open_{SUFFIX}": open_,
+        f"High_{SUFFIX}": np.maximum(open_, close) * 1.01,
+        f"Low_{SUFFIX}": np.minimum(open_, close) * 0.99,
+        f"Close_{SUFFIX}": close,
+        f"Volume_{SUFFIX}": 1_000.0,
+        "Coin": SUFFIX,
+    })
+
+def quiet_closes(n: int = 60) -> np.ndarray:
+    rng = np.random.default_rng(3)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+def run_silver(df):
+    return data_quality.run_rules(df, data_quality.SILVER_RULES, SUFFIX)
+
+def test_clean_frame_passes_untouched():
+    df = bars(quiet_closes())
+    clean, counts, quarantine = run_silver(df)
+    pd.testing.assert_frame_equal(clean, df)
+    assert set(counts) == {r["name"] for r in data_quality.SILVER_RULES}
+    assert sum(counts.values()) == 0
+    assert quarantine.empty and {"Rule", "Action"} <= set(quarantine.columns)
+
+def test_reject_rules_drop_and_quarantine_rows():
+    df = bars(quiet_closes())
+    df.loc[5, f"Close_{SUFFIX}"] = -1.0                       # positive_prices
+    df.loc[9, f"Volume_{SUFFIX}"] = 0.0                       # positive_volume
+    df.loc[12, f"High_{SUFFIX}"] = df.loc[12, f"Close_{SUFFIX}"] * 0.9   # high_ge_open_close
+    df.loc[15, f"Low_{SUFFIX}"] = df.loc[15, f"Open_{SUFFIX}"] * 1.1     # low_le_open_close
+    df = pd.concat([df, df.iloc[[20]]], ignore_index=True)    # duplicate_date (row 60)
+
+    clean, counts, quarantine = run_silver(df)
+    assert counts["positive_prices"] == 1
+    assert counts["positive_volume"] == 1
+    assert counts["high_ge_open_close"] == 1
+    assert counts["low_le_open_close"] == 2                   # the negative close is below Low too
+    assert counts["duplicate_date"] == 1
+    assert counts["date_gap"] == 4                            # the day after each rejected row
+    assert list(clean.index) == [i for i in range(60) if i not in (5, 9, 12, 15)]
+
+    # one quarantine row per failing row, under the first rule it failed
+    rules = dict(zip(quarantine.index, quarantine["Rule"]))
+    assert rules == {5: "positive_prices", 9: "positive_volume", 12: "high_ge_open_close",
+                     15: "low_le_open_close", 60: "duplicate_date",
+                     6: "date_gap", 10: "date_gap", 13: "date_gap", 16: "date_gap"}
+    assert (quarantine["Action"] == quarantine["Rule"].map(
+        {"date_gap": "flag"}).fillna("reject")).all()
+
+def test_flag_rules_keep_rows():
+    df = bars(quiet_closes()).drop(index=[30, 31])            # two-day hole → one gap row
+    df = df.reset_index(drop=True)
+    df.loc[40, f"Close_{SUFFIX}"] *= 3                        # spike up, then back down
+    df.loc[40, f"High_{SUFFIX}"] = df.loc[40, f"Close_{SUFFIX}"] * 1.01
+    df.loc[41, f"Open_{SUFFIX}"] = df.loc[40, f"Close_{SUFFIX}"]
+    df.loc[41, f"High_{SUFFIX}"] = df.loc[41, f"Open_{SUFFIX}"] * 1.01
+
+    clean, counts, quarantine = run_silver(df)
+    assert len(clean) == len(df)
+    assert counts["date_gap"] == 1
+    assert counts["outlier_return"] == 2
+    assert sorted(quarantine["Rule"]) == ["date_gap", "outlier_return", "outlier_return"]
+    assert (quarantine["Action"] == "flag").all()
+    assert sorted(quarantine.loc[quarantine["Rule"] == "outlier_return"].index) == [40, 41]
+
+def test_rejected_tick_does_not_create_outliers():
+    df = bars(quiet_closes())
+    df.loc[25, f"Close_{SUFFIX}"] = 0.0                       # bad tick, rejected by a row rule
+    _, counts, quarantine = run_silver(df)
+    assert counts["outlier_return"] == 0
+    assert dict(zip(quarantine.index, quarantine["Rule"])) == {25: "positive_prices",
+                                                               26: "date_gap"}
+
+def test_sequence_rules_run_in_date_order():
+    df = bars(quiet_closes()).iloc[::-1]                      # stored newest first
+    clean, counts, _ = run_silver(df)
+    assert counts["date_gap"] == 0 and counts["outlier_return"] == 0
+    assert list(clean.index) == list(df.index)                # input order is kept
+
+def test_header_rows_and_summary():
+    df = bars(quiet_closes(5)).astype({f"Close_{SUFFIX}": object})
+    df.loc[2, f"Close_{SUFFIX}"] = "BTC-USD"
+    clean, counts, quarantine = data_quality.run_rules(df, data_quality.BRONZE_RULES, SUFFIX)
+    assert list(clean.index) == [0, 1, 3, 4]
+    assert counts == {"header_rows": 1}
+
+    summary = data_quality.summarize(counts, "bronze", SUFFIX, data_quality.BRONZE_RULES)
+    assert list(summary.columns) == data_quality.COUNTS_COLS
+    assert summary.iloc[0].tolist() == ["bronze", SUFFIX, "header_rows", "reject", 1]
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+import fingerprints
+
+def frame(start="2021-01-01", end="2023-12-31", seed=0):
+    dates = pd.date_range(start, end, freq="D")
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"PriceDate": dates,
+                         "Close": 100 + rng.standard_normal(len(dates)).cumsum()})
+
+def upsert(old, rows, key="PriceDate"):
+    """What merge_frame does with rows keyed on key."""
+    kept = old[~old[key].isin(rows[key])]
+    return pd.concat([kept, rows]).sort_values(key).reset_index(drop=True)
+
+def test_unchanged_frame_writes_nothing():
+    df = frame()
+    rows = fingerprints.changed_partition_rows(df, df.copy())
+    assert rows is not None and rows.empty
+
+def test_only_changed_years_are_returned():
+    old = frame()
+    new = old.copy()
+    new.loc[new["PriceDate"] == "2022-06-01", "Close"] += 1.0
+    rows = fingerprints.changed_partition_rows(old, new)
+    assert set(rows["PriceDate"].dt.year) == {2022}
+    assert len(rows) == 365
+    pd.testing.assert_frame_equal(upsert(old, rows), new)
+
+def test_appended_year_returns_the_new_rows_only():
+    old = frame(end="2022-12-31")
+    new = frame(end="2023-03-31")
+    rows = fingerprints.changed_partition_rows(old, new)
+    assert rows["PriceDate"].min() == pd.Timestamp("2023-01-01") and len(rows) == 90
+    pd.testing.assert_frame_equal(upsert(old, rows), new)
+
+def test_extra_columns_are_not_compared():
+    old = frame()
+    new = old.assign(Volume=1.0)
+    assert fingerprints.changed_partition_rows(old, new).empty
+
+def test_dropped_year_needs_full_reload():
+    old = frame()
+    new = old[old["PriceDate"].dt.year != 2021]
+    assert fingerprints.changed_partition_rows(old, new) is None
+
+def test_dropped_key_in_changed_year_needs_full_reload():
+    old = frame()
+    new = old[old["PriceDate"] != "2022-06-01"].reset_index(drop=True)
+    assert fingerprints.changed_partition_rows(old, new) is None
+
+def test_changed_assets_reports_partitions():
+    old = {"BTC": fingerprints.frame_fingerprints(frame()), "ETH": {2021: "x"}}
+    changed = frame()
+    changed.loc[0, "Close"] = 0.0
+    new = {"BTC": fingerprints.frame_fingerprints(changed), "SOL": {2021: "y"}}
+    assert fingerprints.changed_assets(old, new) == {"BTC": {2021}, "ETH": {2021}, "SOL": {2021}}
+    assert fingerprints.changed_assets(new, new) == {}
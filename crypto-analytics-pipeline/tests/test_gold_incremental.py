@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import gold_feature_engineering
+import silver_clean_transform
+
+SUFFIX = "SYN"
+
+def silver_frame(n_rows: int, drop_every: int = 0) -> pd.DataFrame:
+    """Silver for a synthetic daily random walk, optionally with missing days."""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n_rows)))
+    spread = 1 + np.abs(rng.normal(0, 0.01, n_rows))
+    bronze = pd.DataFrame({
+        "PriceDate": pd.date_range("2018-01-01", periods=n_rows, freq="D"),
+        f"Open_{SUFFIX}": close / spread, f"High_{SUFFIX}": close * spread,
+        f"Low_{SUFFIX}": close / spread ** 2, f"Close_{SUFFIX}": close,
+        f"Volume_{SUFFIX}": rng.integers(1_000, 1_000_000, n_rows),
+        "Coin": SUFFIX,
+    })
+    if drop_every:
+        bronze = bronze[np.arange(n_rows) % drop_every != 3].reset_index(drop=True)
+    return silver_clean_transform.clean_bronze(bronze, SUFFIX)
+
+def full_gold(silver: pd.DataFrame):
+    """Full recompute, as run_gold does it, plus the tail state it saves."""
+    base = gold_feature_engineering.compute_base_metrics(silver, SUFFIX)
+    gold, ind_state = gold_feature_engineering.compute_enhanced_metrics_with_state(base, SUFFIX)
+    return gold, gold_feature_engineering.build_gold_state(base, gold, SUFFIX, ind_state)
+
+def assert_frames_match(actual: pd.DataFrame, expected: pd.DataFrame):
+    assert list(actual["PriceDate"]) == list(expected["PriceDate"])
+    for col in expected.columns:
+        a, e = actual[col].to_numpy(), expected[col].to_numpy()
+        if np.issubdtype(e.dtype, np.number) or e.dtype == bool:
+            np.testing.assert_allclose(a.astype(float), e.astype(float), rtol=1e-8, atol=1e-10,
+                                       equal_nan=True, err_msg=col)
+        else:
+            assert (a == e).all(), col
+
+@pytest.mark.parametrize("drop_every", [0, 37])
+@pytest.mark.parametrize("new_days", [1, 45])
+def test_incremental_matches_full_recompute(drop_every, new_days):
+    silver = silver_frame(1_200, drop_every)
+    cut = silver["PriceDate"].iloc[-new_days - 1]
+    head = silver[silver["PriceDate"] <= cut].reset_index(drop=True)
+
+    gold_head, state = full_gold(head)
+    result = gold_feature_engineering.compute_gold_incremental(silver, state, SUFFIX)
+    assert result is not None
+    new_rows, _ = result
+    assert len(new_rows) == new_days
+
+    incremental = pd.concat([gold_head, new_rows], ignore_index=True)
+    assert_frames_match(incremental, full_gold(silver)[0])
+
+def test_incremental_chains_from_its_own_state():
+    silver = silver_frame(1_000)
+    dates = silver["PriceDate"]
+    gold, state = full_gold(silver[dates <= dates.iloc[-21]].reset_index(drop=True))
+    for last in (dates.iloc[-11], dates.iloc[-1]):
+        new_rows, state = gold_feature_engineering.compute_gold_incremental(
+            silver[dates <= last].reset_index(drop=True), state, SUFFIX)
+        gold = pd.concat([gold, new_rows], ignore_index=True)
+    assert_frames_match(gold, full_gold(silver)[0])
+
+def test_restated_history_falls_back_to_full_recompute():
+    silver = silver_frame(800)
+    _, state = full_gold(silver.iloc[:-5].reset_index(drop=True))
+    restated = silver.copy()
+    restated.loc[len(restated) - 10, f"Close_{SUFFIX}"] *= 1.01
+    assert gold_feature_engineering.compute_gold_incremental(restated, state, SUFFIX) is None
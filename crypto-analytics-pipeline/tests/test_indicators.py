@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicators
+import synthetic_data
+
+SUFFIX = "SYN"
+
+def series(n_rows: int = 3_000):
+    df = synthetic_data.synthetic_ohlcv(n_rows, SUFFIX, seed=11)
+    return df[f"Close_{SUFFIX}"].to_numpy(), df[f"Volume_{SUFFIX}"].to_numpy(dtype=float)
+
+def chained(close, volume, cuts):
+    """Indicators computed block by block, each block continuing from the last state."""
+    parts, state = [], None
+    for lo, hi in zip([0] + cuts, cuts + [len(close)]):
+        cols, state = indicators.compute_indicators(close[lo:hi], volume[lo:hi], state=state)
+        parts.append(cols)
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+def assert_columns_match(actual: dict, expected: dict, rtol=1e-7):
+    assert list(actual) == list(expected)
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=rtol, atol=1e-9,
+                                   equal_nan=True, err_msg=name)
+
+@pytest.mark.parametrize("cuts", [[2_999], [1, 5, 19, 20, 21, 33], [500, 1_000, 2_500]])
+def test_incremental_matches_full_pass(cuts):
+    close, volume = series()
+    full, _ = indicators.compute_indicators(close, volume)
+    assert_columns_match(chained(close, volume, cuts), full)
+
+def test_one_row_at_a_time_matches_full_pass():
+    close, volume = series(120)
+    full, _ = indicators.compute_indicators(close, volume)
+    assert_columns_match(chained(close, volume, list(range(1, 120))), full)
+
+def test_matches_pandas_reference():
+    close, volume = series()
+    cols, _ = indicators.compute_indicators(close, volume)
+    s = pd.Series(close)
+    delta = s.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    line = s.ewm(span=12, adjust=False).mean() - s.ewm(span=26, adjust=False).mean()
+    signal = line.ewm(span=9, adjust=False).mean()
+    mean, sd = s.rolling(20).mean(), s.rolling(20).std(ddof=0)
+    expected = {
+        "RSI14": 100 * gain / (gain + loss),
+        "MACD": line, "MACDSignal": signal, "MACDHist": line - signal,
+        "BBUpper20": mean + 2 * sd, "BBLower20": mean - 2 * sd,
+        "BBPctB20": (s - (mean - 2 * sd)) / (4 * sd),
+        "Momentum10": s.pct_change(10), "Momentum30": s.pct_change(30),
+        "OBV": (np.sign(delta).fillna(0) * volume).cumsum(),
+    }
+    for name, ref in expected.items():
+        ok = np.isfinite(cols[name])
+        assert ok[40:].all(), name                      # only the warm-up rows are NaN
+        np.testing.assert_allclose(cols[name][ok], ref.to_numpy()[ok], rtol=1e-7, err_msg=name)
+
+def test_rolling_std_keeps_precision_far_from_first_close():
+    # a coin that rallied from cents to tens of thousands, then trades quietly:
+    # windows far from the first close used to lose digits to cancellation
+    rng = np.random.default_rng(0)
+    close = np.r_[np.geomspace(0.01, 6e4, 3_000),
+                  6e4 * np.exp(np.cumsum(rng.normal(0, 1e-4, 200_000)))]
+    p = indicators.IndicatorPass(close, np.ones_like(close), {})
+    mean, sd = p.rolling_mean_std(20)
+    windows = sliding_window_view(close, 20)            # two-pass reference
+    np.testing.assert_allclose(mean[19:], windows.mean(axis=1), rtol=1e-12)
+    np.testing.assert_allclose(sd[19:], windows.std(axis=1), rtol=1e-5)
+    assert np.isnan(mean[:19]).all() and np.isnan(sd[:19]).all()
+
+def test_changed_indicator_set_cannot_resume():
+    close, volume = series(200)
+    _, state = indicators.compute_indicators(close, volume)
+    assert indicators.can_resume(state)
+    assert not indicators.can_resume(None)
+    assert not indicators.can_resume(state, indicators.INDICATORS[:-1])
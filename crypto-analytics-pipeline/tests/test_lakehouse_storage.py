@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lakehouse_storage
+
+TABLE = "raw_btc_prices_bnz"
+COLS = ["PriceDate", "Close"]
+
+def prices(start="2022-12-25", days=20, level=100.0):
+    dates = pd.date_range(start, periods=days, freq="D")
+    return pd.DataFrame({"PriceDate": dates, "Close": level + np.arange(days, dtype=float)})
+
+def read(lake, table=TABLE):
+    return lake.read_table(table, COLS)
+
+def table_entries(lake, table=TABLE):
+    return sorted(os.listdir(lake.table_path(table)))
+
+@pytest.fixture
+def lake(tmp_path):
+    return lakehouse_storage.LakehouseBackend(str(tmp_path / "lake"))
+
+def test_replace_switches_versions(lake):
+    lake.replace_table(TABLE, prices(), COLS)
+    lake.replace_table(TABLE, prices(level=200.0), COLS)
+    assert read(lake)["Close"].iloc[0] == 200.0
+    assert table_entries(lake) == ["_CURRENT", "_v1", "_v2"]    # one previous version kept
+    lake.replace_table(TABLE, prices(level=300.0, days=5), COLS)
+    assert table_entries(lake) == ["_CURRENT", "_v2", "_v3"]
+    assert len(read(lake)) == 5
+
+def test_readers_see_the_old_table_until_the_switch(lake, monkeypatch):
+    lake.replace_table(TABLE, prices(), COLS)
+    seen = []
+    real_replace = os.replace
+
+    def switch(src, dst):
+        seen.append(read(lake)["Close"].iloc[0])          # new version complete, pointer not moved
+        real_replace(src, dst)
+        seen.append(read(lake)["Close"].iloc[0])
+
+    monkeypatch.setattr(lakehouse_storage.os, "replace", switch)
+    lake.replace_table(TABLE, prices(level=200.0), COLS)
+    assert seen == [100.0, 200.0]
+
+def test_failed_rewrite_leaves_the_live_version(lake, monkeypatch):
+    lake.replace_table(TABLE, prices(), COLS)
+    monkeypatch.setattr(lake, "write_dataset", lambda *args: None)    # writes nothing
+    with pytest.raises(RuntimeError):
+        lake.replace_table(TABLE, prices(level=200.0), COLS)
+    assert read(lake)["Close"].iloc[0] == 100.0
+    assert table_entries(lake) == ["_CURRENT", "_v1"]
+
+def test_merge_writes_into_the_live_version(lake):
+    lake.replace_table(TABLE, prices(), COLS)
+    lake.merge_frame(TABLE, prices(start="2023-01-10", days=10, level=500.0), COLS, ["PriceDate"])
+    df = read(lake)
+    assert len(df) == 26 and df["Close"].iloc[-1] == 509.0
+    assert table_entries(lake) == ["_CURRENT", "_v1"]
+
+def test_empty_replace_and_first_merge(lake):
+    lake.merge_frame(TABLE, prices(), COLS, ["PriceDate"])
+    assert table_entries(lake) == ["_CURRENT", "_v1"] and len(read(lake)) == 20
+    lake.replace_table(TABLE, prices(days=0), COLS)
+    assert read(lake).empty and lake.max_date(TABLE) is None
+    lake.merge_frame(TABLE, prices(days=3), COLS, ["PriceDate"])
+    assert len(read(lake)) == 3
+
+def test_tables_written_before_versioning(lake):
+    df = prices()
+    lake.write_dataset(TABLE, lake.to_arrow(df, COLS, COLS, set()), lake.table_path(TABLE))
+    pd.testing.assert_frame_equal(read(lake), df, check_dtype=False)
+    lake.replace_table(TABLE, prices(level=200.0), COLS)
+    assert table_entries(lake) == ["_CURRENT", "_v1"]        # old year=... partitions removed
+    assert read(lake)["Close"].iloc[0] == 200.0
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+import market_data
+
+T = pd.Timestamp
+
+class CountingSource(market_data.FakeSource):
+    """FakeSource that records every requested range."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.ranges = []
+
+    def download(self, ticker, start, end, interval):
+        self.ranges.append((start, end))
+        return super().download(ticker, start, end, interval)
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Record backoff sleeps instead of sleeping; jitter pinned to its maximum."""
+    sleeps = []
+    monkeypatch.setattr(market_data.time, "sleep", sleeps.append)
+    monkeypatch.setattr(market_data.random, "uniform", lambda lo, hi: hi)
+    return sleeps
+
+def fetcher(tmp_path, source, cache=True):
+    return market_data.Fetcher(source, workers=2, rate=0,
+                               cache_dir=str(tmp_path / "fetch") if cache else None)
+
+def test_missing_and_added_ranges():
+    ranges = [(T("2020-01-10"), T("2020-01-20")), (T("2020-02-01"), T("2020-02-10"))]
+    assert market_data.missing_ranges(ranges, T("2020-01-01"), T("2020-02-05")) == [
+        (T("2020-01-01"), T("2020-01-10")), (T("2020-01-20"), T("2020-02-01"))]
+    assert market_data.missing_ranges(ranges, T("2020-01-12"), T("2020-01-18")) == []
+    assert market_data.add_range(ranges, T("2020-01-15"), T("2020-02-01")) == [
+        (T("2020-01-10"), T("2020-02-10"))]
+
+def test_cache_only_downloads_uncovered_ranges(tmp_path):
+    source = CountingSource()
+    f = fetcher(tmp_path, source)
+    first = f.download("BTC-USD", "2020-01-01", "2020-03-01")
+    assert len(first) == 60 and source.ranges == [(T("2020-01-01"), T("2020-03-01"))]
+
+    again = f.download("BTC-USD", "2020-01-15", "2020-02-15")
+    assert len(source.ranges) == 1 and f.stats["cached"] == 1
+    pd.testing.assert_frame_equal(again, first.loc["2020-01-15":"2020-02-14"])
+
+    wider = f.download("BTC-USD", "2019-12-01", "2020-04-01")
+    assert source.ranges[1:] == [(T("2019-12-01"), T("2020-01-01")),
+                                 (T("2020-03-01"), T("2020-04-01"))]
+    direct = market_data.normalize(market_data.FakeSource().download(
+        "BTC-USD", T("2019-12-01"), T("2020-04-01"), "1d"))
+    pd.testing.assert_frame_equal(wider, direct, check_freq=False)
+
+    # a new fetcher on the same directory starts from the saved coverage
+    fresh = CountingSource()
+    fetcher(tmp_path, fresh).download("BTC-USD", "2019-12-15", "2020-03-15")
+    assert fresh.ranges == []
+
+def test_unsettled_bars_are_downloaded_again(tmp_path):
+    source = CountingSource()
+    f = fetcher(tmp_path, source)
+    today = pd.Timestamp.now(tz="UTC").tz_localize(None).floor("1D")
+    start, end = today - pd.Timedelta("60D"), today + pd.Timedelta("1D")
+    f.download("BTC-USD", start, end)
+    entry = f.cache.load("BTC-USD", "1d")
+    settled = today - pd.Timedelta(market_data.SETTLE["1d"])
+    assert entry["ranges"] == [(start, settled)]           # the last week is not recorded
+
+    f.download("BTC-USD", start, end)
+    assert source.ranges[1:] == [(settled, end)]          # only the unsettled tail again
+
+def test_failed_requests_back_off_exponentially(tmp_path, no_sleep):
+    source = market_data.FakeSource(fail_rate=1.0)
+    f = fetcher(tmp_path, source, cache=False)
+    with pytest.raises(ConnectionError):
+        f.download("BTC-USD", "2020-01-01", "2020-02-01")
+    assert source.requests == market_data.MAX_RETRIES + 1
+    assert no_sleep == [market_data.BACKOFF_BASE * 2 ** a for a in range(market_data.MAX_RETRIES)]
+    assert f.stats["retries"] == market_data.MAX_RETRIES
+    assert market_data.backoff_seconds(20) == market_data.BACKOFF_MAX
+
+def test_flaky_source_recovers_and_matches_clean_download(tmp_path, no_sleep):
+    flaky = market_data.FakeSource(fail_rate=0.5, seed=1)
+    f = fetcher(tmp_path, flaky, cache=False)
+    requests = [(t, "2021-01-01", "2021-06-01", "1d") for t in ("BTC-USD", "ETH-USD", "SOL-USD")]
+    got = f.fetch_many(requests)
+    assert f.stats["retries"] == len(no_sleep) > 0
+    assert f.stats["downloads"] == flaky.requests == len(requests) + f.stats["retries"]
+    clean = fetcher(tmp_path, market_data.FakeSource(), cache=False).fetch_many(requests)
+    for a, b in zip(got, clean):
+        pd.testing.assert_frame_equal(a, b)
@@ -0,0 +1,173 @@
+import numpy as np                         # NumPy for slot positions and fills
+import pandas as pd                        # pandas for DataFrame operations
+
+import storage                             # pooled storage backend
+
+# ---------- CONFIG ----------
+GAP_TABLE = "calendar_gap_stats"
+GAP_COLS  = ["Asset", "Frequency", "FirstDate", "LastDate", "Periods", "ObservedPeriods",
+             "ImputedPeriods", "Gaps", "LongestGap", "Coverage"]
+GAP_KEYS  = ["Asset", "Frequency"]
+CAL_COLS  = ["IsImputed", "GapLength"]     # added by align; GapLength is 0 on observed rows
+
+# Fill specs are plain data: an imputed bar is flat at the previous close
+# ("close", copied into "flat") with nothing traded ("zero"); every other
+# column carries the previous observed row. "{s}" is the coin suffix.
+DAILY_FILL = {"close": "Close_{s}", "flat": ["Open_{s}", "High_{s}", "Low_{s}"],
+              "zero": ["Volume_{s}"]}
+LONG_FILL  = {"close": "ClosePrice", "flat": ["OpenPrice", "HighPrice", "LowPrice"],
+              "zero": ["Volume"]}
+
+# ---------- ALIGN ----------
+def period_length(freq: str) -> pd.Timedelta:
+    """Fixed length of one calendar period, e.g. 'D' → 1 day, '1h' → 1 hour."""
+    return pd.Timedelta(freq if freq[:1].isdigit() else f"1{freq}")
+
+def bar_freq(dates, default: str = "D") -> str:
+    """
+    `default`, or the smallest spacing between consecutive dates when that
+    is shorter (e.g. minute bars fed through the daily layers), as '60s'.
+    """
+    values = np.sort(pd.to_datetime(dates).to_numpy())
+    steps = np.diff(values)
+    steps = steps[steps > np.timedelta64(0)]
+    if not len(steps) or steps.min() >= period_length(default).to_timedelta64():
+        return default
+    return f"{int(pd.Timedelta(steps.min()).total_seconds())}s"
+
+def align(df: pd.DataFrame, date_col: str = "PriceDate", freq: str = None,
+          group_col: str = None, fill: dict = None, suffix: str = "") -> pd.DataFrame:
+    """
+    Reindex observed rows onto a gap-free calendar of `freq` periods
+    (default: daily, or the bar spacing of finer data, see bar_freq) from
+    each asset's first to its last row, in one vectorized pass for every
+    asset (group_col) at once:
+      - IsImputed: True for periods that had no observed row
+      - GapLength: length of the run of imputed periods the row is in
+      - fill: columns rewritten on imputed rows (DAILY_FILL / LONG_FILL)
+    Rows come out sorted by asset, then date. Later stages keep the frame
+    as is, so windows count calendar periods rather than rows.
+    """
+    if df.empty:
+        return df.assign(IsImputed=pd.Series(dtype=bool), GapLength=pd.Series(dtype="int64"))
+    df = df.drop(columns=CAL_COLS, errors="ignore")
+    freq = freq or bar_freq(df[date_col])
+    dates = pd.to_datetime(df[date_col]).to_numpy()
+    codes = (np.zeros(len(df), dtype=np.int64) if group_col is None
+             else pd.factorize(df[group_col], sort=True)[0])
+    order = np.lexsort((dates, codes))
+    df, dates, codes = df.iloc[order].reset_index(drop=True), dates[order], codes[order]
+
+    # one calendar slot per period; each asset's slots follow the previous asset's
+    step = period_length(freq).to_timedelta64()
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(df)]))
+    first = dates[starts]
+    offset = (dates - first[group]) // step
+    counts = np.maximum.reduceat(offset, starts) + 1
+    base = np.r_[0, np.cumsum(counts)[:-1]]
+    slot = base[group] + offset
+
+    # forward fill = last observed row at or before each slot
+    src = np.full(int(counts.sum()), -1, dtype=np.int64)
+    src[slot] = np.arange(len(df))
+    imputed = src < 0
+    src = np.maximum.accumulate(src)
+
+    out = df.iloc[src].reset_index(drop=True)
+    slot_group = np.repeat(np.arange(len(starts)), counts)
+    out[date_col] = first[slot_group] + (np.arange(len(src)) - base[slot_group]) * step
+    out["IsImputed"] = imputed
+    out["GapLength"] = gap_lengths(imputed)
+
+    if fill and imputed.any():
+        close = fill["close"].format(s=suffix)
+        for col in fill.get("flat", []):
+            col = col.format(s=suffix)
+            out[col] = out[col].where(~imputed, out[close])
+        for col in fill.get("zero", []):
+            col = col.format(s=suffix)
+            out.loc[imputed, col] = 0
+    return out
+
+def gap_lengths(imputed: np.ndarray) -> np.ndarray:
+    """Length of the run of True values each position belongs to (0 where False)."""
+    pos = np.arange(len(imputed))
+    prev_real = np.maximum.accumulate(np.where(imputed, -1, pos))
+    next_real = np.minimum.accumulate(np.where(imputed, len(imputed), pos)[::-1])[::-1]
+    return np.where(imputed, next_real - prev_real - 1, 0)
+
+def is_aligned(df: pd.DataFrame) -> bool:
+    """True when df already went through align (so stages must not re-fill it)."""
+    return "IsImputed" in df.columns
+
+def observed(df: pd.DataFrame) -> pd.DataFrame:
+    """Only the observed rows of an aligned frame, without the calendar columns."""
+    if not is_aligned(df):
+        return df
+    return df.loc[~df["IsImputed"].to_numpy(dtype=bool)].drop(columns=CAL_COLS, errors="ignore")
+
+def mask_imputed(df: pd.DataFrame, col: str) -> np.ndarray:
+    """col as floats with NaN on imputed rows, e.g. returns that were never observed."""
+    values = df[col].to_numpy(dtype=float, copy=True)
+    if is_aligned(df):
+        values[df["IsImputed"].to_numpy(dtype=bool)] = np.nan
+    return values
+
+def calendar_series(df: pd.DataFrame, date_col: str, value_col: str,
+                    freq: str = "D") -> pd.Series:
+    """
+    value_col indexed by date with the calendar frequency set, reusing the
+    alignment when df carries one; otherwise it is aligned here.
+    """
+    if not is_aligned(df):
+        df = align(df[[date_col, value_col]], date_col, freq)
+    ts = df.set_index(date_col)[value_col]
+    ts.index = pd.DatetimeIndex(ts.index, freq=freq)
+    return ts
+
+# ---------- GAP STATISTICS ----------
+def gap_stats(df: pd.DataFrame, date_col: str = "PriceDate", freq: str = "D",
+              group_col: str = None, asset: str = None) -> pd.DataFrame:
+    """
+    One GAP_COLS row per asset from its observed dates (imputed rows of an
+    aligned frame are ignored): calendar periods covered, observed and
+    missing periods, number of gaps, longest gap and coverage share.
+      - asset: label for a single-asset frame (group_col=None)
+    """
+    df = observed(df)
+    if df.empty:
+        return pd.DataFrame(columns=GAP_COLS)
+    step = period_length(freq)
+    keys = df[group_col].to_numpy() if group_col else np.full(len(df), asset)
+    frame = pd.DataFrame({"Asset": keys, "Date": pd.to_datetime(df[date_col]).to_numpy()})
+    frame = frame.drop_duplicates().sort_values(["Asset", "Date"])
+    missing = (frame.groupby("Asset")["Date"].diff() // step - 1).fillna(0).clip(lower=0)
+    frame["Missing"] = missing.astype("int64")
+    frame["GapStart"] = frame["Missing"] > 0
+
+    stats = frame.groupby("Asset").agg(
+        FirstDate=("Date", "min"), LastDate=("Date", "max"), ObservedPeriods=("Date", "size"),
+        ImputedPeriods=("Missing", "sum"), Gaps=("GapStart", "sum"),
+        LongestGap=("Missing", "max"),
+    ).reset_index()
+    stats["Periods"] = stats["ObservedPeriods"] + stats["ImputedPeriods"]
+    stats["Coverage"] = stats["ObservedPeriods"] / stats["Periods"]
+    stats["Frequency"] = freq
+    return stats[GAP_COLS]
+
+def print_gap_stats(stats: pd.DataFrame):
+    """One line per asset that has gaps."""
+    for row in stats[stats["Gaps"] > 0].itertuples(index=False):
+        print(f"📅 {row.Asset} ({row.Frequency}): {row.ImputedPeriods:,} imputed periods "
+              f"in {row.Gaps:,} gaps (longest {row.LongestGap:,}), coverage {row.Coverage:.2%}")
+
+# ---------- PERSIST ----------
+def write_gap_stats(stats: pd.DataFrame):
+    """Upsert by (Asset, Frequency), so daily, universe and intraday runs share the table."""
+    if stats.empty:
+        return
+    n = storage.get_backend().merge_frame(
+        GAP_TABLE, stats, GAP_COLS, key_cols=GAP_KEYS,
+        int_cols=["Periods", "ObservedPeriods", "ImputedPeriods", "Gaps", "LongestGap"])
+    print(f"✅ Merged {n:,} rows into {GAP_TABLE}")